@@ -0,0 +1,201 @@
+"""
+Career Answer Table Module
+Precomputes the career model's answer for every point of the discrete /predict-career
+input space and serves it from a memory-mapped table.
+"""
+
+import numpy as np
+import joblib
+import hashlib
+import json
+import os
+
+from preprocessing import FeaturePreprocessor, SKILLS_LIST
+from compiled_forest import CompiledForest, COMPILED_FOREST_FILE
+
+MODELS_DIR = 'ml/models'
+TABLE_FILE = 'career_answer_table.npy'
+TABLE_META_FILE = 'career_answer_table.json'
+
+# Input space, in packing order
+EDUCATIONS = ['BCA', 'BBA', 'BA', 'BSc', 'BCom', 'MBA']
+INTERESTS = ['Data', 'Web', 'Business', 'AI', 'Teaching', 'Sales']
+EXPERIENCE_VALUES = 6  # experience_years 0..5
+N_SKILL_SUBSETS = 1 << len(SKILLS_LIST)
+TABLE_SIZE = len(EDUCATIONS) * len(INTERESTS) * EXPERIENCE_VALUES * N_SKILL_SUBSETS
+
+# Artifacts whose contents determine the table; any change invalidates it
+VERSIONED_ARTIFACTS = [
+    'career_model.pkl',
+    COMPILED_FOREST_FILE,
+    'education_encoder.pkl',
+    'interest_encoder.pkl',
+    'experience_scaler.pkl',
+    'target_encoder.pkl'
+]
+
+TABLE_DTYPE = np.dtype([('role', np.uint8), ('confidence', np.float64)])
+
+_EDUCATION_INDEX = {label: idx for idx, label in enumerate(EDUCATIONS)}
+_INTEREST_INDEX = {label: idx for idx, label in enumerate(INTERESTS)}
+_SKILL_BIT = {skill: 1 << idx for idx, skill in enumerate(SKILLS_LIST)}
+
+
+def pack_profile_key(education: str, skills, interest: str, experience_years: int) -> int:
+    """
+    Pack a validated profile into its table index.
+
+    Layout: ((education * 6 + interest) * 6 + experience) * 1024 + skill_mask,
+    where bit k of skill_mask is set when SKILLS_LIST[k] is present.
+    """
+    skill_mask = 0
+    for entry in skills:
+        for skill in str(entry).split(','):
+            skill_mask |= _SKILL_BIT.get(skill.strip(), 0)
+
+    key = _EDUCATION_INDEX[education] * len(INTERESTS) + _INTEREST_INDEX[interest]
+    key = key * EXPERIENCE_VALUES + int(experience_years)
+    return key * N_SKILL_SUBSETS + skill_mask
+
+
+def compute_artifact_version(models_dir: str = MODELS_DIR) -> str:
+    """Hash the model artifacts the table was built from."""
+    digest = hashlib.sha256()
+    for name in VERSIONED_ARTIFACTS:
+        path = os.path.join(models_dir, name)
+        if not os.path.exists(path):
+            continue
+        digest.update(name.encode())
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def build_feature_grid(preprocessor: FeaturePreprocessor) -> np.ndarray:
+    """
+    Build the feature matrix for every packed key, in key order.
+
+    Uses the same encoding as InferenceEncoder, so rows match create_feature_matrix.
+    """
+    encoder = preprocessor.compile_inference_encoder()
+    keys = np.arange(TABLE_SIZE, dtype=np.int64)
+
+    skill_mask = keys % N_SKILL_SUBSETS
+    rest = keys // N_SKILL_SUBSETS
+    experience = rest % EXPERIENCE_VALUES
+    rest //= EXPERIENCE_VALUES
+    interest = rest % len(INTERESTS)
+    education = rest // len(INTERESTS)
+
+    education_codes = np.array([encoder.education_index[label] for label in EDUCATIONS])
+    interest_codes = np.array([encoder.interest_index[label] for label in INTERESTS])
+
+    X = np.zeros((TABLE_SIZE, encoder.n_features), dtype=np.float64)
+    X[:, 0] = education_codes[education]
+    X[:, 1] = interest_codes[interest]
+    X[:, 2] = (experience.astype(np.float64) - encoder.experience_mean) / encoder.experience_scale
+    for idx in range(len(SKILLS_LIST)):
+        X[:, 3 + idx] = (skill_mask >> idx) & 1
+
+    return X
+
+
+def build_answer_table(models_dir: str = MODELS_DIR, chunk_size: int = 8192) -> str:
+    """
+    Score every combination of the input space once and write the table.
+
+    The compiled forest is used when present (that is what the API serves),
+    otherwise career_model.pkl.
+
+    Returns:
+        Path of the written table
+    """
+    forest_path = os.path.join(models_dir, COMPILED_FOREST_FILE)
+    if os.path.exists(forest_path):
+        model = CompiledForest.load(forest_path)
+    else:
+        model = joblib.load(os.path.join(models_dir, 'career_model.pkl'))
+    preprocessor = FeaturePreprocessor.load_encoders(models_dir)
+
+    print(f"Scoring {TABLE_SIZE} profiles...")
+    X = build_feature_grid(preprocessor)
+    table = np.zeros(TABLE_SIZE, dtype=TABLE_DTYPE)
+    for start in range(0, TABLE_SIZE, chunk_size):
+        proba = model.predict_proba(X[start:start + chunk_size])
+        best = np.argmax(proba, axis=1)
+        table['role'][start:start + chunk_size] = model.classes_[best]
+        table['confidence'][start:start + chunk_size] = proba[np.arange(len(best)), best]
+
+    table_path = os.path.join(models_dir, TABLE_FILE)
+    np.save(table_path, table)
+
+    meta = {
+        'version': compute_artifact_version(models_dir),
+        'roles': [str(role) for role in preprocessor.target_encoder.classes_],
+        'educations': EDUCATIONS,
+        'interests': INTERESTS,
+        'skills': SKILLS_LIST,
+        'size': TABLE_SIZE
+    }
+    with open(os.path.join(models_dir, TABLE_META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"[OK] Answer table saved to {table_path} ({table.nbytes / 1e6:.2f} MB)")
+    return table_path
+
+
+class AnswerTable:
+    """Memory-mapped lookup of (predicted role, confidence) by packed profile key."""
+
+    def __init__(self, table: np.ndarray, roles):
+        self.roles = np.asarray(roles, dtype=object)
+        self.role_codes = table['role']
+        self.confidences = table['confidence']
+
+    @classmethod
+    def load(cls, models_dir: str = MODELS_DIR):
+        """
+        Open the table if it exists and matches the current model artifacts.
+
+        Returns:
+            AnswerTable, or None if the table is missing or stale
+        """
+        table_path = os.path.join(models_dir, TABLE_FILE)
+        meta_path = os.path.join(models_dir, TABLE_META_FILE)
+        if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        if meta.get('version') != compute_artifact_version(models_dir):
+            print("[WARNING] Career answer table is stale (model artifacts changed). "
+                  "Rebuild it with: python answer_table.py")
+            return None
+        if meta.get('size') != TABLE_SIZE or meta.get('skills') != SKILLS_LIST:
+            print("[WARNING] Career answer table layout does not match this API version. Ignoring it.")
+            return None
+
+        table = np.load(table_path, mmap_mode='r')
+        return cls(table, meta['roles'])
+
+    def lookup(self, education: str, skills, interest: str, experience_years: int):
+        """Return (predicted_role, confidence) for a validated profile."""
+        key = pack_profile_key(education, skills, interest, experience_years)
+        return self.roles[self.role_codes[key]], float(self.confidences[key])
+
+
+def main():
+    """Rebuild the answer table for the served models (train_models.py builds it into every version)."""
+    from model_registry import derive_version  # type: ignore
+
+    print("="*60)
+    print("CAREER ANSWER TABLE BUILD")
+    print("="*60)
+    path = derive_version(MODELS_DIR, build_answer_table, 'answer_table.py')
+    print(f"[OK] Answer table built in {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,19 +3,20 @@ FastAPI ML Service
 REST API endpoints for career prediction, skill gap analysis, and resume matching.
 """
 
-from fastapi import FastAPI, HTTPException  # type: ignore
+from fastapi import FastAPI, Header, HTTPException  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
+from fastapi.responses import Response, StreamingResponse  # type: ignore
 from pydantic import BaseModel  # type: ignore
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+import asyncio
+import functools
 import numpy as np  # type: ignore
-import pandas as pd  # type: ignore
-import joblib  # type: ignore
 import os
+import tempfile
+import time
 from dotenv import load_dotenv  # type: ignore
 
 load_dotenv()
-from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
-from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -23,15 +24,32 @@ warnings.filterwarnings('ignore')
 import httpx  # type: ignore
 import json
 
-# Import preprocessing utilities
-from preprocessing import FeaturePreprocessor  # type: ignore
+from response_cache import ResponseCache, make_cache_key  # type: ignore
+from session_store import create_session_store  # type: ignore
+from conversation_compaction import compact_interview_conversation  # type: ignore
+
+from resume_screening import BulkScreener, get_feature_names, get_missing_keywords  # type: ignore
+from cpu_executor import BoundedExecutor, ExecutorBusy  # type: ignore
+from micro_batcher import MicroBatcher  # type: ignore
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry  # type: ignore
+from request_timing import (  # type: ignore
+    ServerTimingMiddleware, TimedRoute, current_timing, profile_report, profile_token_matches,
+    profiling_requested, record_stage, run_profiled, stage
+)
+from model_registry import ModelBundle, UNVERSIONED, read_current, resolve_models_dir, verify_version, version_dir  # type: ignore
+
+# Model and text-matching modules pull in pandas/sklearn/scipy (most of the import time).
+# They are imported inside load_models() and the handlers that need them instead.
+if TYPE_CHECKING:
+    from hashing_matcher import HashingMatcher  # type: ignore
+    from job_index import JobIndex  # type: ignore
+    from role_profiles import RoleProfileRegistry  # type: ignore
 
 app = FastAPI(
     title="AI-Powered Career & Skills Advisor API",
     description="Machine Learning API for career prediction, skill gap analysis, and resume matching",
     version="1.0.0"
 )
-
 # Add CORS middleware - MUST be added before routes
 # Allow specific origins for production
 app.add_middleware(
@@ -64,12 +82,173 @@ else:
 
 SKILLS_LIST = ['Python', 'SQL', 'Excel', 'Power BI', 'JavaScript', 'HTML', 'CSS', 
                'Communication', 'Statistics', 'ML']
+VALID_EDUCATIONS = ['BCA', 'BBA', 'BA', 'BSc', 'BCom', 'MBA']
+VALID_INTERESTS = ['Data', 'Web', 'Business', 'AI', 'Teaching', 'Sales']
+
+# Serve the career model from career_forest.npz instead of career_model.pkl when present
+USE_COMPILED_FOREST = os.getenv('USE_COMPILED_FOREST', 'true').lower() == 'true'
+
+# Open large model arrays memory-mapped from models/shared (python model_artifacts.py) so
+# workers share their pages; false reads private copies as before
+MODEL_MMAP = os.getenv('MODEL_MMAP', 'true').lower() == 'true'
+
+# Check models/CURRENT this often (seconds) and hot-swap to a newly published model
+# version (see model_registry.py); 0 disables reloading
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '5'))
+# Check every file of a version against its manifest checksums before loading it
+MODEL_VERIFY_CHECKSUMS = os.getenv('MODEL_VERIFY_CHECKSUMS', 'true').lower() == 'true'
+
+# Directory where each worker process writes its metrics every METRICS_SYNC_INTERVAL seconds,
+# so /metrics on any worker reports all of them (prefork.py sets one up for several workers).
+# Unset: /metrics reports only the worker that answers it.
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_SYNC_INTERVAL = float(os.getenv('METRICS_SYNC_INTERVAL', '5'))
+
+# Add a Server-Timing header (per-stage durations) to every response. Off by default: the
+# header exposes internal stage timings to every client
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING', 'false').lower() == 'true'
+# Requests sent with `X-Profile: <PROFILE_TOKEN>` are profiled with cProfile into PROFILE_DIR
+# (requires SERVER_TIMING). Unset disables profiling entirely.
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN') or None
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'ml-api-profiles'))
+# Only the most recent PROFILE_KEEP profiles are kept in PROFILE_DIR
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))
+
+# Load models in a background task after startup instead of before the server accepts
+# requests. Requests to model endpoints wait for it; /health answers right away.
+WARMUP_IN_BACKGROUND = os.getenv('WARMUP_IN_BACKGROUND', 'true').lower() == 'true'
+MODEL_ENDPOINT_PREFIXES = ('/predict-career', '/skill-gap', '/resume-match', '/jobs', '/api/linkedin-analyze')
+
+# Parallelism for per-request predict calls. Training uses n_jobs=-1, but at serving
+# time one-row predicts fanning out across all cores oversubscribes the CPU.
+INFERENCE_N_JOBS = int(os.getenv('INFERENCE_N_JOBS', '1'))
+# Optional cap on BLAS/OpenMP threads used during inference (unset = library default)
+INFERENCE_BLAS_THREADS = os.getenv('INFERENCE_BLAS_THREADS')
+
+# Number of profiles featurized and scored per model call on the batch endpoint
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '1000'))
+
+# Job description index for /resume-match/jobs (vectorized with the trained TF-IDF vectorizer)
+JOB_INDEX_DIR = os.getenv('JOB_INDEX_DIR', os.path.join(MODELS_DIR, 'job_index'))
+JOB_INDEX_MAX_DELTA_ROWS = int(os.getenv('JOB_INDEX_MAX_DELTA_ROWS', '5000'))
+
+# Bulk resume screening: uploads of at least BULK_SCREEN_PROCESS_THRESHOLD resumes are
+# scored on a process pool, smaller ones on BULK_SCREEN_THREADS threads of its own;
+# BULK_SCREEN_MAX_PENDING_CHUNKS bounds the chunks in flight, shared by uploads in turn
+BULK_SCREEN_MAX_RESUMES = int(os.getenv('BULK_SCREEN_MAX_RESUMES', '20000'))
+bulk_screener = BulkScreener(
+    chunk_size=int(os.getenv('BULK_SCREEN_CHUNK_SIZE', '200')),
+    max_workers=int(os.getenv('BULK_SCREEN_WORKERS', str(max(1, (os.cpu_count() or 2) // 2)))),
+    process_threshold=int(os.getenv('BULK_SCREEN_PROCESS_THRESHOLD', '1000')),
+    max_pending_chunks=int(os.getenv('BULK_SCREEN_MAX_PENDING_CHUNKS', '8')),
+    thread_workers=int(os.getenv('BULK_SCREEN_THREADS', '2'))
+)
+
+
+def executor_from_env(name: str) -> BoundedExecutor:
+    """
+    Build the executor for one endpoint group.
+    
+    Reads <NAME>_EXECUTOR_KIND / _WORKERS / _QUEUE (e.g. RESUME_MATCH_EXECUTOR_WORKERS),
+    falling back to CPU_EXECUTOR_KIND / _WORKERS / _QUEUE.
+    """
+    prefix = name.upper().replace('-', '_') + '_EXECUTOR'
+    return BoundedExecutor(
+        name,
+        kind=os.getenv(f'{prefix}_KIND', os.getenv('CPU_EXECUTOR_KIND', 'thread')),
+        max_workers=int(os.getenv(f'{prefix}_WORKERS', os.getenv('CPU_EXECUTOR_WORKERS', '4'))),
+        max_queue=int(os.getenv(f'{prefix}_QUEUE', os.getenv('CPU_EXECUTOR_QUEUE', '64')))
+    )
+
+
+# CPU-bound handlers run on these pools instead of the event loop
+cpu_executors = {
+    name: executor_from_env(name)
+    for name in ('predict-career', 'resume-match', 'linkedin-analyze')
+}
+# Job index writes (vectorizing, delta and compaction file writes) mutate the in-process
+# index and queue on its file lock anyway, so they get one thread of their own
+cpu_executors['job-index'] = BoundedExecutor(
+    'job-index', kind='thread', max_workers=1, max_queue=int(os.getenv('JOB_INDEX_WRITE_QUEUE', '16'))
+)
+
+
+# Prometheus metrics served at /metrics. Recording is lock-free (per-thread shards), so the
+# timers below can sit on the request path. Stages timed inside process-pool workers
+# (CPU_EXECUTOR_KIND=process, bulk screening) are not included.
+metrics = MetricsRegistry(multiprocess_dir=METRICS_DIR)
+REQUEST_LATENCY = metrics.histogram(
+    'http_request_duration_seconds', 'Request duration until the response body is sent',
+    ('route', 'method', 'status')
+)
+REQUESTS_IN_FLIGHT = metrics.gauge('http_requests_in_flight', 'Requests being handled')
+FEATURE_BUILD_LATENCY = metrics.histogram(
+    'feature_build_duration_seconds', 'Feature row/matrix construction before a model call', ('model',)
+)
+MODEL_INFERENCE_LATENCY = metrics.histogram(
+    'model_inference_duration_seconds', 'One model call (a single row, micro-batch or chunk)', ('model',)
+)
+TFIDF_TRANSFORM_LATENCY = metrics.histogram(
+    'tfidf_transform_duration_seconds', 'Text vectorization per request', ('endpoint',)
+)
+UPSTREAM_LATENCY = metrics.histogram(
+    'upstream_request_duration_seconds', 'Upstream API calls until response headers arrive',
+    ('provider', 'status')
+)
+UPSTREAM_IN_FLIGHT = metrics.gauge(
+    'upstream_requests_in_flight', 'Upstream API calls waiting for response headers', ('provider',)
+)
+metrics.gauge('cpu_executor_running', 'Handlers running on each CPU executor', ('executor',),
+              callback=lambda: {(name,): executor.running for name, executor in cpu_executors.items()})
+metrics.gauge('cpu_executor_queued', 'Handlers waiting for each CPU executor', ('executor',),
+              callback=lambda: {(name,): executor.queued for name, executor in cpu_executors.items()})
+metrics.gauge('interview_sessions', 'Interview sessions in the session store',
+              callback=lambda: len(interview_sessions) if interview_sessions is not None else 0)
+metrics.gauge('interview_sessions_bytes', 'Approximate size of the stored interview conversations',
+              callback=lambda: interview_sessions.nbytes if interview_sessions is not None else 0)
+metrics.gauge('model_version_info', 'Model version being served', ('version',),
+              callback=lambda: {(models.version,): 1})
+
+
+def run_timed_inference(model_name: str, predict_fn, X: np.ndarray):
+    """Call predict_fn(X), recording the duration under model_inference_duration_seconds."""
+    with stage('inference', MODEL_INFERENCE_LATENCY, model_name):
+        return predict_fn(X)
+
+
+async def run_model_batch(fn, X: np.ndarray):
+    """Run one micro-batch on the predict-career executor."""
+    return await cpu_executors['predict-career'].run(fn, X)
+
+
+# Concurrent one-row model calls are merged into one predict_proba call per window
+MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'true').lower() == 'true'
+MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', '64'))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv('MICRO_BATCH_MAX_WAIT_MS', '2'))
+
+
+def attach_batchers(bundle: ModelBundle):
+    """
+    Give a bundle its own micro-batcher, so a batch is always scored by one model version.
+
+    Only the career model is batched: /skill-gap is rule-based and no endpoint calls
+    skill_gap_model per request.
+    """
+    if bundle.career_model is not None:
+        bundle.career_batcher = MicroBatcher(
+            'career_model', functools.partial(run_timed_inference, 'career', bundle.career_model.predict_proba),
+            max_batch_size=MICRO_BATCH_MAX_SIZE, max_wait_ms=MICRO_BATCH_MAX_WAIT_MS, runner=run_model_batch
+        )
 
-# Global variables for loaded models
-career_model = None
-skill_gap_model = None
-tfidf_vectorizer = None
-preprocessor = None
+
+# The model bundle being served. Handlers read this reference once per request and use
+# only that bundle; a reload replaces it as a whole (see watch_model_versions)
+models = ModelBundle(UNVERSIONED, MODELS_DIR)
+
+# The job index is live data outside the versioned bundles. It stays paired with the
+# vectorizer it was opened with, since its rows were vectorized with that vocabulary
+job_index = None
+job_index_vectorizer = None
 
 
 # Pydantic models for request/response
@@ -85,6 +264,10 @@ class CareerPredictionResponse(BaseModel):
     confidence: float
 
 
+class CareerPredictionBatchRequest(BaseModel):
+    profiles: List[CareerPredictionRequest]
+
+
 class SkillGapRequest(BaseModel):
     current_skills: List[str]
     target_role: str
@@ -105,6 +288,44 @@ class ResumeMatchResponse(BaseModel):
     missing_keywords: List[str]
 
 
+class BulkResume(BaseModel):
+    resume_id: Optional[str] = None
+    resume_text: str
+
+
+class BulkScreenRequest(BaseModel):
+    job_description: str
+    resumes: List[BulkResume]
+    top_k: Optional[int] = None
+
+
+class JobPosting(BaseModel):
+    job_id: str
+    title: str
+    description: str
+
+
+class JobIndexAddRequest(BaseModel):
+    jobs: List[JobPosting]
+
+
+class JobRankRequest(BaseModel):
+    resume_text: str
+    top_k: int = 10
+
+
+class JobMatch(BaseModel):
+    job_id: str
+    title: str
+    match_percentage: float
+    missing_keywords: List[str]
+
+
+class JobRankResponse(BaseModel):
+    matches: List[JobMatch]
+    total_jobs: int
+
+
 class ChatRequest(BaseModel):
     message: str
     conversation_history: Optional[List[dict]] = []
@@ -146,6 +367,22 @@ class LinkedInAnalyzeResponse(BaseModel):
     strengths: List[str]
 
 
+class LinkedInMultiRoleRequest(BaseModel):
+    profile_text: str
+    roles: Optional[List[str]] = None
+
+
+class LinkedInRoleFit(BaseModel):
+    target_role: str
+    fit_score: float
+    gap_analysis: List[str]
+
+
+class LinkedInMultiRoleResponse(BaseModel):
+    results: List[LinkedInRoleFit]
+    strengths: List[str]
+
+
 # Interview models
 class InterviewStartRequest(BaseModel):
     role: str
@@ -168,19 +405,48 @@ class InterviewSession(BaseModel):
     scores: list = []
 
 
-# Interview sessions storage (in-memory)
-from typing import Dict, Any, List
-interview_sessions: Dict[str, Any] = {}
+# Interview sessions storage, bounded by size and idle time.
+# 'memory' keeps sessions in this process; 'sqlite' shares them across workers and restarts.
+# Created on the first interview request, so workers that never serve one skip it.
+interview_sessions = None
+
+
+def get_interview_sessions():
+    """Return the interview session store, creating it and its sweeper on first use."""
+    global interview_sessions
+    if interview_sessions is None:
+        interview_sessions = create_session_store(
+            backend=os.getenv('INTERVIEW_SESSION_BACKEND', 'memory'),
+            path=os.getenv('INTERVIEW_SESSION_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'interview_sessions.db')),
+            max_bytes=int(os.getenv('INTERVIEW_SESSION_MAX_BYTES', str(64 * 1024 * 1024))),
+            ttl_seconds=float(os.getenv('INTERVIEW_SESSION_TTL', '1800')),
+            sweep_interval=float(os.getenv('INTERVIEW_SESSION_SWEEP_INTERVAL', '60'))
+        )
+        interview_sessions.start()
+    return interview_sessions
+
+
+async def call_session_store(method, *args, **kwargs):
+    """Call a session store method, in a worker thread for stores that block on I/O (sqlite)."""
+    if method.__self__.blocking:
+        return await asyncio.to_thread(method, *args, **kwargs)
+    return method(*args, **kwargs)
+
+# Target size (estimated tokens) of the compacted interview prompt sent each turn
+INTERVIEW_PROMPT_TOKEN_BUDGET = int(os.getenv('INTERVIEW_PROMPT_TOKEN_BUDGET', '3000'))
 
 # Gemini API Configuration for Interview
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-lite:generateContent"
+GEMINI_API_URL = os.getenv(
+    'GEMINI_API_URL', "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-lite:generateContent"
+)
 
 # NVIDIA NIM API Configuration for STT/TTS
 NVIDIA_STT_API_KEY = os.getenv('NVIDIA_STT_API_KEY', '')
 NVIDIA_TTS_API_KEY = os.getenv('NVIDIA_TTS_API_KEY', '')
-NVIDIA_STT_URL = "https://integrate.api.nvidia.com/v1/audio/transcriptions"
-NVIDIA_TTS_URL = "https://integrate.api.nvidia.com/v1/audio/speech"
+NVIDIA_STT_URL = os.getenv('NVIDIA_STT_URL', "https://integrate.api.nvidia.com/v1/audio/transcriptions")
+NVIDIA_TTS_URL = os.getenv('NVIDIA_TTS_URL', "https://integrate.api.nvidia.com/v1/audio/speech")
+TTS_CHUNK_SIZE = 16 * 1024  # bytes forwarded per chunk when streaming TTS audio
 
 if GEMINI_API_KEY:
     print(f"[OK] Gemini API configured for Interview feature")
@@ -194,7 +460,7 @@ if NVIDIA_TTS_API_KEY:
 
 # OpenRouter API Configuration
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_API_URL = os.getenv('OPENROUTER_API_URL', "https://openrouter.ai/api/v1/chat/completions")
 OPENROUTER_MODEL = "openai/gpt-4o-mini"  # Using GPT-4o-mini via OpenRouter
 
 if OPENROUTER_API_KEY and isinstance(OPENROUTER_API_KEY, str):
@@ -208,84 +474,633 @@ else:
     print("[WARNING] OpenRouter API key not available.")
     print("[INFO] Please set OPENROUTER_API_KEY environment variable in Railway dashboard")
 
+# The upstream URLs above can point at stub_upstream.py for offline load tests, where
+# UPSTREAM_TIMEOUT (seconds) shortens every read timeout below
+def upstream_timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(float(os.getenv('UPSTREAM_TIMEOUT', seconds)), connect=10.0)
 
-def load_models():
-    """Load all trained models and preprocessors."""
-    global career_model, skill_gap_model, tfidf_vectorizer, preprocessor
+
+# Shared upstream HTTP clients (one pooled client per provider, created on startup)
+UPSTREAMS = ['openrouter', 'gemini', 'nvidia']
+UPSTREAM_TIMEOUTS = {
+    'chat': upstream_timeout(60.0),
+    'roadmap': upstream_timeout(90.0),
+    'interview': upstream_timeout(60.0),
+    'stt': upstream_timeout(30.0),
+    'tts': upstream_timeout(30.0),
+}
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv('UPSTREAM_MAX_CONNECTIONS', '100'))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv('UPSTREAM_MAX_KEEPALIVE', '20'))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv('UPSTREAM_KEEPALIVE_EXPIRY', '60'))
+
+try:
+    import h2  # type: ignore  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    print("[INFO] h2 not installed; upstream clients will use HTTP/1.1 keep-alive only")
+
+http_clients: Dict[str, httpx.AsyncClient] = {}
+# One TLS context (CA store loaded once) for all upstream clients
+upstream_ssl_context = None
+
+
+def get_upstream_ssl_context():
+    """Return the TLS context shared by the upstream clients, creating it on first use."""
+    global upstream_ssl_context
+    if upstream_ssl_context is None:
+        upstream_ssl_context = httpx.create_ssl_context()
+    return upstream_ssl_context
+
+
+# Metrics label for upstream URLs that share a client (NVIDIA serves both STT and TTS)
+UPSTREAM_URL_PROVIDERS = {
+    NVIDIA_STT_URL: 'nvidia_stt',
+    NVIDIA_TTS_URL: 'nvidia_tts',
+}
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Records latency to response headers, status and in-flight calls per upstream provider."""
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: str):
+        self.transport = transport
+        self.upstream = upstream
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        provider = UPSTREAM_URL_PROVIDERS.get(str(request.url.copy_with(query=None)), self.upstream)
+        UPSTREAM_IN_FLIGHT.inc(provider)
+        status = 'error'
+        start = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        except httpx.TimeoutException:
+            status = 'timeout'
+            raise
+        finally:
+            UPSTREAM_IN_FLIGHT.dec(provider)
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, provider, status)
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def create_http_client(upstream: str) -> httpx.AsyncClient:
+    """Create a pooled keep-alive client (HTTP/2 when h2 is installed)."""
+    transport = httpx.AsyncHTTPTransport(
+        verify=get_upstream_ssl_context(),
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+        )
+    )
+    return httpx.AsyncClient(
+        transport=MeteredTransport(transport, upstream),
+        timeout=httpx.Timeout(60.0, connect=10.0)
+    )
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """Return the shared client for an upstream, creating it if startup has not run."""
+    client = http_clients.get(upstream)
+    if client is None or client.is_closed:
+        client = create_http_client(upstream)
+        http_clients[upstream] = client
+    return client
+
+
+async def close_http_clients():
+    """Close all shared upstream clients."""
+    for client in list(http_clients.values()):
+        await client.aclose()
+    http_clients.clear()
+
+
+class UpstreamStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse relaying a streamed upstream response, which it always closes.
+
+    The body iterator cannot be relied on for this: if the client disconnects before the
+    body starts, the iterator never runs (so its finally block neither), and Starlette
+    skips background tasks when the send fails. Closing here returns the pooled
+    connection in every case.
+    """
+
+    def __init__(self, content, upstream: httpx.Response, **kwargs):
+        super().__init__(content, **kwargs)
+        self.upstream = upstream
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.upstream.aclose()
+
+# Roadmap response cache (LRU + TTL, optional SQLite backing store)
+roadmap_cache = ResponseCache(
+    max_entries=int(os.getenv('ROADMAP_CACHE_SIZE', '512')),
+    ttl_seconds=float(os.getenv('ROADMAP_CACHE_TTL', '86400')),
+    disk_path=os.getenv('ROADMAP_CACHE_PATH') or None
+)
+
+
+# Process-wide BLAS/OpenMP limits set for INFERENCE_BLAS_THREADS, kept to inspect them
+# (inference_thread_limits.get_original_num_threads()) or undo them (restore_original_limits())
+inference_thread_limits = None
+
+
+def apply_inference_thread_policy(model, n_jobs: int = INFERENCE_N_JOBS):
+    """Override every n_jobs parameter of an unpickled estimator (including nested ones) for serving."""
+    if not hasattr(model, 'get_params'):
+        return model
+
+    overrides = {name: n_jobs for name in model.get_params(deep=True) if name.endswith('n_jobs')}
+    if overrides:
+        model.set_params(**overrides)
+
+    # MultiOutputClassifier keeps fitted clones in estimators_, which set_params does not reach
+    for estimator in getattr(model, 'estimators_', []) or []:
+        if hasattr(estimator, 'n_jobs'):
+            estimator.n_jobs = n_jobs
+
+    return model
+
+
+def load_model_artifacts(bundle: ModelBundle):
+    """Load every artifact of a bundle from bundle.path. Raises on the first failure."""
+    from preprocessing import FeaturePreprocessor  # type: ignore
+    from compiled_forest import CompiledForest, COMPILED_FOREST_FILE  # type: ignore
+    from answer_table import AnswerTable  # type: ignore
+    from model_artifacts import CAREER_FOREST_ARTIFACT, artifact_dir, has_artifact, load_pickle  # type: ignore
+    
+    models_dir = bundle.path
+    mmap_mode = 'r' if MODEL_MMAP else None
+    
+    # Load career prediction model (prefer the compiled array-based forest, memory-mapped if exported)
+    shared_forest_path = artifact_dir(models_dir, CAREER_FOREST_ARTIFACT)
+    compiled_forest_path = os.path.join(models_dir, COMPILED_FOREST_FILE)
+    career_model_path = os.path.join(models_dir, 'career_model.pkl')
+    if USE_COMPILED_FOREST and MODEL_MMAP and has_artifact(shared_forest_path):
+        bundle.career_model = CompiledForest.load_mapped(shared_forest_path)
+        print(f"[OK] Mapped compiled career forest from {shared_forest_path}")
+    elif USE_COMPILED_FOREST and os.path.exists(compiled_forest_path):
+        bundle.career_model = CompiledForest.load(compiled_forest_path)
+        print(f"[OK] Loaded compiled career forest from {compiled_forest_path}")
+    elif os.path.exists(career_model_path):
+        bundle.career_model = apply_inference_thread_policy(load_pickle(career_model_path, mmap_mode))
+        print(f"[OK] Loaded career model from {career_model_path}")
+    
+    # Load skill gap model
+    skill_gap_model_path = os.path.join(models_dir, 'skill_gap_model.pkl')
+    if os.path.exists(skill_gap_model_path):
+        bundle.skill_gap_model = apply_inference_thread_policy(load_pickle(skill_gap_model_path, mmap_mode))
+        print(f"[OK] Loaded skill gap model from {skill_gap_model_path}")
+    
+    # Load TF-IDF vectorizer
+    tfidf_path = os.path.join(models_dir, 'tfidf_vectorizer.pkl')
+    if os.path.exists(tfidf_path):
+        bundle.tfidf_vectorizer = load_pickle(tfidf_path, mmap_mode)
+        print(f"[OK] Loaded TF-IDF vectorizer from {tfidf_path}")
+    
+    global inference_thread_limits
+    if INFERENCE_BLAS_THREADS and inference_thread_limits is None:
+        from threadpoolctl import threadpool_limits  # type: ignore
+        # Intentionally never exited: the limit stays in force for the life of the process,
+        # and a model reload does not stack a second one on top
+        inference_thread_limits = threadpool_limits(limits=int(INFERENCE_BLAS_THREADS))
+    print(f"[OK] Inference thread policy: n_jobs={INFERENCE_N_JOBS}, "
+          f"blas_threads={INFERENCE_BLAS_THREADS or 'default'}")
+    
+    # Load preprocessor
+    bundle.preprocessor = FeaturePreprocessor.load_encoders(models_dir)
+    print(f"[OK] Loaded preprocessor from {models_dir}")
+    
+    # Compiled single-row encoder for the /predict-career fast path
+    bundle.inference_encoder = bundle.preprocessor.compile_inference_encoder()
+    
+    # Precomputed answers for the whole input space (only if built from these artifacts)
+    bundle.answer_table = AnswerTable.load(models_dir)
+    if bundle.answer_table is not None:
+        print(f"[OK] Loaded career answer table from {models_dir}")
+
+
+def load_model_bundle(version: str, path: str, strict: bool = False) -> ModelBundle:
+    """
+    Load, verify and warm one model version without touching the bundle being served.
+    
+    Args:
+        version: Version id (UNVERSIONED for a flat models directory)
+        path: Directory holding the version's artifacts
+        strict: Raise on any loading error (hot reloads) instead of serving what loaded
+    """
+    manifest = None
+    if version != UNVERSIONED:
+        manifest = verify_version(path, checksums=MODEL_VERIFY_CHECKSUMS)
+    bundle = ModelBundle(version, path, manifest)
     
     try:
-        # Load career prediction model
-        career_model_path = os.path.join(MODELS_DIR, 'career_model.pkl')
-        if os.path.exists(career_model_path):
-            career_model = joblib.load(career_model_path)
-            print(f"[OK] Loaded career model from {career_model_path}")
-        
-        # Load skill gap model
-        skill_gap_model_path = os.path.join(MODELS_DIR, 'skill_gap_model.pkl')
-        if os.path.exists(skill_gap_model_path):
-            skill_gap_model = joblib.load(skill_gap_model_path)
-            print(f"[OK] Loaded skill gap model from {skill_gap_model_path}")
-        
-        # Load TF-IDF vectorizer
-        tfidf_path = os.path.join(MODELS_DIR, 'tfidf_vectorizer.pkl')
-        if os.path.exists(tfidf_path):
-            tfidf_vectorizer = joblib.load(tfidf_path)
-            print(f"[OK] Loaded TF-IDF vectorizer from {tfidf_path}")
-        
-        # Load preprocessor
-        preprocessor = FeaturePreprocessor.load_encoders(MODELS_DIR)
-        print(f"[OK] Loaded preprocessor from {MODELS_DIR}")
-        
+        load_model_artifacts(bundle)
     except Exception as e:
+        if strict:
+            raise
         print(f"Warning: Error loading models: {e}")
         print("Make sure models are trained first by running train_models.py")
+    
+    if bundle.tfidf_vectorizer is None:
+        get_hashing_matcher(bundle)
+        print("[OK] Using hashing matcher for resume matching (trained TF-IDF vectorizer not found)")
+    
+    registry = get_role_registry(bundle)
+    print(f"[OK] Built role profile registry ({len(registry.roles)} roles)")
+    
+    attach_batchers(bundle)
+    try:
+        warm_bundle(bundle)
+    except Exception as e:
+        if strict:
+            raise
+        print(f"[WARNING] Model warm-up failed: {e}")
+    return bundle
+
+
+def warm_bundle(bundle: ModelBundle):
+    """Run one request's worth of work through every model, so the first real requests are not slower."""
+    profile = (VALID_EDUCATIONS[0], SKILLS_LIST[:2], VALID_INTERESTS[0], 0)
+    if bundle.inference_encoder is not None:
+        X = bundle.inference_encoder.encode_profile(*profile)
+        if bundle.career_model is not None:
+            bundle.career_model.predict_proba(X)
+    if bundle.answer_table is not None:
+        bundle.answer_table.lookup(*profile)
+    text = "Python SQL data analysis"
+    vectorizer = bundle.tfidf_vectorizer if bundle.tfidf_vectorizer is not None else bundle.hashing_matcher
+    vectorizer.transform([text])
+    bundle.role_registry.score_all(bundle.role_registry.vectorizer.transform([text]).tocsr())
+
+
+def activate_bundle(bundle: ModelBundle):
+    """Serve a loaded bundle: one reference swap, plus opening the job index on first use."""
+    global models, job_index, job_index_vectorizer
+    from job_index import JobIndex  # type: ignore
+    
+    if bundle.tfidf_vectorizer is not None:
+        if job_index is None:
+            try:
+                job_index = JobIndex.open(JOB_INDEX_DIR, len(bundle.tfidf_vectorizer.vocabulary_),
+                                          max_delta_rows=JOB_INDEX_MAX_DELTA_ROWS)
+                job_index_vectorizer = bundle.tfidf_vectorizer
+                print(f"[OK] Opened job index at {JOB_INDEX_DIR} ({len(job_index)} jobs)")
+            except (ValueError, OSError) as e:
+                print(f"[WARNING] Job index unavailable: {e}")
+        elif job_index_vectorizer.vocabulary_ != bundle.tfidf_vectorizer.vocabulary_:
+            print(f"[WARNING] Model version {bundle.version} has a new TF-IDF vocabulary. The job index "
+                  f"keeps using the vectorizer it was built with until it is rebuilt (python job_index.py)")
+    
+    models = bundle
+
+
+def load_models():
+    """Load the current model version (CURRENT, or the flat models directory) and serve it."""
+    version, path = resolve_models_dir(MODELS_DIR)
+    if version != UNVERSIONED:
+        print(f"[INFO] Loading model version {version}")
+    activate_bundle(load_model_bundle(version, path))
+
+
+def get_hashing_matcher(bundle: Optional[ModelBundle] = None) -> "HashingMatcher":
+    """Return the bundle's fit-free hashing matcher, loading its IDF statistics on first use."""
+    bundle = bundle or models
+    if bundle.hashing_matcher is None:
+        from hashing_matcher import HashingMatcher  # type: ignore
+        bundle.hashing_matcher = HashingMatcher.load(bundle.path, mmap_mode='r' if MODEL_MMAP else None)
+    return bundle.hashing_matcher
+
+
+async def run_cpu_bound(executor: str, fn, *args):
+    """Run a blocking handler body on the named executor; 503 when its queue is full."""
+    timing = current_timing()
+    if timing is not None and timing.profile_path is not None:
+        # Profiled request (X-Profile header): profile the body where it runs
+        fn, args = run_profiled, (timing.profile_path, fn) + args
+    try:
+        return await cpu_executors[executor].run(fn, *args)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def get_role_registry(bundle: Optional[ModelBundle] = None) -> "RoleProfileRegistry":
+    """Return the bundle's role profile registry, building it from its text vectorizer on first use."""
+    from role_profiles import RoleProfileRegistry  # type: ignore
+    bundle = bundle or models
+    if bundle.role_registry is None:
+        vectorizer = bundle.tfidf_vectorizer if bundle.tfidf_vectorizer is not None else get_hashing_matcher(bundle)
+        bundle.role_registry = RoleProfileRegistry(vectorizer)
+    return bundle.role_registry
+
 
+def validate_career_request(request: CareerPredictionRequest) -> Optional[str]:
+    """Return an error message if the profile is outside the trained input space."""
+    if request.education not in VALID_EDUCATIONS:
+        return f"Invalid education. Must be one of {VALID_EDUCATIONS}"
+    if request.interest not in VALID_INTERESTS:
+        return f"Invalid interest. Must be one of {VALID_INTERESTS}"
+    if not (0 <= request.experience_years <= 5):
+        return "experience_years must be between 0 and 5"
+    return None
 
-def build_tfidf_vectors(source_text: str, target_text: str):
-    """Use the trained vectorizer when available, otherwise fit one for this request."""
-    if tfidf_vectorizer is not None:
-        vectorizer = tfidf_vectorizer
-        source_vec = vectorizer.transform([source_text])
-        target_vec = vectorizer.transform([target_text])
+
+def score_career_profiles(requests: List[CareerPredictionRequest], bundle: ModelBundle):
+    """
+    Score validated profiles with a single feature-matrix build and one predict_proba call.
+    
+    Returns:
+        List of (predicted_role, confidence) tuples in input order
+    """
+    import pandas as pd  # type: ignore
+    with stage('features', FEATURE_BUILD_LATENCY, 'career'):
+        profile_df = pd.DataFrame([{
+            'education': request.education,
+            'skills': ', '.join(request.skills),
+            'interest': request.interest,
+            'experience_years': request.experience_years
+        } for request in requests])
+        X = bundle.preprocessor.create_feature_matrix(profile_df, fit=False)
+    y_pred_proba = run_timed_inference('career', bundle.career_model.predict_proba, X)
+    
+    # predict() is argmax over predict_proba, so derive labels from the same call
+    best = np.argmax(y_pred_proba, axis=1)
+    roles = bundle.preprocessor.target_encoder.inverse_transform(bundle.career_model.classes_[best])
+    confidences = y_pred_proba[np.arange(len(best)), best]
+    
+    return [(str(role), float(conf)) for role, conf in zip(roles, confidences)]
+
+
+def rule_based_career_prediction(request: CareerPredictionRequest):
+    """Rule-based prediction used when the trained models are not available."""
+    interest = request.interest.lower()
+    skills = [skill.lower() for skill in request.skills]
+
+    if 'data' in interest or any('python' in s or 'sql' in s for s in skills):
+        predicted_role = "Data Analyst"
+    elif 'web' in interest or any('javascript' in s or 'html' in s or 'css' in s for s in skills):
+        predicted_role = "Frontend Developer"
+    elif 'business' in interest or any('excel' in s or 'power bi' in s for s in skills):
+        predicted_role = "Business Analyst"
+    elif 'ai' in interest or 'ml' in skills or 'statistics' in skills:
+        predicted_role = "ML Engineer"
     else:
-        vectorizer = TfidfVectorizer(
-            max_features=500,
-            ngram_range=(1, 2),
-            stop_words='english'
-        )
-        source_vec, target_vec = vectorizer.fit_transform([source_text, target_text])
+        predicted_role = "Software Developer"
+
+    return predicted_role, 0.85
+
+
+def iter_batch_predictions(profiles: List[CareerPredictionRequest], bundle: ModelBundle):
+    """
+    Yield NDJSON lines for a batch of profiles, scoring BATCH_CHUNK_SIZE rows per model call.
+    
+    Invalid profiles produce an error line instead of failing the whole batch. Every chunk
+    is scored with the same bundle, even if a new model version is activated mid-stream.
+    """
+    use_model = bundle.career_model is not None and bundle.preprocessor is not None
+
+    for start in range(0, len(profiles), BATCH_CHUNK_SIZE):
+        chunk = profiles[start:start + BATCH_CHUNK_SIZE]
+        results: List[Optional[dict]] = [None] * len(chunk)
+        valid_positions = []
+
+        for pos, profile in enumerate(chunk):
+            error = validate_career_request(profile)
+            if error:
+                results[pos] = {"index": start + pos, "error": error}
+            else:
+                valid_positions.append(pos)
+
+        if valid_positions:
+            valid_profiles = [chunk[pos] for pos in valid_positions]
+            if bundle.answer_table is not None:
+                with stage('lookup', MODEL_INFERENCE_LATENCY, 'career_answer_table'):
+                    scored = [bundle.answer_table.lookup(p.education, p.skills, p.interest, p.experience_years)
+                              for p in valid_profiles]
+            elif use_model:
+                scored = score_career_profiles(valid_profiles, bundle)
+            else:
+                scored = [rule_based_career_prediction(p) for p in valid_profiles]
+            for pos, (role, confidence) in zip(valid_positions, scored):
+                results[pos] = {
+                    "index": start + pos,
+                    "predicted_career": role,
+                    "confidence": confidence
+                }
+
+        yield ''.join(json.dumps(result) + '\n' for result in results)
+
+
+def build_tfidf_vectors(source_text: str, target_text: str, bundle: ModelBundle):
+    """
+    Vectorize two texts with the trained vectorizer, or with the hashing matcher if it is missing.
+    
+    Returns:
+        Tuple of (vocabulary, source_vec, target_vec); pass the vocabulary to
+        get_feature_names() to map column indices back to terms
+    """
+    if bundle.tfidf_vectorizer is not None:
+        vectorizer = bundle.tfidf_vectorizer
+        with stage('tfidf', TFIDF_TRANSFORM_LATENCY, 'resume_match'):
+            source_vec = vectorizer.transform([source_text])
+            target_vec = vectorizer.transform([target_text])
+    else:
+        matcher = get_hashing_matcher(bundle)
+        with stage('tfidf', TFIDF_TRANSFORM_LATENCY, 'resume_match'):
+            source_vec, target_vec = matcher.transform([source_text, target_text])
+        vectorizer = matcher.vocabulary_for(source_text, target_text)
 
     return vectorizer, source_vec, target_vec
 
 
-def get_missing_keywords(source_vec, target_vec, vectorizer, limit: int):
-    """Return the top target keywords that are absent from the source text."""
-    target_tfidf = target_vec.toarray()[0]
-    source_tfidf = source_vec.toarray()[0]
-    feature_names = vectorizer.get_feature_names_out()
-    feature_index = {term: idx for idx, term in enumerate(feature_names)}
+# Background model loading started by startup_event (None when loading inline)
+warmup_task: Optional[asyncio.Task] = None
+# Set by preload_models() in a pre-fork master; workers then skip the warm-up
+models_preloaded = False
+# Polls models/CURRENT for a newly published version (None when reloading is disabled)
+reload_task: Optional[asyncio.Task] = None
+# Writes this worker's metrics to METRICS_DIR (None without METRICS_DIR)
+metrics_task: Optional[asyncio.Task] = None
+model_reload_stats = {"reloads": 0, "failures": 0, "last_error": None, "last_reload_seconds": None}
+
+
+def warm_up():
+    """Load models and import the text-matching modules, off the event loop."""
+    load_models()
+    import sklearn.metrics.pairwise  # type: ignore  # noqa: F401  (used by /resume-match)
+
+
+def preload_models():
+    """
+    Warm up in the current process before workers are forked from it (see prefork.py).
 
-    top_indices = np.argsort(target_tfidf)[::-1]
-    missing_keywords = []
-    for idx in top_indices:
-        if target_tfidf[idx] <= 0:
+    Forked workers inherit the loaded models (and the upstream TLS context) and share
+    their pages copy-on-write instead of each loading a private copy at startup.
+    """
+    global models_preloaded
+    warm_up()
+    get_upstream_ssl_context()
+    models_preloaded = True
+
+
+async def watch_model_versions():
+    """
+    Hot-swap to a new model version when CURRENT changes.
+    
+    The new bundle is loaded, verified and warmed in a worker thread while the old one
+    keeps serving; activation is a single reference swap. Requests already running finish
+    on the bundle they started with. A version that fails to load is logged and skipped
+    until CURRENT changes again.
+    """
+    failed_version = None
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL)
+        if warmup_task is not None and not warmup_task.done():
+            continue
+        try:
+            version = read_current(MODELS_DIR)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARNING] Could not read the current model version: {e}")
             continue
+        if version is None or version == models.version or version == failed_version:
+            continue
+        
+        print(f"[INFO] Loading model version {version} (serving {models.version})")
+        started = time.perf_counter()
+        try:
+            bundle = await asyncio.to_thread(load_model_bundle, version, version_dir(MODELS_DIR, version), True)
+        except Exception as e:
+            failed_version = version
+            model_reload_stats["failures"] += 1
+            model_reload_stats["last_error"] = f"{version}: {e}"
+            print(f"[WARNING] Model version {version} failed to load, still serving {models.version}: {e}")
+            continue
+        
+        activate_bundle(bundle)
+        failed_version = None
+        model_reload_stats["reloads"] += 1
+        model_reload_stats["last_reload_seconds"] = round(time.perf_counter() - started, 3)
+        print(f"[OK] Now serving model version {version}")
+
+
+@app.middleware("http")
+async def wait_for_warmup(request, call_next):
+    """Hold requests to model endpoints until the background warm-up has finished."""
+    if warmup_task is not None and not warmup_task.done() and request.url.path.startswith(MODEL_ENDPOINT_PREFIXES):
+        started = time.perf_counter()
+        try:
+            await asyncio.shield(warmup_task)
+        except Exception:
+            pass  # load_models() reports its own errors; handlers answer as if models were missing
+        record_stage('warmup', time.perf_counter() - started)
+    return await call_next(request)
+
 
-        term = feature_names[idx]
-        term_idx = feature_index[term]
-        if source_tfidf[term_idx] == 0:
-            missing_keywords.append(term)
+def route_template(scope) -> str:
+    """Route path pattern a request matched (e.g. /jobs/{job_id}), to keep metric labels bounded."""
+    route = scope.get('route')
+    if route is None:
+        endpoint = scope.get('endpoint')
+        route = next((r for r in app.routes if getattr(r, 'endpoint', None) is endpoint), None) if endpoint else None
+    return getattr(route, 'path', None) or 'unmatched'
 
-        if len(missing_keywords) >= limit:
-            break
 
-    return missing_keywords
+class MetricsMiddleware:
+    """
+    Records http_request_duration_seconds and http_requests_in_flight.
+    
+    Plain ASGI rather than @app.middleware, so streamed bodies pass through without an extra
+    task per request and the duration covers the whole body.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+        
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route_template(scope), scope['method'], str(status))
+
+
+# Added after wait_for_warmup, so it is outside it and includes the warm-up wait
+app.add_middleware(MetricsMiddleware)
+if SERVER_TIMING_ENABLED:
+    # Endpoints report where they start and end, for the parse/serialize stages. Set before
+    # the routes below are declared; with SERVER_TIMING off they stay plain APIRoutes
+    app.router.route_class = TimedRoute
+    # Outermost, so the request timing exists before the other middleware runs
+    app.add_middleware(ServerTimingMiddleware, profile_token=PROFILE_TOKEN, profile_dir=PROFILE_DIR,
+                       profile_keep=PROFILE_KEEP)
+
+
+async def sync_metrics():
+    """Write this worker's metrics to METRICS_DIR every METRICS_SYNC_INTERVAL seconds."""
+    while True:
+        try:
+            await asyncio.to_thread(metrics.write_snapshot)
+        except OSError as e:
+            print(f"[WARNING] Could not write metrics to {METRICS_DIR}: {e}")
+        await asyncio.sleep(METRICS_SYNC_INTERVAL)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Load models on startup."""
-    load_models()
+    """Start loading models, watching for new model versions and open upstream HTTP clients on startup."""
+    global warmup_task, reload_task, metrics_task
+    if models_preloaded:
+        pass
+    elif WARMUP_IN_BACKGROUND:
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    else:
+        warm_up()
+    if MODEL_RELOAD_INTERVAL > 0:
+        reload_task = asyncio.create_task(watch_model_versions())
+    if METRICS_DIR:
+        metrics_task = asyncio.create_task(sync_metrics())
+    for upstream in UPSTREAMS:
+        get_http_client(upstream)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close upstream HTTP clients and stop background tasks and worker pools on shutdown."""
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    if reload_task is not None:
+        reload_task.cancel()
+    if metrics_task is not None:
+        metrics_task.cancel()
+        metrics.remove_snapshot()
+    if interview_sessions is not None:
+        await interview_sessions.stop()
+    await close_http_clients()
+    bulk_screener.shutdown()
+    for executor in cpu_executors.values():
+        executor.shutdown()
 
 
 @app.get("/")
@@ -296,6 +1111,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/predict-career": "POST - Predict career path based on profile",
+            "/predict-career/batch": "POST - Predict career paths for many profiles (NDJSON stream)",
             "/skill-gap": "POST - Analyze skill gaps for target role",
             "/resume-match": "POST - Match resume with job description",
             "/health": "GET - Check API health status"
@@ -303,23 +1119,64 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: request, stage and upstream latency histograms plus gauges, per worker."""
+    if METRICS_DIR:
+        # Reads the other workers' snapshot files
+        content = await asyncio.to_thread(metrics.render)
+    else:
+        content = metrics.render()
+    return Response(content=content, media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, x_profile: Optional[str] = Header(default=None)):
+    """
+    Text report of a request profile taken with the X-Profile header.
+    
+    Requires the same X-Profile token; the raw cProfile file is <PROFILE_DIR>/<profile_id>.prof
+    (open it with pstats or snakeviz).
+    """
+    if not profile_token_matches(x_profile, PROFILE_TOKEN):
+        raise HTTPException(status_code=404, detail="Not found")
+    report = profile_report(PROFILE_DIR, profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=report, media_type="text/plain")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    models_loaded = all([
-        career_model is not None,
-        skill_gap_model is not None,
-        tfidf_vectorizer is not None,
-        preprocessor is not None
-    ])
+    bundle = models
+    models_loaded = bundle.models_loaded
+    
+    warming_up = warmup_task is not None and not warmup_task.done()
+    if warming_up:
+        status = "warming_up"
+    else:
+        status = "healthy" if models_loaded else "models_not_loaded"
     
     return {
-        "status": "healthy" if models_loaded else "models_not_loaded",
+        "status": status,
         "models_loaded": models_loaded,
-        "career_model": career_model is not None,
-        "skill_gap_model": skill_gap_model is not None,
-        "tfidf_vectorizer": tfidf_vectorizer is not None,
-        "preprocessor": preprocessor is not None
+        "warming_up": warming_up,
+        "model_version": bundle.info(),
+        "model_reload": model_reload_stats,
+        "career_model": bundle.career_model is not None,
+        "skill_gap_model": bundle.skill_gap_model is not None,
+        "tfidf_vectorizer": bundle.tfidf_vectorizer is not None,
+        "preprocessor": bundle.preprocessor is not None,
+        "job_index": job_index.stats() if job_index is not None else None,
+        "bulk_screening": bulk_screener.stats(),
+        "cpu_executors": {name: executor.stats() for name, executor in cpu_executors.items()},
+        "micro_batching": {
+            "enabled": MICRO_BATCH_ENABLED,
+            "career_model": bundle.career_batcher.stats() if bundle.career_batcher is not None else None
+        },
+        "roadmap_cache": roadmap_cache.stats(),
+        "interview_sessions": interview_sessions.stats() if interview_sessions is not None else None
     }
 
 
@@ -338,69 +1195,83 @@ async def predict_career(request: CareerPredictionRequest):
     - predicted_career: Predicted career role
     - confidence: Prediction confidence score (0-1)
     """
+    bundle = models
+    # A profiled request is scored on its own, so its profile does not include other requests' rows
+    if (MICRO_BATCH_ENABLED and bundle.answer_table is None and bundle.career_batcher is not None
+            and bundle.inference_encoder is not None and not profiling_requested()):
+        return await predict_career_batched(request, bundle)
+    return await run_cpu_bound('predict-career', predict_career_sync, request, bundle)
+
+
+async def predict_career_batched(request: CareerPredictionRequest, bundle: ModelBundle) -> CareerPredictionResponse:
+    """Model path of /predict-career, merged with concurrent requests by the micro-batcher."""
     try:
-        # Validate inputs
-        valid_educations = ['BCA', 'BBA', 'BA', 'BSc', 'BCom', 'MBA']
-        valid_interests = ['Data', 'Web', 'Business', 'AI', 'Teaching', 'Sales']
+        with stage('validate'):
+            validation_error = validate_career_request(request)
+        if validation_error:
+            raise HTTPException(status_code=400, detail=validation_error)
         
-        if request.education not in valid_educations:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid education. Must be one of {valid_educations}"
+        with stage('features', FEATURE_BUILD_LATENCY, 'career'):
+            X = bundle.inference_encoder.encode_profile(
+                request.education,
+                request.skills,
+                request.interest,
+                request.experience_years
             )
+        # Waiting for the window plus the shared model call
+        with stage('batch'):
+            y_pred_proba = await bundle.career_batcher.predict(X)
+        best = int(np.argmax(y_pred_proba))
         
-        if request.interest not in valid_interests:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid interest. Must be one of {valid_interests}"
-            )
-        
-        if not (0 <= request.experience_years <= 5):
-            raise HTTPException(
-                status_code=400,
-                detail="experience_years must be between 0 and 5"
-            )
+        return CareerPredictionResponse(
+            predicted_career=str(bundle.preprocessor.target_encoder.classes_[bundle.career_model.classes_[best]]),  # type: ignore
+            confidence=float(y_pred_proba[best])  # type: ignore
+        )
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+
+def predict_career_sync(request: CareerPredictionRequest, bundle: ModelBundle) -> CareerPredictionResponse:
+    """Blocking body of /predict-career, run on the predict-career executor."""
+    try:
+        # Validate inputs
+        with stage('validate'):
+            validation_error = validate_career_request(request)
+        if validation_error:
+            raise HTTPException(status_code=400, detail=validation_error)
+
+        # Precomputed table answers with a single array lookup
+        if bundle.answer_table is not None:
+            with stage('lookup', MODEL_INFERENCE_LATENCY, 'career_answer_table'):
+                predicted_role, confidence = bundle.answer_table.lookup(
+                    request.education,
+                    request.skills,
+                    request.interest,
+                    request.experience_years
+                )
         # If trained models and preprocessor are available, use them
-        if career_model is not None and preprocessor is not None:
-            # Create feature vector
-            skills_str = ', '.join(request.skills)
-            profile_df = pd.DataFrame([{
-                'education': request.education,
-                'skills': skills_str,
-                'interest': request.interest,
-                'experience_years': request.experience_years
-            }])
-            
-            # Preprocess features
-            X = preprocessor.create_feature_matrix(profile_df, fit=False)
+        elif bundle.career_model is not None and bundle.inference_encoder is not None:
+            # Build the feature row without pandas
+            with stage('features', FEATURE_BUILD_LATENCY, 'career'):
+                X = bundle.inference_encoder.encode_profile(
+                    request.education,
+                    request.skills,
+                    request.interest,
+                    request.experience_years
+                )
             
-            # Predict
-            y_pred = career_model.predict(X)[0]
-            y_pred_proba = career_model.predict_proba(X)[0]
+            # Predict (label is the argmax of the same probabilities)
+            y_pred_proba = run_timed_inference('career', bundle.career_model.predict_proba, X)[0]
+            best = int(np.argmax(y_pred_proba))
             
-            # Get predicted role and confidence
-            predicted_role = preprocessor.target_encoder.inverse_transform([y_pred])[0]
-            confidence = float(np.max(y_pred_proba))
+            predicted_role = str(bundle.preprocessor.target_encoder.classes_[bundle.career_model.classes_[best]])
+            confidence = float(y_pred_proba[best])
         else:
             # Fallback: simple rule-based prediction so the feature
             # still works even when models are not trained/deployed.
-            education = request.education.lower()
-            interest = request.interest.lower()
-            skills = [skill.lower() for skill in request.skills]
-
-            if 'data' in interest or any('python' in s or 'sql' in s for s in skills):
-                predicted_role = "Data Analyst"
-            elif 'web' in interest or any('javascript' in s or 'html' in s or 'css' in s for s in skills):
-                predicted_role = "Frontend Developer"
-            elif 'business' in interest or any('excel' in s or 'power bi' in s for s in skills):
-                predicted_role = "Business Analyst"
-            elif 'ai' in interest or 'ml' in skills or 'statistics' in skills:
-                predicted_role = "ML Engineer"
-            else:
-                predicted_role = "Software Developer"
-
-            confidence = 0.85
+            predicted_role, confidence = rule_based_career_prediction(request)
         
         return CareerPredictionResponse(
             predicted_career=predicted_role,  # type: ignore
@@ -411,6 +1282,25 @@ async def predict_career(request: CareerPredictionRequest):
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+@app.post("/predict-career/batch")
+async def predict_career_batch(request: CareerPredictionBatchRequest):
+    """
+    Predict career paths for many profiles in one call.
+    
+    Profiles are featurized and scored in chunks with one predict_proba call per
+    chunk, and results are streamed back as NDJSON (one JSON object per line)
+    so memory stays flat for very large cohorts.
+    
+    Output (per line):
+    - index: Position of the profile in the request
+    - predicted_career / confidence, or error for an invalid profile
+    """
+    return StreamingResponse(
+        iter_batch_predictions(request.profiles, models),
+        media_type="application/x-ndjson"
+    )
+
+
 @app.post("/skill-gap", response_model=SkillGapResponse)
 async def analyze_skill_gap(request: SkillGapRequest):
     """
@@ -483,19 +1373,29 @@ async def match_resume(request: ResumeMatchRequest):
     - match_percentage: Similarity score (0-100)
     - missing_keywords: Important keywords from job description missing in resume
     """
+    return await run_cpu_bound('resume-match', match_resume_sync, request, models)
+
+
+def match_resume_sync(request: ResumeMatchRequest, bundle: ModelBundle) -> ResumeMatchResponse:
+    """Blocking body of /resume-match, run on the resume-match executor."""
+    from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
+    
     try:
         # Vectorize resume and job description
         vectorizer, resume_vec, job_vec = build_tfidf_vectors(
             request.resume_text,
-            request.job_description
+            request.job_description,
+            bundle
         )
         
         # Calculate cosine similarity
-        similarity = cosine_similarity(resume_vec, job_vec)[0][0]
+        with stage('similarity'):
+            similarity = cosine_similarity(resume_vec, job_vec)[0][0]
         match_percentage = float(similarity * 100)
         
         # Extract missing keywords
-        missing_keywords = get_missing_keywords(resume_vec, job_vec, vectorizer, limit=10)
+        with stage('keywords'):
+            missing_keywords = get_missing_keywords(resume_vec, job_vec, vectorizer, limit=10)
         
         return ResumeMatchResponse(
             match_percentage=round(match_percentage, 2),  # type: ignore
@@ -506,6 +1406,211 @@ async def match_resume(request: ResumeMatchRequest):
         raise HTTPException(status_code=500, detail=f"Resume matching error: {str(e)}")
 
 
+@app.post("/resume-match/bulk")
+async def screen_resumes(request: BulkScreenRequest):
+    """
+    Rank many resumes against one job description.
+    
+    The job description is vectorized once; resumes are vectorized and scored in
+    chunks (on a process pool for large uploads).
+    
+    Output (NDJSON, best match first):
+    {"rank": 1, "index": 3, "resume_id": "...", "match_percentage": 74.52, "missing_keywords": [...]}
+    """
+    from sklearn.preprocessing import normalize  # type: ignore
+    
+    if not request.resumes:
+        raise HTTPException(status_code=400, detail="resumes must not be empty")
+    if len(request.resumes) > BULK_SCREEN_MAX_RESUMES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many resumes ({len(request.resumes)}). Maximum per request: {BULK_SCREEN_MAX_RESUMES}"
+        )
+    if request.top_k is not None and request.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    
+    bundle = models
+    if bundle.tfidf_vectorizer is not None:
+        vectorizer = bundle.tfidf_vectorizer
+        vocabulary = None
+    else:
+        vectorizer = get_hashing_matcher(bundle)
+        vocabulary = vectorizer.vocabulary_for(request.job_description)
+    with stage('tfidf', TFIDF_TRANSFORM_LATENCY, 'resume_match_bulk'):
+        job_vec = normalize(vectorizer.transform([request.job_description]), norm='l2')
+    resume_texts = [resume.resume_text for resume in request.resumes]
+    
+    async def ranked_stream():
+        try:
+            results = await bulk_screener.score(vectorizer, job_vec, resume_texts, vocabulary, keyword_limit=10)
+        except Exception as e:
+            yield json.dumps({"error": f"Bulk screening error: {str(e)}"}) + '\n'
+            return
+        
+        results.sort(key=lambda result: (-result[1], result[0]))
+        ranked = results[:request.top_k] if request.top_k else results
+        for start in range(0, len(ranked), BATCH_CHUNK_SIZE):
+            lines = []
+            for rank, (index, similarity, missing_keywords) in enumerate(ranked[start:start + BATCH_CHUNK_SIZE], start + 1):
+                lines.append(json.dumps({
+                    "rank": rank,
+                    "index": index,
+                    "resume_id": request.resumes[index].resume_id,
+                    "match_percentage": round(similarity * 100, 2),
+                    "missing_keywords": missing_keywords
+                }) + '\n')
+            yield ''.join(lines)
+    
+    return StreamingResponse(ranked_stream(), media_type="application/x-ndjson")
+
+
+def require_job_index() -> "JobIndex":
+    """Return the job index or raise 503 if it could not be opened."""
+    if job_index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Job index not available. It requires the trained TF-IDF vectorizer."
+        )
+    return job_index
+
+
+@app.post("/resume-match/jobs", response_model=JobRankResponse)
+async def rank_jobs_for_resume(request: JobRankRequest):
+    """
+    Rank every indexed job description against one resume.
+    
+    Input:
+    - resume_text: Resume text content
+    - top_k: Number of best matches to return (default: 10)
+    
+    Output:
+    - matches: Best jobs first, with match_percentage and missing_keywords
+    - total_jobs: Number of jobs in the index
+    """
+    index = require_job_index()
+    if request.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    
+    return await run_cpu_bound('resume-match', rank_jobs_for_resume_sync, index, job_index_vectorizer, request)
+
+
+def rank_jobs_for_resume_sync(index: "JobIndex", vectorizer, request: JobRankRequest) -> JobRankResponse:
+    """Blocking body of /resume-match/jobs, run on the resume-match executor."""
+    from job_index import JobIndex  # type: ignore
+    
+    try:
+        with stage('tfidf', TFIDF_TRANSFORM_LATENCY, 'resume_match_jobs'):
+            resume_vec = JobIndex.vectorize(vectorizer, [request.resume_text])
+        with stage('search'):
+            ranked = index.search(resume_vec, request.top_k)
+        matches = []
+        with stage('keywords'):
+            for job, similarity, job_vec in ranked:
+                matches.append(JobMatch(
+                    job_id=job['job_id'],
+                    title=job['title'],
+                    match_percentage=round(similarity * 100, 2),
+                    missing_keywords=get_missing_keywords(resume_vec, job_vec, vectorizer, limit=10)
+                ))
+        return JobRankResponse(matches=matches, total_jobs=len(index))
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job ranking error: {str(e)}")
+
+
+@app.post("/jobs")
+async def add_jobs(request: JobIndexAddRequest):
+    """Add job descriptions to the index (an existing job_id is replaced)."""
+    index = require_job_index()
+    jobs = [job.model_dump() for job in request.jobs]
+    added = await run_cpu_bound('job-index', index.add, job_index_vectorizer, jobs)
+    return {"added": added, "total_jobs": len(index)}
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Remove a job description from the index."""
+    index = require_job_index()
+    if not await run_cpu_bound('job-index', index.delete, job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"deleted": job_id, "total_jobs": len(index)}
+
+
+CHAT_HEADERS = {
+    "HTTP-Referer": "https://skillence.app",  # Optional: for analytics
+    "X-Title": "Skillence Career Advisor"  # Optional: for analytics
+}
+
+
+def build_chat_messages(request: ChatRequest) -> List[Dict[str, str]]:
+    """Build the OpenRouter message list: system prompt, last 10 history messages, user message."""
+    messages = [
+        {
+            "role": "system",
+            "content": """You are an AI Career Advisor. Your role is to help users with:
+- Career predictions and recommendations
+- Skill gap analysis and learning paths
+- Resume and job matching advice
+- Career transition guidance
+- Answering questions about career development, skills, and job market trends
+
+Be helpful, professional, and concise. If the user asks about specific features, guide them to use the Profile, Skill Gap, or Resume Match features of this application."""
+        }
+    ]
+    
+    # Add conversation history (last 10 messages for context)
+    hist = request.conversation_history
+    if isinstance(hist, list) and len(hist) > 0:
+        hist_len = len(hist)
+        start_idx = max(0, hist_len - 10)
+        for i in range(start_idx, hist_len):
+            msg = hist[i]
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+            if role in ['user', 'assistant']:
+                messages.append({
+                    "role": role,
+                    "content": content
+                })
+    
+    # Add current user message
+    messages.append({
+        "role": "user",
+        "content": request.message
+    })
+    
+    return messages
+
+
+def openrouter_error(response: httpx.Response) -> HTTPException:
+    """Map a non-200 OpenRouter response to the HTTPException the chat and roadmap endpoints raise."""
+    if response.status_code == 429:
+        return HTTPException(
+            status_code=429,
+            detail="API rate limit exceeded. Please wait a moment and try again."
+        )
+    if response.status_code == 401:
+        return HTTPException(
+            status_code=503,
+            detail="OpenRouter API key is invalid. Please check your API key."
+        )
+    try:
+        error_data = response.json() if response.content else {}
+        error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
+    except ValueError:
+        error_msg = f"HTTP {response.status_code}"
+    return HTTPException(
+        status_code=500,
+        detail=f"Error calling OpenRouter API: {error_msg}"
+    )
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
     """
@@ -526,85 +1631,37 @@ async def chat_with_ai(request: ChatRequest):
     
     try:
         # Build conversation messages for OpenRouter
-        messages = [
-            {
-                "role": "system",
-                "content": """You are an AI Career Advisor. Your role is to help users with:
-- Career predictions and recommendations
-- Skill gap analysis and learning paths
-- Resume and job matching advice
-- Career transition guidance
-- Answering questions about career development, skills, and job market trends
-
-Be helpful, professional, and concise. If the user asks about specific features, guide them to use the Profile, Skill Gap, or Resume Match features of this application."""
-            }
-        ]
-        
-        # Add conversation history (last 10 messages for context)
-        hist = request.conversation_history
-        if isinstance(hist, list) and len(hist) > 0:
-            hist_len = len(hist)
-            start_idx = max(0, hist_len - 10)
-            for i in range(start_idx, hist_len):
-                msg = hist[i]
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                if role in ['user', 'assistant']:
-                    messages.append({
-                        "role": role,
-                        "content": content
-                    })
-        
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
+        messages = build_chat_messages(request)
         
         # Call OpenRouter API
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://skillence.app",  # Optional: for analytics
-                    "X-Title": "Skillence Career Advisor"  # Optional: for analytics
-                },
-                json={
-                    "model": OPENROUTER_MODEL,
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 1000
-                }
-            )
+        client = get_http_client('openrouter')
+        response = await client.post(
+            OPENROUTER_API_URL,
+            timeout=UPSTREAM_TIMEOUTS['chat'],
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json",
+                **CHAT_HEADERS
+            },
+            json={
+                "model": OPENROUTER_MODEL,
+                "messages": messages,
+                "temperature": 0.7,
+                "max_tokens": 1000
+            }
+        )
             
-            if response.status_code == 200:
-                data = response.json()
-                reply = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-                if not reply:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Empty response from AI model"
-                    )
-                return ChatResponse(reply=reply)  # type: ignore
-            elif response.status_code == 429:
-                raise HTTPException(
-                    status_code=429,
-                    detail="API rate limit exceeded. Please wait a moment and try again."
-                )
-            elif response.status_code == 401:
-                raise HTTPException(
-                    status_code=503,
-                    detail="OpenRouter API key is invalid. Please check your API key."
-                )
-            else:
-                error_data = response.json() if response.content else {}
-                error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
+        if response.status_code == 200:
+            data = response.json()
+            reply = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+            if not reply:
                 raise HTTPException(
                     status_code=500,
-                    detail=f"Error calling OpenRouter API: {error_msg}"
+                    detail="Empty response from AI model"
                 )
+            return ChatResponse(reply=reply)  # type: ignore
+        else:
+            raise openrouter_error(response)
         
     except httpx.TimeoutException:
         raise HTTPException(
@@ -620,11 +1677,114 @@ Be helpful, professional, and concise. If the user asks about specific features,
         )
 
 
+@app.post("/api/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """
+    Chat with AI career advisor, streaming the reply as Server-Sent Events.
+    
+    Input: same as /api/chat
+    
+    Output (text/event-stream):
+    - data: {"delta": "..."} for each token chunk as it arrives
+    - event: done, data: {"reply": "<full reply>"} when the completion ends
+    - event: error, data: {"status_code": ..., "detail": "..."} if the upstream fails mid-stream
+    
+    Upstream errors before the first token (rate limit, invalid key, timeout)
+    are returned as regular HTTP errors, mapped the same way as /api/chat.
+    """
+    if not OPENROUTER_API_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="OpenRouter API is not configured. Please set OPENROUTER_API_KEY environment variable."
+        )
+    
+    client = get_http_client('openrouter')
+    upstream_request = client.build_request(
+        "POST",
+        OPENROUTER_API_URL,
+        timeout=UPSTREAM_TIMEOUTS['chat'],
+        headers={
+            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+            **CHAT_HEADERS
+        },
+        json={
+            "model": OPENROUTER_MODEL,
+            "messages": build_chat_messages(request),
+            "temperature": 0.7,
+            "max_tokens": 1000,
+            "stream": True
+        }
+    )
+    
+    try:
+        response = await client.send(upstream_request, stream=True)
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=504,
+            detail="Request timeout. The AI service is taking too long to respond."
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating AI response: {str(e)}")
+    
+    if response.status_code != 200:
+        await response.aread()
+        await response.aclose()
+        raise openrouter_error(response)
+    
+    async def event_stream():
+        reply_parts = []
+        try:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue  # blank separators and ": OPENROUTER PROCESSING" keep-alives
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                chunk = json.loads(payload)
+                if "error" in chunk:
+                    yield sse_event({"status_code": 500, "detail": chunk["error"].get("message", "Upstream error")}, "error")
+                    return
+                delta = chunk.get("choices", [{}])[0].get("delta", {}).get("content") or ""
+                if delta:
+                    reply_parts.append(delta)
+                    yield sse_event({"delta": delta})
+            yield sse_event({"reply": "".join(reply_parts).strip()}, "done")
+        except httpx.TimeoutException:
+            yield sse_event({"status_code": 504, "detail": "Request timeout. The AI service is taking too long to respond."}, "error")
+        except Exception as e:
+            yield sse_event({"status_code": 500, "detail": f"Error generating AI response: {str(e)}"}, "error")
+    
+    return UpstreamStreamingResponse(
+        event_stream(),
+        response,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def normalize_roadmap_request(request: RoadmapSearchRequest) -> dict:
+    """Canonical form of a roadmap request used as the cache key."""
+    def norm(text: Optional[str]) -> str:
+        return ' '.join((text or '').lower().split())
+
+    return {
+        "query": norm(request.query),
+        "current_role": norm(request.current_role),
+        "target_role": norm(request.target_role),
+        "current_skills": sorted({norm(skill) for skill in (request.current_skills or []) if norm(skill)})
+    }
+
+
 @app.post("/api/roadmap-search", response_model=RoadmapSearchResponse)
 async def generate_roadmap(request: RoadmapSearchRequest):
     """
     Generate a personalized career roadmap using OpenRouter API.
     
+    Responses are cached on the normalized request, and concurrent identical
+    requests share a single upstream call.
+    
     Input:
     - query: User's search query or career transition request
     - current_role: User's current role (optional)
@@ -642,6 +1802,17 @@ async def generate_roadmap(request: RoadmapSearchRequest):
             detail="OpenRouter API is not configured. Please set OPENROUTER_API_KEY environment variable."
         )
     
+    async def compute():
+        roadmap = await fetch_roadmap(request)
+        return roadmap.model_dump()
+    
+    cache_key = make_cache_key(normalize_roadmap_request(request))
+    data = await roadmap_cache.get_or_compute(cache_key, compute)
+    return RoadmapSearchResponse(**data)
+
+
+async def fetch_roadmap(request: RoadmapSearchRequest) -> RoadmapSearchResponse:
+    """Call OpenRouter for a roadmap (uncached)."""
     try:
         # Build prompt for roadmap generation
         user_query = f"""Generate a detailed, actionable career roadmap for the following scenario:
@@ -701,72 +1872,58 @@ Return ONLY the JSON, no additional text or markdown formatting."""
         ]
         
         # Call OpenRouter API
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            response = await client.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://skillence.app",
-                    "X-Title": "Skillence Career Advisor"
-                },
-                json={
-                    "model": OPENROUTER_MODEL,
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 2000,
-                    "response_format": {"type": "json_object"}  # Request JSON response
-                }
-            )
+        client = get_http_client('openrouter')
+        response = await client.post(
+            OPENROUTER_API_URL,
+            timeout=UPSTREAM_TIMEOUTS['roadmap'],
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://skillence.app",
+                "X-Title": "Skillence Career Advisor"
+            },
+            json={
+                "model": OPENROUTER_MODEL,
+                "messages": messages,
+                "temperature": 0.7,
+                "max_tokens": 2000,
+                "response_format": {"type": "json_object"}  # Request JSON response
+            }
+        )
             
-            if response.status_code == 200:
-                data = response.json()
-                reply = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+        if response.status_code == 200:
+            data = response.json()
+            reply = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
                 
-                if not reply:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Empty response from AI model"
-                    )
-                
-                # Extract JSON from response (in case there's extra text)
-                import re
-                json_match = re.search(r'\{.*\}', reply, re.DOTALL)
-                if json_match:
-                    roadmap_data = json.loads(json_match.group())
-                else:
-                    # Fallback: try to parse the entire response
-                    roadmap_data = json.loads(reply)
-                
-                # Structure the response
-                steps = roadmap_data.get('steps', [])
-                
-                return RoadmapSearchResponse(
-                    roadmap={  # type: ignore
-                        "title": roadmap_data.get('title', 'Career Roadmap'),
-                        "description": roadmap_data.get('description', ''),
-                        "timeline": roadmap_data.get('timeline', '')
-                    },
-                    steps=steps,  # type: ignore
-                    timeline=roadmap_data.get('timeline', '3-6 months')  # type: ignore
-                )
-            elif response.status_code == 429:
-                raise HTTPException(
-                    status_code=429,
-                    detail="API rate limit exceeded. Please wait a moment and try again."
-                )
-            elif response.status_code == 401:
-                raise HTTPException(
-                    status_code=503,
-                    detail="OpenRouter API key is invalid. Please check your API key."
-                )
-            else:
-                error_data = response.json() if response.content else {}
-                error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
+            if not reply:
                 raise HTTPException(
                     status_code=500,
-                    detail=f"Error calling OpenRouter API: {error_msg}"
+                    detail="Empty response from AI model"
                 )
+                
+            # Extract JSON from response (in case there's extra text)
+            import re
+            json_match = re.search(r'\{.*\}', reply, re.DOTALL)
+            if json_match:
+                roadmap_data = json.loads(json_match.group())
+            else:
+                # Fallback: try to parse the entire response
+                roadmap_data = json.loads(reply)
+                
+            # Structure the response
+            steps = roadmap_data.get('steps', [])
+                
+            return RoadmapSearchResponse(
+                roadmap={  # type: ignore
+                    "title": roadmap_data.get('title', 'Career Roadmap'),
+                    "description": roadmap_data.get('description', ''),
+                    "timeline": roadmap_data.get('timeline', '')
+                },
+                steps=steps,  # type: ignore
+                timeline=roadmap_data.get('timeline', '3-6 months')  # type: ignore
+            )
+        else:
+            raise openrouter_error(response)
         
     except httpx.TimeoutException:
         raise HTTPException(
@@ -793,8 +1950,6 @@ Return ONLY the JSON, no additional text or markdown formatting."""
 
 import uuid
 from fastapi import UploadFile, File, Form  # type: ignore
-from fastapi.responses import StreamingResponse  # type: ignore
-import io
 import base64
 
 
@@ -884,29 +2039,30 @@ async def call_interview_llm(messages: List[Dict[str, str]]) -> str:
     # Try OpenRouter first
     if OPENROUTER_API_KEY:
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://skillence.app",
-                        "X-Title": "Skillence AI Interviewer"
-                    },
-                    json={
-                        "model": OPENROUTER_MODEL,
-                        "messages": openrouter_messages,
-                        "temperature": 0.7,
-                        "max_tokens": 1000,
-                        "response_format": {"type": "json_object"}
-                    }
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    reply = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-                    if reply:
-                        return reply
-                print(f"[WARNING] OpenRouter failed ({response.status_code}), falling back to Gemini")
+            client = get_http_client('openrouter')
+            response = await client.post(
+                OPENROUTER_API_URL,
+                timeout=UPSTREAM_TIMEOUTS['interview'],
+                headers={
+                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://skillence.app",
+                    "X-Title": "Skillence AI Interviewer"
+                },
+                json={
+                    "model": OPENROUTER_MODEL,
+                    "messages": openrouter_messages,
+                    "temperature": 0.7,
+                    "max_tokens": 1000,
+                    "response_format": {"type": "json_object"}
+                }
+            )
+            if response.status_code == 200:
+                data = response.json()
+                reply = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+                if reply:
+                    return reply
+            print(f"[WARNING] OpenRouter failed ({response.status_code}), falling back to Gemini")
         except Exception as e:
             print(f"[WARNING] OpenRouter error: {e}, falling back to Gemini")
 
@@ -917,22 +2073,23 @@ async def call_interview_llm(messages: List[Dict[str, str]]) -> str:
             role = "user" if msg["role"] == "user" else "model"
             contents.append({"role": role, "parts": [{"text": msg["content"]}]})
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-                json={
-                    "contents": contents,
-                    "generationConfig": {
-                        "temperature": 0.7,
-                        "maxOutputTokens": 1000,
-                        "responseMimeType": "application/json"
-                    }
+        client = get_http_client('gemini')
+        response = await client.post(
+            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+            timeout=UPSTREAM_TIMEOUTS['interview'],
+            json={
+                "contents": contents,
+                "generationConfig": {
+                    "temperature": 0.7,
+                    "maxOutputTokens": 1000,
+                    "responseMimeType": "application/json"
                 }
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data["candidates"][0]["content"]["parts"][0]["text"]
-            raise Exception(f"Gemini API error {response.status_code}: {response.text}")
+            }
+        )
+        if response.status_code == 200:
+            data = response.json()
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+        raise Exception(f"Gemini API error {response.status_code}: {response.text}")
 
     raise Exception("No LLM API key configured. Set OPENROUTER_API_KEY or GEMINI_API_KEY.")
 
@@ -956,17 +2113,18 @@ async def start_interview(request: InterviewStartRequest):
         result = json.loads(reply)
 
         # Store session
-        interview_sessions[session_id] = {
-            "role": request.role,
-            "level": request.level,
-            "tech_stack": request.tech_stack,
-            "question_count": 1,
-            "system_prompt": system_prompt,
-            "conversation": [
-                {"role": "user", "content": messages[0]["content"]},
-                {"role": "assistant", "content": reply}
+        await call_session_store(
+            get_interview_sessions().create,
+            session_id,
+            role=request.role,
+            level=request.level,
+            tech_stack=request.tech_stack,
+            question_count=1,
+            conversation=[
+                ("user", messages[0]["content"]),
+                ("assistant", reply)
             ]
-        }
+        )
 
         return {"session_id": session_id, "response": result}
 
@@ -982,12 +2140,14 @@ async def submit_interview_answer(request: InterviewAnswerRequest):
     if not OPENROUTER_API_KEY and not GEMINI_API_KEY:
         raise HTTPException(status_code=503, detail="No LLM API key configured.")
 
-    session = interview_sessions.get(request.session_id)
+    sessions = get_interview_sessions()
+    session = await call_session_store(sessions.get, request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Interview session not found.")
 
-    session["question_count"] += 1
-    is_final = session["question_count"] > 6  # End after 6 questions
+    question_count = session.question_count + 1
+    await call_session_store(sessions.set_question_count, request.session_id, question_count)
+    is_final = question_count > 6  # End after 6 questions
 
     user_msg = f"Candidate's answer: {request.answer}"
     if is_final:
@@ -995,18 +2155,29 @@ async def submit_interview_answer(request: InterviewAnswerRequest):
     else:
         user_msg += "\n\nEvaluate this answer and ask the next question. Return JSON only."
 
-    session["conversation"].append({"role": "user", "content": user_msg})
+    conversation = session.messages() + [{"role": "user", "content": user_msg}]
+    await call_session_store(sessions.append_message, request.session_id, "user", user_msg)
+
+    # Send the system prompt once and summarize earlier turns to bound prompt size
+    system_prompt = build_interview_system_prompt(session.role, session.level, session.tech_stack)
+    prompt_messages, prompt_tokens = compact_interview_conversation(
+        system_prompt,
+        conversation,
+        token_budget=INTERVIEW_PROMPT_TOKEN_BUDGET
+    )
+    print(f"[INFO] Interview prompt compacted: {prompt_tokens['tokens_before']} -> "
+          f"{prompt_tokens['tokens_after']} tokens (question {question_count})")
 
     try:
-        reply = await call_interview_llm(session["conversation"])
-        session["conversation"].append({"role": "assistant", "content": reply})
+        reply = await call_interview_llm(prompt_messages)
+        await call_session_store(sessions.append_message, request.session_id, "assistant", reply)
         result = json.loads(reply)
 
         if result.get("type") == "final_report":
             # Clean up session after final report
-            interview_sessions.pop(request.session_id, None)
+            await call_session_store(sessions.delete, request.session_id)
 
-        return {"response": result, "question_number": session.get("question_count", 0)}
+        return {"response": result, "question_number": question_count, "prompt_tokens": prompt_tokens}
 
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Failed to parse interview response")
@@ -1023,26 +2194,27 @@ async def speech_to_text(audio: UploadFile = File(...)):
     try:
         audio_bytes = await audio.read()
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                NVIDIA_STT_URL,
-                headers={
-                    "Authorization": f"Bearer {NVIDIA_STT_API_KEY}",
-                },
-                files={
-                    "file": (audio.filename or "audio.wav", audio_bytes, audio.content_type or "audio/wav"),
-                },
-                data={
-                    "model": "nvidia/parakeet-ctc-1.1b-asr",
-                    "language": "en",
-                }
-            )
+        client = get_http_client('nvidia')
+        response = await client.post(
+            NVIDIA_STT_URL,
+            timeout=UPSTREAM_TIMEOUTS['stt'],
+            headers={
+                "Authorization": f"Bearer {NVIDIA_STT_API_KEY}",
+            },
+            files={
+                "file": (audio.filename or "audio.wav", audio_bytes, audio.content_type or "audio/wav"),
+            },
+            data={
+                "model": "nvidia/parakeet-ctc-1.1b-asr",
+                "language": "en",
+            }
+        )
 
-            if response.status_code == 200:
-                data = response.json()
-                return {"text": data.get("text", "")}
-            else:
-                raise HTTPException(status_code=500, detail=f"NVIDIA STT error: {response.text}")
+        if response.status_code == 200:
+            data = response.json()
+            return {"text": data.get("text", "")}
+        else:
+            raise HTTPException(status_code=500, detail=f"NVIDIA STT error: {response.text}")
 
     except HTTPException:
         raise
@@ -1052,40 +2224,55 @@ async def speech_to_text(audio: UploadFile = File(...)):
 
 @app.post("/api/interview/tts")
 async def text_to_speech(text: str = Form(...)):
-    """Convert text to speech using NVIDIA NIM TTS API."""
+    """
+    Convert text to speech using NVIDIA NIM TTS API.
+    
+    The upstream audio body is passed through chunk by chunk, so playback can
+    start on the first chunk and memory stays constant regardless of clip length.
+    """
     if not NVIDIA_TTS_API_KEY:
         raise HTTPException(status_code=503, detail="NVIDIA TTS API key not configured.")
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                NVIDIA_TTS_URL,
-                headers={
-                    "Authorization": f"Bearer {NVIDIA_TTS_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "nvidia/fastpitch-hifigan-tts",
-                    "input": text,
-                    "voice": "English-US.Female-1",
-                    "response_format": "mp3",
-                }
-            )
+        client = get_http_client('nvidia')
+        upstream_request = client.build_request(
+            "POST",
+            NVIDIA_TTS_URL,
+            timeout=UPSTREAM_TIMEOUTS['tts'],
+            headers={
+                "Authorization": f"Bearer {NVIDIA_TTS_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": "nvidia/fastpitch-hifigan-tts",
+                "input": text,
+                "voice": "English-US.Female-1",
+                "response_format": "mp3",
+            }
+        )
+        response = await client.send(upstream_request, stream=True)
 
-            if response.status_code == 200:
-                return StreamingResponse(
-                    io.BytesIO(response.content),
-                    media_type="audio/mpeg",
-                    headers={"Content-Disposition": "inline; filename=speech.mp3"}
-                )
-            else:
-                raise HTTPException(status_code=500, detail=f"NVIDIA TTS error: {response.text}")
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+            raise HTTPException(status_code=500, detail=f"NVIDIA TTS error: {response.text}")
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
 
+    async def audio_stream():
+        async for chunk in response.aiter_bytes(TTS_CHUNK_SIZE):
+            yield chunk
+
+    return UpstreamStreamingResponse(
+        audio_stream(),
+        response,
+        media_type="audio/mpeg",
+        headers={"Content-Disposition": "inline; filename=speech.mp3"}
+    )
+
 
 @app.post("/api/compare-careers", response_model=CompareCareersResponse)
 async def compare_careers(request: CompareCareersRequest):
@@ -1130,38 +2317,81 @@ async def compare_careers(request: CompareCareersRequest):
     return CompareCareersResponse(comparison_data=comparisons)  # type: ignore
 
 
+def vectorize_profile(registry: "RoleProfileRegistry", profile_text: str):
+    """Vectorize a profile once and list its strengths (first 5 terms alphabetically)."""
+    from role_profiles import text_vocabulary  # type: ignore
+    with stage('tfidf', TFIDF_TRANSFORM_LATENCY, 'linkedin_analyze'):
+        profile_vec = registry.vectorizer.transform([profile_text]).tocsr()
+    feature_names = get_feature_names(text_vocabulary(registry.vectorizer, profile_text))
+    # Feature names are in alphabetical order, so this matches a scan of the dense row
+    profile_terms = profile_vec.indices[profile_vec.data > 0]
+    strengths = sorted(str(term) for term in feature_names[profile_terms])[:5]
+    return profile_vec, strengths
+
+
+def linkedin_fit_score(similarity: float) -> float:
+    """Map cosine similarity to a 0-100 fit score (boosted for typical texts)."""
+    return round(min(float(similarity * 150), 100.0), 2)
+
+
 @app.post("/api/linkedin-analyze", response_model=LinkedInAnalyzeResponse)
 async def analyze_linkedin(request: LinkedInAnalyzeRequest):
     """Analyze LinkedIn profile text against a target role."""
-    target_role_descriptions = {
-        'Data Analyst': "Looking for a Data Analyst with skills in Python, SQL, Excel, Data Visualization, Tableau, Power BI, Statistics.",
-        'Software Engineer': "Software Engineer needed with experience in Python, Java, JavaScript, React, System Design, Algorithms, Git, Database.",
-        'Backend Developer': "Backend developer familiar with Python, FastAPI, Node.js, SQL, NoSQL, APIs, Docker.",
-        'Frontend Developer': "Frontend developer proficient in HTML, CSS, JavaScript, React, UI/UX, responsive design.",
-        'ML Engineer': "Machine Learning Engineer with strong Python, TensorFlow, PyTorch, scikit-learn, Statistics, model deployment."
-    }
+    return await run_cpu_bound('linkedin-analyze', analyze_linkedin_sync, request)
+
+
+def analyze_linkedin_sync(request: LinkedInAnalyzeRequest) -> LinkedInAnalyzeResponse:
+    """Blocking body of /api/linkedin-analyze, run on the linkedin-analyze executor."""
+    try:
+        registry = get_role_registry()
+        role = registry.get(request.target_role)
+        profile_vec, strengths = vectorize_profile(registry, request.profile_text)
+        
+        with stage('scoring'):
+            fit_score = linkedin_fit_score(role.similarity(profile_vec))
+            gap_analysis = role.missing_terms(profile_vec, limit=8)
+        return LinkedInAnalyzeResponse(
+            fit_score=fit_score,  # type: ignore
+            gap_analysis=gap_analysis,  # type: ignore
+            strengths=strengths  # type: ignore
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"LinkedIn analysis error: {str(e)}")
+
+
+@app.post("/api/linkedin-analyze/roles", response_model=LinkedInMultiRoleResponse)
+async def analyze_linkedin_roles(request: LinkedInMultiRoleRequest):
+    """
+    Score one LinkedIn profile against many roles at once, best fit first.
     
-    job_desc = target_role_descriptions.get(request.target_role, f"Looking for {request.target_role} with relevant industry skills, communication, and technical expertise.")
+    Input:
+    - profile_text: LinkedIn profile text
+    - roles: Roles to compare (default: every role with a registered description)
+    """
+    if request.roles is not None and not request.roles:
+        raise HTTPException(status_code=400, detail="roles must not be empty")
     
+    return await run_cpu_bound('linkedin-analyze', analyze_linkedin_roles_sync, request)
+
+
+def analyze_linkedin_roles_sync(request: LinkedInMultiRoleRequest) -> LinkedInMultiRoleResponse:
+    """Blocking body of /api/linkedin-analyze/roles, run on the linkedin-analyze executor."""
     try:
-        vectorizer, resume_vec, job_vec = build_tfidf_vectors(request.profile_text, job_desc)
+        registry = get_role_registry()
+        profile_vec, strengths = vectorize_profile(registry, request.profile_text)
         
-        similarity = cosine_similarity(resume_vec, job_vec)[0][0]
-        match_percentage = min(float(similarity * 150), 100.0)  # Boost scaling for typical texts
+        with stage('scoring'):
+            results = [
+                LinkedInRoleFit(
+                    target_role=role.role,
+                    fit_score=linkedin_fit_score(similarity),
+                    gap_analysis=role.missing_terms(profile_vec, limit=8)
+                )
+                for role, similarity in registry.score_all(profile_vec, request.roles)
+            ]
+        results.sort(key=lambda result: -result.fit_score)
         
-        resume_tfidf = resume_vec.toarray()[0]
-        feature_names = vectorizer.get_feature_names_out()
-        missing_keywords = get_missing_keywords(resume_vec, job_vec, vectorizer, limit=8)
-        strengths = []
-        for idx, term in enumerate(feature_names):
-            if resume_tfidf[idx] > 0:
-                strengths.append(term)
-                    
-        return LinkedInAnalyzeResponse(
-            fit_score=round(match_percentage, 2),  # type: ignore
-            gap_analysis=missing_keywords,  # type: ignore
-            strengths=strengths[:5]  # type: ignore
-        )
+        return LinkedInMultiRoleResponse(results=results, strengths=strengths)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LinkedIn analysis error: {str(e)}")
 
@@ -0,0 +1,553 @@
+"""
+Serving Benchmarks
+Load benchmarks for the inference paths used by api.py.
+
+Usage:
+    python benchmark.py threads [--concurrency 16] [--requests 50]
+    python benchmark.py job-index [--jobs 50000] [--top-k 10]
+    python benchmark.py mixed [--cpu-clients 4] [--streams 20] [--duration 5]
+    python benchmark.py microbatch [--concurrency 64] [--requests 50]
+    python benchmark.py import-time [--budget-ms 1000] [--repeat 5]
+    python benchmark.py rss [--workers 4] [--port 8765]
+    python benchmark.py upstream [--concurrency 16] [--requests 20] [--latency lognormal:300,0.5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+import joblib
+from concurrent.futures import ThreadPoolExecutor
+
+MODELS_DIR = 'ml/models'
+
+
+def percentile_summary(latencies_ms) -> str:
+    """Format p50/p95/p99 of a list of latencies in milliseconds."""
+    lat = np.asarray(latencies_ms)
+    return (f"p50={np.percentile(lat, 50):8.2f}  p95={np.percentile(lat, 95):8.2f}  "
+            f"p99={np.percentile(lat, 99):8.2f}")
+
+
+def run_concurrent(fn, concurrency: int, requests_per_worker: int):
+    """
+    Call fn() from `concurrency` threads, `requests_per_worker` times each.
+
+    Returns:
+        Tuple of (per-call latencies in ms, wall-clock seconds)
+    """
+    def worker():
+        latencies = []
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return [lat for worker_lat in results for lat in worker_lat], elapsed
+
+
+def benchmark_threads(args):
+    """
+    Compare concurrent one-row predicts with training-time (n_jobs=-1) vs serving-time parallelism.
+    """
+    from api import apply_inference_thread_policy  # type: ignore
+
+    X = np.zeros((1, 13))
+    models = {
+        'career_model': os.path.join(MODELS_DIR, 'career_model.pkl'),
+        'skill_gap_model': os.path.join(MODELS_DIR, 'skill_gap_model.pkl'),
+    }
+
+    print("="*78)
+    print(f"THREAD POLICY: {args.concurrency} concurrent callers x {args.requests} one-row predicts")
+    print("="*78)
+
+    for name, path in models.items():
+        for n_jobs in (-1, args.n_jobs):
+            model = apply_inference_thread_policy(joblib.load(path), n_jobs=n_jobs)
+            model.predict_proba(X)  # warm-up
+
+            latencies, elapsed = run_concurrent(
+                lambda: model.predict_proba(X), args.concurrency, args.requests
+            )
+            throughput = len(latencies) / elapsed
+            print(f"{name:<16} n_jobs={n_jobs:<3} {throughput:8.1f} req/s  {percentile_summary(latencies)} ms")
+
+
+def benchmark_job_index(args):
+    """
+    Rank one resume against a synthetic job corpus with the memory-mapped job index.
+    """
+    import random
+    import tempfile
+    from job_index import JobIndex
+
+    vectorizer = joblib.load(os.path.join(MODELS_DIR, 'tfidf_vectorizer.pkl'))
+    vocabulary = list(vectorizer.vocabulary_)
+    rng = random.Random(0)
+    jobs = [
+        {'job_id': str(i), 'title': f"Job {i}", 'description': ' '.join(rng.choices(vocabulary, k=40))}
+        for i in range(args.jobs)
+    ]
+    resume = ' '.join(rng.choices(vocabulary, k=60))
+
+    print("="*78)
+    print(f"JOB INDEX: rank 1 resume against {args.jobs} jobs, top_k={args.top_k}")
+    print("="*78)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = JobIndex.open(index_dir, len(vocabulary), max_delta_rows=args.jobs + 1)
+        start = time.perf_counter()
+        index.add(vectorizer, jobs)
+        index.compact()
+        print(f"build:  {time.perf_counter() - start:8.2f} s  ({index.base.nnz} non-zeros)")
+
+        index = JobIndex.open(index_dir, len(vocabulary))
+        resume_vec = JobIndex.vectorize(vectorizer, [resume])
+        latencies = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            index.search(resume_vec, args.top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"search: {percentile_summary(latencies)} ms")
+
+        start = time.perf_counter()
+        index.add(vectorizer, jobs[:1])
+        index.delete(jobs[1]['job_id'])
+        print(f"incremental add + delete: {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+
+def benchmark_mixed(args):
+    """
+    Mixed traffic against the ASGI app: CPU-heavy /resume-match calls alongside simulated
+    LLM streams (coroutines expecting a chunk every --tick-ms). Compares handlers run
+    inline on the event loop with handlers dispatched to the CPU executors.
+    """
+    import asyncio
+    import random
+    import httpx
+    import api  # type: ignore
+    from cpu_executor import BoundedExecutor
+
+    api.load_models()
+    vectorizer = api.models.tfidf_vectorizer
+    vocabulary = list(vectorizer.vocabulary_) if vectorizer is not None else ['python', 'sql']
+    rng = random.Random(0)
+    payload = {
+        'resume_text': ' '.join(rng.choices(vocabulary, k=args.resume_words)),
+        'job_description': ' '.join(rng.choices(vocabulary, k=200))
+    }
+
+    async def cpu_client(client, deadline, latencies):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post('/resume-match', json=payload)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def llm_stream(deadline, lateness):
+        tick = args.tick_ms / 1000
+        while time.perf_counter() < deadline:
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            lateness.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    async def run(kind):
+        api.cpu_executors['resume-match'] = BoundedExecutor('resume-match', kind=kind,
+                                                            max_workers=args.workers, max_queue=1024)
+        cpu_latencies, lateness = [], []
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            deadline = time.perf_counter() + args.duration
+            # Streams are scheduled first so they are already waiting when CPU work starts
+            await asyncio.gather(
+                *(llm_stream(deadline, lateness) for _ in range(args.streams)),
+                *(cpu_client(client, deadline, cpu_latencies) for _ in range(args.cpu_clients))
+            )
+        api.cpu_executors['resume-match'].shutdown()
+        print(f"{kind:<7} cpu: {len(cpu_latencies) / args.duration:7.1f} req/s  {percentile_summary(cpu_latencies)} ms")
+        print(f"{'':<7} stream tick lateness: {percentile_summary(lateness)}  max={max(lateness):8.2f} ms")
+
+    print("="*78)
+    print(f"MIXED TRAFFIC: {args.cpu_clients} CPU clients ({args.resume_words}-word resumes) + "
+          f"{args.streams} streams, {args.duration}s")
+    print("="*78)
+    for kind in ('inline', 'thread'):
+        asyncio.run(run(kind))
+
+
+def benchmark_microbatch(args):
+    """
+    Concurrent one-row predicts through the micro-batcher vs one model call per request,
+    for career_model.
+    """
+    import asyncio
+    import api  # type: ignore
+    from micro_batcher import MicroBatcher
+
+    api.load_models()
+    rng = np.random.default_rng(0)
+    rows = rng.random((256, 13))
+
+    async def drive(predict_one):
+        latencies = []
+
+        async def client(worker):
+            for i in range(args.requests):
+                start = time.perf_counter()
+                await predict_one(rows[(worker + i) % len(rows)])
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(worker) for worker in range(args.concurrency)))
+        return latencies, time.perf_counter() - start
+
+    async def run(name, predict_fn):
+        unbatched, elapsed = await drive(lambda row: api.run_model_batch(predict_fn, row.reshape(1, -1)))
+        print(f"{name:<16} unbatched {len(unbatched) / elapsed:8.1f} req/s  {percentile_summary(unbatched)} ms")
+
+        batcher = MicroBatcher(name, predict_fn, max_batch_size=args.max_batch_size,
+                               max_wait_ms=args.max_wait_ms, runner=api.run_model_batch)
+        batched, elapsed = await drive(batcher.predict)
+        stats = batcher.stats()
+        print(f"{name:<16} batched   {len(batched) / elapsed:8.1f} req/s  {percentile_summary(batched)} ms")
+        print(f"{'':<16} avg batch {stats['avg_batch_size']}, window {stats['window_ms']} ms, "
+              f"histogram {stats['batch_size_histogram']}")
+
+    print("="*78)
+    print(f"MICRO-BATCHING: {args.concurrency} concurrent clients x {args.requests} one-row predicts")
+    print("="*78)
+    bundle = api.models
+    asyncio.run(run('career_model', bundle.career_model.predict_proba))
+
+
+# Modules api.py must not import at startup (they load in the background warm-up)
+DEFERRED_MODULES = ('pandas', 'sklearn', 'scipy', 'joblib')
+# Cold-start budget for import api
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '1000'))
+
+
+def measure_import(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Tuple of (cumulative import time of module in ms, {module name: cumulative ms})
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=script_dir + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', f'import {module}'],
+        cwd=script_dir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.setdefault(name.strip(), int(cumulative) / 1000)
+    return modules[module], modules
+
+
+def check_import_time(module: str = 'api', budget_ms: float = IMPORT_TIME_BUDGET_MS, repeat: int = 5):
+    """
+    Measure the cold-start import time of module and check it against the budget.
+
+    Returns:
+        Tuple of (list of per-run import times in ms, modules of the fastest run,
+        list of failure messages; empty when within budget)
+    """
+    runs = [measure_import(module) for _ in range(repeat)]
+    best_ms, modules = min(runs, key=lambda run: run[0])
+
+    failures = []
+    eager = sorted(name for name in DEFERRED_MODULES if name in modules)
+    if eager:
+        failures.append(f"deferred modules imported at startup: {', '.join(eager)}")
+    if best_ms > budget_ms:
+        failures.append(f"import time {best_ms:.1f} ms exceeds budget {budget_ms:.0f} ms")
+    return [run[0] for run in runs], modules, failures
+
+
+def benchmark_import_time(args):
+    """
+    Cold-start import time of api.py, failing (exit code 1) when it exceeds the budget
+    or when a deferred heavy dependency is imported at module load.
+    ml/tests/test_import_time.py runs the same check in the test suite.
+    """
+    print("="*78)
+    print(f"IMPORT TIME: import {args.module} (best of {args.repeat}, budget {args.budget_ms:.0f} ms)")
+    print("="*78)
+
+    times_ms, modules, failures = check_import_time(args.module, args.budget_ms, args.repeat)
+    print(f"import {args.module}: best={min(times_ms):8.1f} ms  median={np.median(times_ms):8.1f} ms")
+
+    top_level = {name: ms for name, ms in modules.items() if '.' not in name and name != args.module}
+    print("\nSlowest top-level imports:")
+    for name, ms in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28} {ms:8.1f} ms")
+
+    if failures:
+        for failure in failures:
+            print(f"\n[FAIL] {failure}")
+        sys.exit(1)
+    print("\n[OK] Import time within budget")
+
+
+def benchmark_rss(args):
+    """
+    Memory per worker of prefork.py with models preloaded in the master vs loaded by each worker.
+
+    Private memory (USS) is what every additional worker costs; shared pages are counted once.
+    """
+    import tempfile
+    import urllib.request
+    from model_artifacts import read_memory_usage
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # Startup completes only after the models are loaded, so "startup complete" means ready
+    env = dict(os.environ, WARMUP_IN_BACKGROUND='false')
+    requests = [
+        ('/predict-career', {'education': 'BCA', 'skills': ['Python', 'SQL'], 'interest': 'Data', 'experience_years': 2}),
+        ('/resume-match', {'resume_text': 'Python SQL Excel dashboards', 'job_description': 'Data Analyst with Python, SQL, Tableau'}),
+        ('/api/linkedin-analyze', {'profile_text': 'Python SQL data analysis', 'target_role': 'Data Analyst'})
+    ]
+
+    print("="*78)
+    print(f"WORKER MEMORY: prefork.py with {args.workers} workers")
+    print("="*78)
+
+    for label, extra in (('preloaded in master', []), ('loaded per worker', ['--no-preload'])):
+        with tempfile.TemporaryFile(mode='w+') as log:
+            proc = subprocess.Popen(
+                [sys.executable, '-W', 'ignore', 'prefork.py', '--workers', str(args.workers),
+                 '--host', '127.0.0.1', '--port', str(args.port)] + extra,
+                cwd=script_dir, env=env, stdout=log, stderr=subprocess.STDOUT, text=True
+            )
+            try:
+                deadline = time.time() + args.timeout
+                while True:
+                    log.seek(0)
+                    if log.read().count('Application startup complete') >= args.workers:
+                        break
+                    if proc.poll() is not None or time.time() > deadline:
+                        log.seek(0)
+                        raise RuntimeError(f"prefork.py did not start:\n{log.read()}")
+                    time.sleep(0.2)
+
+                # Touch the model pages in every worker before measuring
+                for _ in range(args.requests):
+                    for path, payload in requests:
+                        request = urllib.request.Request(
+                            f"http://127.0.0.1:{args.port}{path}", data=json.dumps(payload).encode(),
+                            headers={'Content-Type': 'application/json'}
+                        )
+                        urllib.request.urlopen(request).read()
+
+                with open(f"/proc/{proc.pid}/task/{proc.pid}/children") as f:
+                    workers = [int(pid) for pid in f.read().split()]
+                master = read_memory_usage(proc.pid)
+                usage = [read_memory_usage(pid) for pid in workers]
+            finally:
+                proc.terminate()
+                proc.wait()
+
+        print(f"\n{label}:")
+        print(f"  {'process':<10} {'RSS MB':>9} {'PSS MB':>9} {'private MB':>11} {'shared MB':>10}")
+        for name, mem in [('master', master)] + [(f"worker {i}", mem) for i, mem in enumerate(usage)]:
+            print(f"  {name:<10} {mem['rss'] / 1e6:9.1f} {mem['pss'] / 1e6:9.1f} "
+                  f"{mem['private'] / 1e6:11.1f} {mem['shared'] / 1e6:10.1f}")
+        total_pss = (master['pss'] + sum(mem['pss'] for mem in usage)) / 1e6
+        per_worker = np.mean([mem['private'] for mem in usage]) / 1e6
+        print(f"  total PSS {total_pss:.1f} MB, private memory per extra worker {per_worker:.1f} MB")
+
+
+def benchmark_upstream(args):
+    """
+    The upstream-calling endpoints (chat, streaming chat, roadmap, interview, STT, TTS) against
+    stub_upstream.py, so pooling, caching and the OpenRouter -> Gemini fallback can be measured
+    offline. The stub runs as a subprocess with a fixed seed; the app is driven in-process.
+    """
+    import asyncio
+    import random
+    import urllib.request
+    import httpx
+    from stub_upstream import api_environment
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_url = f"http://127.0.0.1:{args.port}"
+    stub_args = ['--port', str(args.port), '--latency', args.latency, '--token-latency', args.token_latency,
+                 '--seed', str(args.seed), '--hang-seconds', str(args.upstream_timeout * 2)]
+    for spec in args.error_rate:
+        stub_args += ['--error-rate', spec]
+
+    def stub_call(path, body=None):
+        request = urllib.request.Request(base_url + path, data=json.dumps(body).encode() if body is not None else None,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    stub = subprocess.Popen([sys.executable, '-W', 'ignore', 'stub_upstream.py'] + stub_args, cwd=script_dir,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                stub_call('/_stub/stats')
+                break
+            except OSError:
+                if stub.poll() is not None or time.time() > deadline:
+                    raise RuntimeError("stub_upstream.py did not start")
+                time.sleep(0.2)
+
+        # api.py reads its upstream configuration at import time
+        os.environ.update(api_environment(base_url), UPSTREAM_TIMEOUT=str(args.upstream_timeout))
+        os.environ.pop('ROADMAP_CACHE_PATH', None)
+        import api  # type: ignore
+
+        rng = random.Random(args.seed)
+        queries = [f"Switch from support engineer to data analyst, plan {i}" for i in range(args.distinct_roadmaps)]
+        audio = b'RIFF' + bytes(32000)
+        scenarios = [
+            ('chat', lambda client: client.post('/api/chat', json={'message': "How do I become a data analyst?"}), None),
+            ('chat-stream', lambda client: client.post('/api/chat/stream', json={'message': "How do I become a data analyst?"}), None),
+            ('roadmap', lambda client: client.post('/api/roadmap-search', json={'query': rng.choice(queries)}), None),
+            ('interview', lambda client: client.post('/api/interview/start', json={
+                'role': "Data Analyst", 'level': "Fresher", 'tech_stack': "Python, SQL"}), None),
+            ('interview-fallback', lambda client: client.post('/api/interview/start', json={
+                'role': "Data Analyst", 'level': "Fresher", 'tech_stack': "Python, SQL"}), {'error_rates': {'openrouter:429': 1.0}}),
+            ('stt', lambda client: client.post('/api/interview/stt', files={'audio': ('answer.wav', audio, 'audio/wav')}), None),
+            ('tts', lambda client: client.post('/api/interview/tts', data={'text': "Tell me about a recent project."}), None),
+        ]
+
+        async def run(name, send):
+            latencies, statuses = [], {}
+
+            async def client_loop(client):
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    try:
+                        status = (await send(client)).status_code
+                    except httpx.HTTPError as e:
+                        status = type(e).__name__
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+                start = time.perf_counter()
+                await asyncio.gather(*(client_loop(client) for _ in range(args.concurrency)))
+                return latencies, statuses, time.perf_counter() - start
+
+        async def run_all():
+            for name, send, stub_config in scenarios:
+                if stub_config:
+                    # Error rates the scenario overrides, restored afterwards
+                    rates = stub_call('/_stub/stats')['config']['error_rates']
+                    restore = {target: rates.get(target.split(':')[0], {}).get(target.split(':')[1], 0.0)
+                               for target in stub_config['error_rates']}
+                    stub_call('/_stub/config', stub_config)
+                stub_call('/_stub/reset', {})
+                cache_before = api.roadmap_cache.stats()
+                latencies, statuses, elapsed = await run(name, send)
+                calls = {route: outcomes for route, outcomes in stub_call('/_stub/stats')['calls'].items() if outcomes['total']}
+                if stub_config:
+                    stub_call('/_stub/config', {'error_rates': restore})
+
+                print(f"\n{name:<18} {len(latencies) / elapsed:8.1f} req/s  {percentile_summary(latencies)} ms")
+                print(f"{'':<18} status {dict(sorted(statuses.items(), key=str))}")
+                print(f"{'':<18} upstream calls {json.dumps(calls)}")
+                if name == 'roadmap':
+                    cache = api.roadmap_cache.stats()
+                    print(f"{'':<18} cache hits {cache['hits'] - cache_before['hits']}, "
+                          f"misses {cache['misses'] - cache_before['misses']}, "
+                          f"coalesced {cache['coalesced'] - cache_before['coalesced']}")
+            await api.close_http_clients()
+
+        print("="*78)
+        print(f"UPSTREAM ENDPOINTS vs stub_upstream.py: {args.concurrency} clients x {args.requests} requests, "
+              f"latency {args.latency}")
+        print("="*78)
+        asyncio.run(run_all())
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serving benchmarks for the ML API")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    threads = subparsers.add_parser('threads', help="Inference thread policy under concurrent load")
+    threads.add_argument('--concurrency', type=int, default=16)
+    threads.add_argument('--requests', type=int, default=50)
+    threads.add_argument('--n-jobs', type=int, default=int(os.getenv('INFERENCE_N_JOBS', '1')))
+    threads.set_defaults(func=benchmark_threads)
+
+    job_index = subparsers.add_parser('job-index', help="Resume ranking against a job corpus")
+    job_index.add_argument('--jobs', type=int, default=50000)
+    job_index.add_argument('--top-k', type=int, default=10)
+    job_index.add_argument('--repeat', type=int, default=200)
+    job_index.set_defaults(func=benchmark_job_index)
+
+    mixed = subparsers.add_parser('mixed', help="CPU handlers vs LLM streams on one event loop")
+    mixed.add_argument('--cpu-clients', type=int, default=4)
+    mixed.add_argument('--streams', type=int, default=20)
+    mixed.add_argument('--duration', type=float, default=5.0)
+    mixed.add_argument('--tick-ms', type=float, default=10.0)
+    mixed.add_argument('--resume-words', type=int, default=20000)
+    mixed.add_argument('--workers', type=int, default=4)
+    mixed.set_defaults(func=benchmark_mixed)
+
+    microbatch = subparsers.add_parser('microbatch', help="Micro-batched vs per-request model calls")
+    microbatch.add_argument('--concurrency', type=int, default=64)
+    microbatch.add_argument('--requests', type=int, default=50)
+    microbatch.add_argument('--max-batch-size', type=int, default=int(os.getenv('MICRO_BATCH_MAX_SIZE', '64')))
+    microbatch.add_argument('--max-wait-ms', type=float, default=float(os.getenv('MICRO_BATCH_MAX_WAIT_MS', '2')))
+    microbatch.set_defaults(func=benchmark_microbatch)
+
+    import_time = subparsers.add_parser('import-time', help="Cold-start import time of api.py against a budget")
+    import_time.add_argument('--module', default='api')
+    import_time.add_argument('--budget-ms', type=float, default=IMPORT_TIME_BUDGET_MS)
+    import_time.add_argument('--repeat', type=int, default=5)
+    import_time.add_argument('--top', type=int, default=10)
+    import_time.set_defaults(func=benchmark_import_time)
+
+    rss = subparsers.add_parser('rss', help="Memory per worker with pre-fork shared models")
+    rss.add_argument('--workers', type=int, default=4)
+    rss.add_argument('--port', type=int, default=8765)
+    rss.add_argument('--requests', type=int, default=20)
+    rss.add_argument('--timeout', type=float, default=120.0)
+    rss.set_defaults(func=benchmark_rss)
+
+    upstream = subparsers.add_parser('upstream', help="LLM/STT/TTS endpoints against the stub upstream server")
+    upstream.add_argument('--concurrency', type=int, default=16)
+    upstream.add_argument('--requests', type=int, default=20)
+    upstream.add_argument('--port', type=int, default=9100)
+    upstream.add_argument('--latency', default='lognormal:300,0.5')
+    upstream.add_argument('--token-latency', default='fixed:5')
+    upstream.add_argument('--error-rate', action='append', default=[], metavar='[ROUTE:]FAULT=P')
+    upstream.add_argument('--distinct-roadmaps', type=int, default=20)
+    upstream.add_argument('--upstream-timeout', type=float, default=5.0)
+    upstream.add_argument('--seed', type=int, default=0)
+    upstream.set_defaults(func=benchmark_upstream)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
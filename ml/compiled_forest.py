@@ -0,0 +1,317 @@
+"""
+Compiled Forest Module
+Flattens the trained career RandomForest into contiguous NumPy arrays and evaluates it
+without going through sklearn's estimator machinery.
+"""
+
+import numpy as np
+import joblib
+import os
+import time
+
+from model_artifacts import load_arrays, save_arrays
+
+MODELS_DIR = 'ml/models'
+COMPILED_FOREST_FILE = 'career_forest.npz'
+
+
+class CompiledForest:
+    """
+    Array-based evaluator for a fitted RandomForestClassifier.
+
+    All trees are concatenated into one node table (feature, threshold, left,
+    right, value). Leaves point to themselves, so every tree can be walked in
+    lockstep for a fixed number of steps with pure array indexing.
+
+    Exposes classes_, predict_proba and predict so it can stand in for the
+    sklearn model at inference time. Batches are walked chunk_rows rows at a time.
+    While most (row, tree) pairs are still at split nodes every pair takes a step;
+    after that only the pairs that have not reached a leaf are advanced, and the
+    walk stops once all of them have.
+    """
+
+    # Rows walked together; keeps the per-step index arrays cache-sized for large batches
+    chunk_rows = 256
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_estimators = len(roots)
+        self.n_classes_ = len(classes)
+
+        # Small private lookup tables (intp, so take() does not convert indices every step):
+        # children[2 * node + go_left] is the next node, is_split is False for leaves
+        self._children = np.empty(2 * len(left), dtype=np.intp)
+        self._children[0::2] = right
+        self._children[1::2] = left
+        self._feature = np.asarray(feature, dtype=np.intp)
+        self._is_split = np.asarray(left) != np.arange(len(left))
+        self._roots = np.asarray(roots, dtype=np.intp)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Flatten a fitted RandomForestClassifier.
+
+        Args:
+            model: Fitted single-output RandomForestClassifier
+
+        Returns:
+            CompiledForest with identical predictions
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves so extra steps are no-ops
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+            lefts.append((np.where(is_leaf, node_ids, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(is_leaf, node_ids, tree.children_right) + offset).astype(np.int32))
+
+            # Same per-tree normalization as DecisionTreeClassifier.predict_proba
+            tree_value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = tree_value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(tree_value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features)),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+            left=np.ascontiguousarray(np.concatenate(lefts)),
+            right=np.ascontiguousarray(np.concatenate(rights)),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth
+        )
+
+    def apply(self, X) -> np.ndarray:
+        """Return the leaf node index reached in every tree, shape (n_samples, n_estimators)."""
+        X = self._as_input(X)
+        leaves = np.empty((X.shape[0], self.n_estimators), dtype=np.intp)
+        for start in range(0, X.shape[0], self.chunk_rows):
+            chunk = X[start:start + self.chunk_rows]
+            leaves[start:start + len(chunk)] = self._apply_chunk(chunk)
+        return leaves
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Average leaf class distributions across trees."""
+        X = self._as_input(X)
+        proba = np.empty((X.shape[0], self.n_classes_), dtype=np.float64)
+        for start in range(0, X.shape[0], self.chunk_rows):
+            chunk = X[start:start + self.chunk_rows]
+            # Tree-major, so the sum adds contiguous (rows, classes) slabs tree by tree
+            leaves = self._apply_chunk(chunk).T
+            proba[start:start + len(chunk)] = self.value.take(leaves, axis=0).sum(axis=0)
+        return proba / self.n_estimators
+
+    @staticmethod
+    def _as_input(X) -> np.ndarray:
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _apply_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = np.repeat(np.arange(n_samples, dtype=np.intp) * n_features, self.n_estimators)
+        nodes = np.tile(self._roots, n_samples)
+
+        # Dense steps while at least half of the pairs are at split nodes (leaves loop back
+        # to themselves, so stepping them is harmless)
+        split = self._is_split.take(nodes)
+        for _ in range(self.max_depth):
+            if np.count_nonzero(split) * 2 < nodes.size:
+                break
+            go_left = flat_X.take(row_offsets + self._feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = self._children.take(2 * nodes + go_left)
+            split = self._is_split.take(nodes)
+
+        # Then only advance the pairs that have not reached a leaf
+        active = np.flatnonzero(split)
+        while active.size:
+            current = nodes.take(active)
+            go_left = (flat_X.take(row_offsets.take(active) + self._feature.take(current))
+                       <= self.threshold.take(current))
+            current = self._children.take(2 * current + go_left)
+            nodes[active] = current
+            active = active[self._is_split.take(current)]
+
+        return nodes.reshape(n_samples, self.n_estimators)
+
+    def predict(self, X) -> np.ndarray:
+        """Predict class labels (argmax of predict_proba, as sklearn does)."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the node arrays in bytes."""
+        return sum(arr.nbytes for arr in (
+            self.feature, self.threshold, self.left, self.right, self.value, self.roots
+        ))
+
+    def save(self, path: str):
+        """Save node arrays to an uncompressed .npz file."""
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+            max_depth=np.array(self.max_depth)
+        )
+
+    def save_mapped(self, path: str) -> str:
+        """Save node arrays as a memory-mappable artifact directory (see model_artifacts)."""
+        return save_arrays(path, {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'roots': self.roots,
+            'classes': self.classes_
+        }, {'max_depth': self.max_depth})
+
+    @classmethod
+    def load_mapped(cls, path: str, mmap_mode: str = 'r'):
+        """Open a forest saved with save_mapped(); node arrays stay in the shared page cache."""
+        arrays, meta = load_arrays(path, mmap_mode)
+        return cls(
+            feature=arrays['feature'],
+            threshold=arrays['threshold'],
+            left=arrays['left'],
+            right=arrays['right'],
+            value=arrays['value'],
+            roots=arrays['roots'],
+            classes=arrays['classes'],
+            max_depth=meta['max_depth']
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        """Load a forest saved with save()."""
+        with np.load(path) as data:
+            return cls(
+                feature=data['feature'],
+                threshold=data['threshold'],
+                left=data['left'],
+                right=data['right'],
+                value=data['value'],
+                roots=data['roots'],
+                classes=data['classes'],
+                max_depth=int(data['max_depth'])
+            )
+
+
+def export_forest(model, save_dir: str = MODELS_DIR) -> str:
+    """
+    Flatten a trained career model and save it next to career_model.pkl.
+
+    Args:
+        model: Fitted RandomForestClassifier
+        save_dir: Directory to write career_forest.npz to
+
+    Returns:
+        Path of the written file
+    """
+    forest = CompiledForest.from_sklearn(model)
+    path = os.path.join(save_dir, COMPILED_FOREST_FILE)
+    forest.save(path)
+    print(f"[OK] Compiled forest saved to {path} ({forest.nbytes / 1e6:.2f} MB of node arrays)")
+    return path
+
+
+def verify_forest(model, forest: CompiledForest, X, atol: float = 1e-12):
+    """
+    Golden-output check of the compiled forest against sklearn.
+
+    Raises:
+        AssertionError: If labels differ or probabilities differ by more than atol
+    """
+    expected_proba = model.predict_proba(X)
+    actual_proba = forest.predict_proba(X)
+    max_diff = float(np.max(np.abs(expected_proba - actual_proba)))
+
+    assert np.array_equal(model.predict(X), forest.predict(X)), "Predicted labels differ from sklearn"
+    assert max_diff <= atol, f"Probabilities differ from sklearn by {max_diff}"
+
+    print(f"[OK] Golden output matches sklearn on {len(X)} rows (max |diff| = {max_diff:.2e})")
+
+
+def compare_latency(model, forest: CompiledForest, X, repeats: int = 200,
+                    models_dir: str = MODELS_DIR):
+    """Print single-row and full-batch latency for sklearn vs the compiled forest."""
+    row = X[:1]
+
+    def timed(fn, data, n):
+        fn(data)  # warm-up
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(data)
+        return (time.perf_counter() - start) / n * 1000
+
+    print("\nLatency (ms per call):")
+    print(f"{'':<20} {'sklearn':<12} {'compiled':<12}")
+    print(f"{'single row':<20} {timed(model.predict_proba, row, repeats):<12.3f} "
+          f"{timed(forest.predict_proba, row, repeats):<12.3f}")
+    print(f"{f'batch ({len(X)} rows)':<20} {timed(model.predict_proba, X, 10):<12.3f} "
+          f"{timed(forest.predict_proba, X, 10):<12.3f}")
+
+    pickle_size = os.path.getsize(os.path.join(models_dir, 'career_model.pkl'))
+    print(f"\nSize: career_model.pkl {pickle_size / 1e6:.2f} MB, "
+          f"compiled node arrays {forest.nbytes / 1e6:.2f} MB")
+
+
+def main():
+    """
+    Re-export the served career model, verify it against sklearn and compare latency.
+
+    train_models.py exports the forest into every version; this rebuilds it (and the
+    shared artifacts and answer table derived from it) as a new version of the served models.
+    """
+    from preprocessing import FeaturePreprocessor  # type: ignore
+    from model_artifacts import export_shared_artifacts  # type: ignore
+    from answer_table import build_answer_table  # type: ignore
+    from model_registry import derive_version  # type: ignore
+    import pandas as pd
+
+    def rebuild(models_dir: str):
+        export_forest(joblib.load(os.path.join(models_dir, 'career_model.pkl')), models_dir)
+        export_shared_artifacts(models_dir)
+        build_answer_table(models_dir)
+
+    models_dir = derive_version(MODELS_DIR, rebuild, 'compiled_forest.py')
+    model = joblib.load(os.path.join(models_dir, 'career_model.pkl'))
+    forest = CompiledForest.load(os.path.join(models_dir, COMPILED_FOREST_FILE))
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    test_df = pd.read_csv(os.path.join(script_dir, 'data', 'career_test.csv'))
+    preprocessor = FeaturePreprocessor.load_encoders(models_dir)
+    X_test = preprocessor.create_feature_matrix(test_df, fit=False)
+
+    verify_forest(model, forest, X_test)
+    compare_latency(model, forest, X_test, models_dir=models_dir)
+
+
+if __name__ == '__main__':
+    main()
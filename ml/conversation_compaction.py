@@ -0,0 +1,104 @@
+"""
+Conversation Compaction Module
+Shrinks the interview conversation sent to the LLM on every turn: the system prompt is
+sent once, earlier assistant JSON replies become short question/score summaries, and the
+result is kept within a token budget.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+# Instruction suffixes appended to candidate answers; only the latest one matters
+ANSWER_INSTRUCTIONS = (
+    "\n\nEvaluate this answer and ask the next question. Return JSON only.",
+    "\n\nThis was the last question. Generate the final_report JSON now."
+)
+TRUNCATED_ANSWER_CHARS = 400
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def count_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimated prompt tokens for a message list, including a small per-message overhead."""
+    return sum(estimate_tokens(msg["content"]) + 4 for msg in messages)
+
+
+def summarize_assistant_reply(reply: str) -> str:
+    """Replace an interviewer JSON reply with a compact {"question", "score"} summary."""
+    try:
+        data = json.loads(reply)
+    except (json.JSONDecodeError, TypeError):
+        return reply[:TRUNCATED_ANSWER_CHARS]
+    if not isinstance(data, dict):
+        return reply[:TRUNCATED_ANSWER_CHARS]
+
+    summary = {"question": data.get("question", "")}
+    evaluation = data.get("evaluation") or {}
+    if isinstance(evaluation, dict) and evaluation.get("overall_score") is not None:
+        summary["previous_answer_score"] = evaluation.get("overall_score")
+    return json.dumps(summary, separators=(',', ':'))
+
+
+def strip_answer_instruction(content: str) -> str:
+    """Drop the per-turn instruction suffix from an earlier candidate answer."""
+    for instruction in ANSWER_INSTRUCTIONS:
+        if content.endswith(instruction):
+            return content[:-len(instruction)]
+    return content
+
+
+def compact_interview_conversation(system_prompt: str, conversation: List[Dict[str, str]],
+                                   token_budget: int = 3000,
+                                   keep_recent_turns: int = 1) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Build the compacted message list for the next interview LLM call.
+
+    Args:
+        system_prompt: Interview system prompt (sent once, as the first message)
+        conversation: Full stored conversation; the first message is the opening
+            prompt and the last one is the new candidate answer
+        token_budget: Target size of the compacted prompt in estimated tokens
+        keep_recent_turns: Number of latest interviewer replies kept verbatim
+
+    Returns:
+        Tuple of (compacted messages, {"tokens_before", "tokens_after"})
+    """
+    tokens_before = count_tokens(conversation)
+    history = conversation[1:-1]
+    latest = conversation[-1]
+
+    assistant_positions = [i for i, msg in enumerate(history) if msg["role"] == "assistant"]
+    verbatim = set(assistant_positions[-keep_recent_turns:]) if keep_recent_turns > 0 else set()
+
+    compacted_history = []
+    for i, msg in enumerate(history):
+        if msg["role"] == "assistant" and i not in verbatim:
+            content = summarize_assistant_reply(msg["content"])
+        elif msg["role"] == "user":
+            content = strip_answer_instruction(msg["content"])
+        else:
+            content = msg["content"]
+        compacted_history.append({"role": msg["role"], "content": content})
+
+    head = [{"role": "user", "content": system_prompt}]
+
+    def total(history_msgs):
+        return count_tokens(head) + count_tokens(history_msgs) + count_tokens([latest])
+
+    # Over budget: first shorten older answers, then drop the oldest turns
+    if total(compacted_history) > token_budget:
+        cutoff = assistant_positions[-keep_recent_turns] if verbatim else len(compacted_history)
+        for i in range(cutoff):
+            msg = compacted_history[i]
+            if msg["role"] == "user" and len(msg["content"]) > TRUNCATED_ANSWER_CHARS:
+                msg["content"] = msg["content"][:TRUNCATED_ANSWER_CHARS] + "..."
+
+    while total(compacted_history) > token_budget and len(compacted_history) > 2 * keep_recent_turns:
+        # Remove one (interviewer question, candidate answer) pair from the front
+        del compacted_history[:2]
+
+    compacted = head + compacted_history + [latest]
+    return compacted, {"tokens_before": tokens_before, "tokens_after": count_tokens(compacted)}
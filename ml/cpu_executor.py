@@ -0,0 +1,152 @@
+"""
+CPU Executor Module
+Bounded thread/process pools that run CPU-bound request handlers off the asyncio event loop,
+so a slow model call or TF-IDF transform does not stall other requests and LLM streams.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from request_timing import record_stage
+
+EXECUTOR_KINDS = ('inline', 'thread', 'process')
+
+
+class ExecutorBusy(Exception):
+    """Raised when an executor's queue is full."""
+
+
+def _call_timed(fn: Callable, args: tuple):
+    """Run fn(*args) and return (result, start, end) timestamps for queue-wait accounting."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, start, time.perf_counter()
+
+
+class BoundedExecutor:
+    """
+    Runs blocking functions on a pool with at most max_workers running and max_queue waiting.
+
+    Kinds:
+        inline: call on the event loop (no offloading; baseline for benchmarks)
+        thread: ThreadPoolExecutor; numpy/scipy release the GIL for most of the work
+        process: ProcessPoolExecutor; fn and args must be picklable, and workers see the
+            models loaded before the pool was started (fork)
+
+    A slot is released when the pool task actually finishes, not when the awaiting request
+    is cancelled, so disconnecting clients cannot push more work onto the pool than allowed.
+    """
+
+    def __init__(self, name: str, kind: str = 'thread', max_workers: int = 4, max_queue: int = 64):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}'. Use one of {EXECUTOR_KINDS}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[Executor] = None
+
+        self.inflight = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == 'process':
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix=f"cpu-{self.name}")
+        return self._pool
+
+    @property
+    def running(self) -> int:
+        return min(self.inflight, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.inflight - self.max_workers)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) on the pool and return its result.
+
+        Raises:
+            ExecutorBusy: If max_workers tasks are running and max_queue are already waiting
+        """
+        if self.kind == 'inline':
+            start = time.perf_counter()
+            try:
+                result = fn(*args)
+            except Exception:
+                self.failed += 1
+                raise
+            self.completed += 1
+            self.run_seconds += time.perf_counter() - start
+            return result
+
+        if self.inflight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusy(f"{self.name} executor is at capacity "
+                               f"({self.max_workers} running, {self.max_queue} queued)")
+
+        loop = asyncio.get_running_loop()
+        self.inflight += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        submitted = time.perf_counter()
+
+        if self.kind == 'thread':
+            # Carry the request's context (stage timers) into the worker thread
+            future = self._get_pool().submit(contextvars.copy_context().run, _call_timed, fn, args)
+        else:
+            future = self._get_pool().submit(_call_timed, fn, args)
+        future.add_done_callback(lambda _: self._release_from(loop))
+        try:
+            result, start, end = await asyncio.wrap_future(future)
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        self.queue_wait_seconds += max(0.0, start - submitted)
+        record_stage('queue', max(0.0, start - submitted))
+        self.run_seconds += end - start
+        return result
+
+    def _release(self):
+        self.inflight -= 1
+
+    def _release_from(self, loop: asyncio.AbstractEventLoop):
+        # Runs in the pool's callback thread; the counter is only touched on the loop
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # Loop already closed during shutdown
+
+    def shutdown(self):
+        """Stop the pool without waiting for queued tasks."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and latency counters for /health."""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": round(self.queue_wait_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            "avg_run_ms": round(self.run_seconds / self.completed * 1000, 3) if self.completed else 0.0
+        }
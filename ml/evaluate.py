@@ -13,8 +13,10 @@ from sklearn.metrics.pairwise import cosine_similarity
 import joblib
 import os
 from preprocessing import FeaturePreprocessor, SKILLS_LIST
+from model_registry import resolve_models_dir
 
-MODELS_DIR = 'ml/models'
+# Evaluate the bundle the API serves (the current version, or the flat files)
+MODELS_DIR = resolve_models_dir('ml/models')[1]
 
 
 def evaluate_career_model(X_test, y_test, target_encoder):
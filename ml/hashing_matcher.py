@@ -0,0 +1,146 @@
+"""
+Hashing Matcher Module
+Fit-free TF-IDF matching engine used when the trained TF-IDF vectorizer is not available.
+Hashes unigrams and bigrams into a fixed feature space and weights them with IDF
+statistics precomputed at training time.
+"""
+
+import numpy as np
+import os
+from typing import Optional
+
+from model_artifacts import HASHING_IDF_ARTIFACT, artifact_dir, has_artifact, load_arrays
+
+MODELS_DIR = 'ml/models'
+HASHING_IDF_FILE = 'hashing_idf.npz'
+N_FEATURES = 2 ** 18
+
+
+class HashedVocabulary:
+    """
+    Maps hashed feature indices back to readable terms for a set of documents.
+
+    Indexing with an integer array returns the matching term names, so it can be
+    used in place of get_feature_names_out() for the documents it was built from.
+    """
+
+    def __init__(self, index_to_term):
+        self.index_to_term = index_to_term
+
+    def __getitem__(self, indices):
+        return np.array([self.index_to_term.get(int(idx), f"<feature {int(idx)}>")
+                         for idx in np.atleast_1d(indices)], dtype=object)
+
+
+class HashingMatcher:
+    """
+    Stateless TF-IDF vectorizer: hashing term counts, precomputed smooth IDF, L2 normalization.
+
+    Nothing is fitted per request, so it has no construction cost beyond the first load.
+    """
+
+    def __init__(self, idf: np.ndarray):
+        # sklearn is imported here so that importing this module (for HashedVocabulary) stays cheap
+        from sklearn.feature_extraction import FeatureHasher
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.n_features = len(idf)
+        self.idf = idf
+        self.vectorizer = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=False,
+            norm=None
+        )
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.hasher = FeatureHasher(
+            n_features=self.n_features,
+            input_type='string',
+            alternate_sign=False
+        )
+
+    def transform(self, texts):
+        """TF-IDF vectors (CSR, L2-normalized rows) for a list of texts."""
+        from sklearn.preprocessing import normalize
+
+        X = self.vectorizer.transform(texts)
+        X.data *= self.idf[X.indices]
+        return normalize(X, copy=False)
+
+    def vocabulary_for(self, *texts) -> HashedVocabulary:
+        """Build the index -> term mapping for the terms that occur in texts."""
+        terms = sorted({term for text in texts for term in self.analyzer(text)})
+        if not terms:
+            return HashedVocabulary({})
+        indices = self.hasher.transform([[term] for term in terms]).indices
+
+        index_to_term = {}
+        for idx, term in zip(indices, terms):
+            # On a hash collision keep the alphabetically first term
+            index_to_term.setdefault(int(idx), term)
+        return HashedVocabulary(index_to_term)
+
+    @staticmethod
+    def load_idf(load_dir: str = MODELS_DIR) -> np.ndarray:
+        """
+        Expand the precomputed IDF statistics into a dense vector, or uniform IDF if the artifact is missing.
+        """
+        path = os.path.join(load_dir, HASHING_IDF_FILE)
+        if not os.path.exists(path):
+            print(f"[WARNING] {path} not found. Hashing matcher will use uniform IDF.")
+            return np.ones(N_FEATURES, dtype=np.float64)
+
+        with np.load(path) as data:
+            n_features = int(data['n_features'])
+            idf = np.full(n_features, float(data['default_idf']), dtype=np.float64)
+            idf[data['indices']] = data['values']
+        return idf
+
+    @classmethod
+    def load(cls, load_dir: str = MODELS_DIR, mmap_mode: Optional[str] = 'r'):
+        """
+        Load IDF statistics, memory-mapping the exported dense vector when it exists.
+
+        Args:
+            load_dir: Models directory
+            mmap_mode: 'r' to share the dense vector across workers, None to expand a private copy
+        """
+        shared_path = artifact_dir(load_dir, HASHING_IDF_ARTIFACT)
+        if mmap_mode and has_artifact(shared_path):
+            arrays, _ = load_arrays(shared_path, mmap_mode)
+            return cls(arrays['idf'])
+        return cls(cls.load_idf(load_dir))
+
+
+def build_hashing_idf(texts, save_dir: str = MODELS_DIR) -> str:
+    """
+    Compute smooth IDF statistics over a reference corpus and save them.
+
+    Uses the same formula as TfidfVectorizer (smooth_idf=True):
+    idf = ln((1 + n) / (1 + df)) + 1. Only features seen in the corpus are stored;
+    unseen features get the df=0 value.
+
+    Returns:
+        Path of the written file
+    """
+    matcher = HashingMatcher(np.ones(N_FEATURES, dtype=np.float64))
+    counts = matcher.vectorizer.transform(texts).tocsc()
+    df = np.diff(counts.indptr)
+
+    n_docs = len(texts)
+    seen = np.flatnonzero(df)
+    values = np.log((1 + n_docs) / (1 + df[seen])) + 1
+    default_idf = np.log(1 + n_docs) + 1
+
+    path = os.path.join(save_dir, HASHING_IDF_FILE)
+    np.savez(
+        path,
+        n_features=np.array(N_FEATURES),
+        n_docs=np.array(n_docs),
+        default_idf=np.array(default_idf),
+        indices=seen.astype(np.int32),
+        values=values.astype(np.float64)
+    )
+    print(f"[OK] Hashing IDF statistics saved to {path} ({len(seen)} features from {n_docs} documents)")
+    return path
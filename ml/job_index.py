@@ -0,0 +1,388 @@
+"""
+Job Index Module
+Sparse TF-IDF index of job descriptions for ranking one resume against a large corpus.
+
+The index is a base segment stored as memory-mapped CSR arrays plus a small in-memory
+delta segment for incremental adds and a tombstone mask for deletes. compact() folds the
+delta into a new base generation without re-vectorizing existing jobs.
+
+Several worker processes can open the same index directory. Writes take an exclusive
+file lock and first reload whatever another process wrote, so there is a single writer
+at a time and generations never collide. Searches reload when meta.json or delta.npz
+changed on disk, so a job added through one worker shows up in the others.
+
+Usage:
+    python job_index.py jobs.csv     # CSV with job_id, title, description columns
+"""
+
+import fcntl
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import joblib
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from model_artifacts import atomic_write
+from model_registry import resolve_models_dir
+
+MODELS_DIR = 'ml/models'
+JOB_INDEX_DIR = os.path.join(MODELS_DIR, 'job_index')
+META_FILE = 'meta.json'
+DELTA_FILE = 'delta.npz'
+LOCK_FILE = '.lock'
+DEFAULT_MAX_DELTA_ROWS = 5000
+
+
+def _base_path(index_dir: str, generation: int, name: str) -> str:
+    return os.path.join(index_dir, f"base-{generation}-{name}")
+
+
+class JobIndex:
+    """
+    L2-normalized TF-IDF rows of job descriptions, ranked by cosine similarity to a resume.
+
+    Rows are addressed by position: base rows first, then delta rows. Deleting a job only
+    sets its tombstone; the row is dropped at the next compaction.
+    """
+
+    def __init__(self, index_dir: str, n_features: int, max_delta_rows: int = DEFAULT_MAX_DELTA_ROWS):
+        self.index_dir = index_dir
+        self.n_features = n_features
+        self.max_delta_rows = max_delta_rows
+        self.generation = 0
+
+        self.base = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        self.base_jobs = []
+        self.delta = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        self.delta_jobs = []
+        self.deleted = np.zeros(0, dtype=bool)
+        self.positions = {}
+        # Guards segment swaps so searches running in worker threads see a consistent snapshot
+        self._lock = threading.RLock()
+        # (inode, mtime, size) of meta.json and delta.npz when this process last read or wrote them
+        self._signature = None
+        self._lock_fd = None
+        self._write_depth = 0
+
+    @classmethod
+    def open(cls, index_dir: str, n_features: int, max_delta_rows: int = DEFAULT_MAX_DELTA_ROWS):
+        """
+        Open an index directory, creating an empty index if it does not exist yet.
+
+        Raises:
+            ValueError: If the index was built with a different vocabulary size
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        index = cls(index_dir, n_features, max_delta_rows)
+        with index._writing():
+            if index._signature is None:
+                index._write_base(sparse.csr_matrix((0, n_features), dtype=np.float32), [])
+        return index
+
+    def _disk_signature(self):
+        signature = []
+        for name in (META_FILE, DELTA_FILE):
+            try:
+                st = os.stat(os.path.join(self.index_dir, name))
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature) if signature[0] is not None else None
+
+    def _load(self):
+        """Read the index from disk (caller holds self._lock and the file lock)."""
+        with open(os.path.join(self.index_dir, META_FILE)) as f:
+            meta = json.load(f)
+        if meta['n_features'] != self.n_features:
+            raise ValueError(
+                f"Job index was built with {meta['n_features']} features, "
+                f"but the vectorizer has {self.n_features}. Rebuild it with: python job_index.py <jobs.csv>"
+            )
+
+        self.generation = meta['generation']
+        self.base_jobs = meta['jobs']
+        arrays = [np.load(_base_path(self.index_dir, self.generation, name), mmap_mode='r')
+                  for name in ('data.npy', 'indices.npy', 'indptr.npy')]
+        self.base = sparse.csr_matrix(tuple(arrays), shape=(len(self.base_jobs), self.n_features), copy=False)
+
+        self.delta = sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+        self.delta_jobs = []
+        self.deleted = np.zeros(len(self.base_jobs), dtype=bool)
+        delta_path = os.path.join(self.index_dir, DELTA_FILE)
+        if os.path.exists(delta_path):
+            with np.load(delta_path) as delta:
+                # A delta left over from an interrupted compaction belongs to an older base
+                if int(delta['generation']) == self.generation:
+                    self.delta_jobs = json.loads(str(delta['jobs']))
+                    self.delta = sparse.csr_matrix(
+                        (delta['data'], delta['indices'], delta['indptr']),
+                        shape=(len(self.delta_jobs), self.n_features)
+                    )
+                    self.deleted = delta['deleted'].copy()
+
+        self._rebuild_positions()
+        self._signature = self._disk_signature()
+
+    def _open_lock_file(self) -> int:
+        return os.open(os.path.join(self.index_dir, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def _writing(self):
+        """
+        Hold the exclusive write lock (reentrant within this process) with the in-memory
+        state brought up to date with the files first.
+        """
+        with self._lock:
+            if self._write_depth == 0:
+                self._lock_fd = self._open_lock_file()
+                try:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+                    if self._disk_signature() not in (None, self._signature):
+                        self._load()
+                except BaseException:
+                    os.close(self._lock_fd)
+                    raise
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._signature = self._disk_signature()
+                    os.close(self._lock_fd)  # releases the flock
+                    self._lock_fd = None
+
+    def refresh(self) -> bool:
+        """
+        Reload the index if another process changed it. Skipped (returns False) while a
+        writer holds the lock; the next call picks the change up.
+        """
+        if self._disk_signature() == self._signature:
+            return False
+        with self._lock:
+            fd = self._open_lock_file()
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+                if self._disk_signature() == self._signature:
+                    return False
+                self._load()
+                return True
+            finally:
+                os.close(fd)
+
+    def __len__(self) -> int:
+        """Number of live (not deleted) jobs."""
+        return len(self.deleted) - int(self.deleted.sum())
+
+    def _rebuild_positions(self):
+        self.positions = {}
+        for pos, job in enumerate(self.base_jobs + self.delta_jobs):
+            if not self.deleted[pos]:
+                self.positions[job['job_id']] = pos
+
+    @staticmethod
+    def vectorize(vectorizer, texts) -> sparse.csr_matrix:
+        """TF-IDF vectors as L2-normalized float32 CSR rows."""
+        matrix = normalize(vectorizer.transform(texts), norm='l2', copy=False)
+        return sparse.csr_matrix(matrix, dtype=np.float32)
+
+    def add(self, vectorizer, jobs) -> int:
+        """
+        Vectorize and add jobs; an existing job_id is replaced.
+
+        Args:
+            vectorizer: The trained TF-IDF vectorizer the index was built with
+            jobs: List of dicts with job_id, title and description
+
+        Returns:
+            Number of jobs added
+        """
+        if not jobs:
+            return 0
+        # Within one batch the last entry for a job_id wins
+        latest = {job['job_id']: job for job in jobs}
+        jobs = list(latest.values())
+
+        rows = self.vectorize(vectorizer, [job['description'] for job in jobs])
+
+        with self._writing():
+            for job in jobs:
+                self._tombstone(job['job_id'])
+
+            start = len(self.deleted)
+            self.delta_jobs = self.delta_jobs + [{'job_id': job['job_id'], 'title': job['title']} for job in jobs]
+            self.delta = sparse.vstack([self.delta, rows], format='csr')
+            self.deleted = np.concatenate([self.deleted, np.zeros(len(jobs), dtype=bool)])
+            for offset, job in enumerate(jobs):
+                self.positions[job['job_id']] = start + offset
+
+            if len(self.delta_jobs) > self.max_delta_rows:
+                self.compact()
+            else:
+                self._write_delta()
+        return len(jobs)
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a job. Returns False if it is not in the index."""
+        with self._writing():
+            if not self._tombstone(job_id):
+                return False
+            self._write_delta()
+        return True
+
+    def _tombstone(self, job_id: str) -> bool:
+        pos = self.positions.pop(job_id, None)
+        if pos is None:
+            return False
+        self.deleted[pos] = True
+        return True
+
+    def search(self, resume_vec, top_k: int = 10):
+        """
+        Rank live jobs by cosine similarity to an L2-normalized resume vector.
+
+        One sparse matrix-vector product per segment, then argpartition for the top k.
+        Safe to call from worker threads while jobs are added or deleted, and picks up
+        changes made by other processes first.
+
+        Returns:
+            List of (job, similarity, row), best first
+        """
+        self.refresh()
+        with self._lock:
+            base, delta, deleted = self.base, self.delta, self.deleted.copy()
+            base_jobs, delta_jobs = self.base_jobs, self.delta_jobs
+
+        query = np.asarray(resume_vec.todense(), dtype=np.float32).ravel()
+        n_base = base.shape[0]
+        scores = np.empty(n_base + delta.shape[0], dtype=np.float32)
+        scores[:n_base] = base @ query
+        scores[n_base:] = delta @ query
+        scores[deleted[:len(scores)]] = -np.inf
+
+        k = min(top_k, len(scores) - int(deleted[:len(scores)].sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [
+            (base_jobs[pos], float(scores[pos]), base[pos]) if pos < n_base
+            else (delta_jobs[pos - n_base], float(scores[pos]), delta[pos - n_base])
+            for pos in top.tolist()
+        ]
+
+    def compact(self):
+        """Fold the delta segment into a new base generation and drop deleted rows."""
+        with self._writing():
+            self._compact()
+
+    def _compact(self):
+        live = ~self.deleted
+        merged = sparse.vstack([self.base, self.delta], format='csr')[np.flatnonzero(live)]
+        jobs = [job for job, keep in zip(self.base_jobs + self.delta_jobs, live) if keep]
+
+        old_generation = self.generation
+        self._write_base(sparse.csr_matrix(merged, dtype=np.float32), jobs)
+        self.delta = sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+        self.delta_jobs = []
+        self.deleted = np.zeros(len(jobs), dtype=bool)
+        self._write_delta()
+        self._rebuild_positions()
+
+        for name in ('data.npy', 'indices.npy', 'indptr.npy'):
+            path = _base_path(self.index_dir, old_generation, name)
+            if old_generation != self.generation and os.path.exists(path):
+                os.remove(path)
+
+    def _write_base(self, matrix: sparse.csr_matrix, jobs):
+        """Write a new base generation, switch meta.json to it and reopen it memory-mapped."""
+        generation = self.generation + 1 if os.path.exists(os.path.join(self.index_dir, META_FILE)) else 0
+        # scipy keeps the arrays as-is (no copy) only when indices and indptr share a dtype
+        index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+        arrays = {
+            'data.npy': matrix.data.astype(np.float32),
+            'indices.npy': matrix.indices.astype(index_dtype),
+            'indptr.npy': matrix.indptr.astype(index_dtype)
+        }
+        for name, array in arrays.items():
+            atomic_write(_base_path(self.index_dir, generation, name), lambda f, a=array: np.save(f, a))
+
+        meta = {'generation': generation, 'n_features': self.n_features, 'jobs': jobs}
+        atomic_write(os.path.join(self.index_dir, META_FILE),
+                      lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+        self.generation = generation
+        self.base_jobs = jobs
+        mapped = [np.load(_base_path(self.index_dir, generation, name), mmap_mode='r') for name in arrays]
+        self.base = sparse.csr_matrix(tuple(mapped), shape=(len(jobs), self.n_features), copy=False)
+
+    def _write_delta(self):
+        """Persist the delta rows and tombstones as one file, tagged with the base generation."""
+        atomic_write(os.path.join(self.index_dir, DELTA_FILE), lambda f: np.savez(
+            f,
+            generation=np.array(self.generation),
+            data=self.delta.data,
+            indices=self.delta.indices,
+            indptr=self.delta.indptr,
+            jobs=np.array(json.dumps(self.delta_jobs)),
+            deleted=self.deleted
+        ))
+
+    def stats(self) -> dict:
+        """Sizes for /health."""
+        self.refresh()
+        return {
+            "jobs": len(self),
+            "base_rows": len(self.base_jobs),
+            "delta_rows": len(self.delta_jobs),
+            "deleted_rows": int(self.deleted.sum()),
+            "generation": self.generation
+        }
+
+
+def build_job_index(csv_path: str, index_dir: str = JOB_INDEX_DIR, models_dir: str = MODELS_DIR) -> JobIndex:
+    """
+    Build a fresh index from a CSV with job_id, title and description columns.
+
+    Returns:
+        The compacted JobIndex
+    """
+    version, bundle_dir = resolve_models_dir(models_dir)
+    vectorizer = joblib.load(os.path.join(bundle_dir, 'tfidf_vectorizer.pkl'))
+    n_features = len(vectorizer.vocabulary_)
+
+    df = pd.read_csv(csv_path, dtype={'job_id': str})
+    jobs = df[['job_id', 'title', 'description']].fillna('').to_dict('records')
+
+    index = JobIndex.open(index_dir, n_features, max_delta_rows=len(jobs) + 1)
+    # One write lock for the whole rebuild, so a running API never sees it half done
+    with index._writing():
+        for job_id in list(index.positions):
+            index._tombstone(job_id)
+        index.add(vectorizer, jobs)
+        index.compact()
+    print(f"[OK] Job index with {len(index)} jobs written to {index_dir} (model version {version})")
+    return index
+
+
+def main():
+    """Build the job index from a CSV file."""
+    if len(sys.argv) != 2:
+        print("Usage: python job_index.py <jobs.csv>")
+        sys.exit(1)
+    print("="*60)
+    print("JOB INDEX BUILD")
+    print("="*60)
+    build_job_index(sys.argv[1])
+
+
+if __name__ == '__main__':
+    main()
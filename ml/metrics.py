@@ -0,0 +1,316 @@
+"""
+Metrics Module
+Latency histograms and gauges rendered in the Prometheus text exposition format.
+
+Recording is on the request path, so it takes no lock: every thread writes to its own
+shard (a dict of per-label-set bucket counts), and render() sums the shards when /metrics
+is scraped. A shard is registered under a lock once, the first time a thread records.
+
+Every series carries a worker label: the worker's slot (WORKER_ID, 0..N-1, set by
+prefork.py), which a replacement worker inherits, so restarts do not add new series.
+With a multiprocess directory, each worker periodically writes its series there
+(write_snapshot, in a file named by process id) and render() adds the series of the
+other live workers, so a scrape that any one worker answers covers them all.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+WORKER_LABEL = 'worker'
+WORKER_ID_ENV = 'WORKER_ID'
+
+# worker label -> {label values: series}, as returned by samples()
+WorkerSamples = Dict[str, Dict[Tuple[str, ...], object]]
+
+# Seconds; covers sub-millisecond model calls up to slow LLM completions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Per-thread series storage shared by Histogram and Gauge."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], list]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, ...], list]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _collect(self) -> List[Tuple[Tuple[str, ...], list]]:
+        """Snapshot of every (labels, series) pair across the shards."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        # list() copies under the GIL, so a thread adding a series cannot break the iteration
+        return [(labels, list(series)) for shard in shards for labels, series in list(shard.items())]
+
+
+class Histogram(_Sharded):
+    """
+    Cumulative histogram with fixed buckets.
+
+    Args:
+        name: Metric name (seconds-based names should end in _seconds)
+        documentation: HELP text
+        labelnames: Label names; observe() takes the values in the same order
+        buckets: Sorted upper bounds; +Inf is added implicitly
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        """Record one value; labels are positional, matching labelnames."""
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # One count per bucket, one for +Inf, then the running sum
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels: str) -> 'Timer':
+        """Context manager observing the duration of its block."""
+        return Timer(self, labels)
+
+    def samples(self) -> Dict[Tuple[str, ...], list]:
+        """This process's series (bucket counts, then the sum), summed across threads."""
+        merged: Dict[Tuple[str, ...], list] = {}
+        for labels, series in self._collect():
+            total = merged.get(labels)
+            if total is None:
+                merged[labels] = series
+            else:
+                merged[labels] = [a + b for a, b in zip(total, series)]
+        return merged
+
+    def render(self, workers: WorkerSamples) -> List[str]:
+        names = self.labelnames + (WORKER_LABEL,)
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, worker, series in _by_series(workers):
+            values = labels + (worker,)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(names, values, le)} {cumulative}")
+            label_text = _format_labels(names, values)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+def _by_series(workers: WorkerSamples) -> List[Tuple[Tuple[str, ...], str, object]]:
+    """(labels, worker, series) triples in render order."""
+    return sorted(((labels, worker, series) for worker, samples in workers.items()
+                   for labels, series in samples.items()), key=lambda item: (item[0], item[1]))
+
+
+class Timer:
+    """Observes elapsed perf_counter time into a histogram on exit (also on exceptions)."""
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Gauge(_Sharded):
+    """
+    Gauge that is either moved with inc()/dec() (summed across threads) or read from a
+    callback at scrape time.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names
+        callback: Returns the current value, or a dict of label-value tuple -> value
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], object]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def inc(self, *labels: str, amount: float = 1):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0]
+        series[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        if self.callback is not None:
+            value = self.callback()
+            return dict(value) if isinstance(value, dict) else {(): value}
+        totals: Dict[Tuple[str, ...], float] = {}
+        for labels, series in self._collect():
+            totals[labels] = totals.get(labels, 0) + series[0]
+        return totals
+
+    def render(self, workers: WorkerSamples) -> List[str]:
+        names = self.labelnames + (WORKER_LABEL,)
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, worker, value in _by_series(workers):
+            lines.append(f"{self.name}{_format_labels(names, labels + (worker,))} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together for /metrics.
+
+    Args:
+        multiprocess_dir: Directory shared by the worker processes of one server; None
+            renders this process only
+    """
+
+    def __init__(self, multiprocess_dir: Optional[str] = None):
+        self.metrics: List[_Sharded] = []
+        self.multiprocess_dir = multiprocess_dir
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              callback: Optional[Callable[[], object]] = None) -> Gauge:
+        metric = Gauge(name, documentation, labelnames, callback)
+        self.metrics.append(metric)
+        return metric
+
+    def worker_id(self) -> str:
+        """
+        This process's worker label: its WORKER_ID slot, else 0 for a single process, or the
+        process id when several processes share the multiprocess directory without slots.
+        """
+        worker = os.environ.get(WORKER_ID_ENV)
+        if worker:
+            return worker
+        return str(os.getpid()) if self.multiprocess_dir else '0'
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiprocess_dir, f"{pid}.json")
+
+    def write_snapshot(self):
+        """Write this process's series to the multiprocess directory for the other workers."""
+        snapshot = {}
+        for metric in self.metrics:
+            try:
+                snapshot[metric.name] = [[list(labels), series] for labels, series in metric.samples().items()]
+            except Exception:
+                continue  # A failing gauge callback is left out, as in render()
+        snapshot = {'worker': self.worker_id(), 'metrics': snapshot}
+        path = self._snapshot_path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def remove_snapshot(self):
+        """Remove this process's snapshot (on shutdown)."""
+        try:
+            os.remove(self._snapshot_path(os.getpid()))
+        except FileNotFoundError:
+            pass
+
+    def _read_snapshots(self) -> Dict[str, dict]:
+        """
+        Series of the other live workers by worker label; files of exited workers (e.g. the
+        predecessor of a restarted worker) are removed.
+        """
+        snapshots = {}
+        own = str(os.getpid())
+        for filename in os.listdir(self.multiprocess_dir):
+            pid, ext = os.path.splitext(filename)
+            if ext != '.json' or not pid.isdigit() or pid == own:
+                continue
+            path = os.path.join(self.multiprocess_dir, filename)
+            if not _alive(int(pid)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+                snapshots[str(snapshot['worker'])] = snapshot['metrics']
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format. A failing gauge callback is skipped."""
+        own = self.worker_id()
+        snapshots = self._read_snapshots() if self.multiprocess_dir else {}
+        lines = []
+        for metric in self.metrics:
+            workers: WorkerSamples = {
+                worker: {tuple(labels): series for labels, series in snapshot.get(metric.name, [])}
+                for worker, snapshot in snapshots.items()
+            }
+            try:
+                workers[own] = metric.samples()
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+            lines.extend(metric.render(workers))
+        return '\n'.join(lines) + '\n'
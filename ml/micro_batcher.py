@@ -0,0 +1,143 @@
+"""
+Micro-Batcher Module
+Gathers concurrent single-row inference requests into one vectorized model call.
+
+Rows submitted while the model is busy, or within the batching window, are stacked and
+scored together; each waiting coroutine gets its own row of the result. The window adapts
+to load: it shrinks while batches come out with a single row (no waiting at low traffic)
+and grows back while several requests arrive per window.
+"""
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """
+    Adaptive micro-batcher for one model.
+
+    Args:
+        name: Name used in stats
+        predict_fn: Blocking function mapping an (n, n_features) matrix to n results
+            (anything indexable by row)
+        max_batch_size: Flush as soon as this many rows are pending
+        max_wait_ms: Upper bound of the batching window
+        runner: Async callable running predict_fn(X) off the event loop
+            (default: asyncio.to_thread)
+    """
+
+    def __init__(self, name: str, predict_fn: Callable[[np.ndarray], Any],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 runner: Optional[Callable[..., Awaitable[Any]]] = None):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.runner = runner or asyncio.to_thread
+
+        self.window = self.max_wait
+        self._pending: List[Tuple[np.ndarray, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight = 0
+
+        self.batches = 0
+        self.rows = 0
+        self.queue_wait_seconds = 0.0
+        self.histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.histogram_overflow = 0
+
+    async def predict(self, row: np.ndarray) -> Any:
+        """Score one feature row (1-D or shape (1, n_features)) and return its result row."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((np.asarray(row).reshape(-1), future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(timed_out=False)
+        elif self._inflight == 0 and self.window <= 0:
+            # Idle model and no window: score right away
+            self._flush(timed_out=False)
+        elif self._timer is None and self._inflight == 0:
+            self._timer = loop.call_later(self.window, self._flush, True)
+        # While a batch is running, pending rows are flushed when it completes
+
+        return await future
+
+    def _flush(self, timed_out: bool):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [item for item in self._pending[:self.max_batch_size] if not item[1].done()]
+        self._pending = self._pending[self.max_batch_size:]
+        if not batch:
+            return
+
+        if timed_out:
+            self._adapt_window(len(batch))
+        self._record(batch)
+        self._inflight += 1
+        # A batch serves several requests, so it runs outside the context (and stage
+        # timers) of whichever request happened to trigger the flush
+        asyncio.get_running_loop().create_task(self._run(batch), context=contextvars.Context())
+
+    def _adapt_window(self, batch_size: int):
+        """Shrink the window while it only ever catches one row; grow it when it pays off."""
+        if batch_size <= 1:
+            self.window = self.window / 2 if self.window > 0.00005 else 0.0
+        else:
+            self.window = min(self.max_wait, max(self.window, 0.00025) * 1.5)
+
+    def _record(self, batch):
+        now = time.perf_counter()
+        self.batches += 1
+        self.rows += len(batch)
+        self.queue_wait_seconds += sum(now - submitted for _, _, submitted in batch)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if len(batch) <= bucket:
+                self.histogram[bucket] += 1
+                break
+        else:
+            self.histogram_overflow += 1
+
+    async def _run(self, batch):
+        X = np.vstack([row for row, _, _ in batch])
+        try:
+            results = await self.runner(self.predict_fn, X)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for i, (_, future, _) in enumerate(batch):
+                if not future.done():
+                    future.set_result(results[i])
+        finally:
+            self._inflight -= 1
+
+        # Rows that arrived while the model was busy
+        if self._pending and self._inflight == 0:
+            if len(self._pending) > 1:
+                self._adapt_window(len(self._pending))
+            self._flush(timed_out=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size histogram and window state for /health."""
+        histogram = {str(bucket): count for bucket, count in self.histogram.items()}
+        histogram['+Inf'] = self.histogram_overflow
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "window_ms": round(self.window * 1000, 3),
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "avg_queue_wait_ms": round(self.queue_wait_seconds / self.rows * 1000, 3) if self.rows else 0.0,
+            "pending": len(self._pending),
+            "batch_size_histogram": histogram
+        }
@@ -0,0 +1,164 @@
+"""
+Model Artifacts Module
+Uncompressed, memory-mapped copies of the large model arrays, shared by all API workers.
+
+An artifact is a directory of .npy files plus meta.json. Opening it with mmap_mode='r'
+maps the files read-only, so every worker reads the same page-cache pages instead of
+holding a private copy, and workers forked from a master that loaded the models
+(see prefork.py) share them without even mapping them again.
+
+sklearn estimators copy their tree arrays into private memory when unpickled, so the
+career model is shared through its compiled forest rather than career_model.pkl.
+
+Usage:
+    python model_artifacts.py        # re-export shared artifacts for the served models
+"""
+
+import json
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+MODELS_DIR = 'ml/models'
+SHARED_DIR = 'shared'
+META_FILE = 'meta.json'
+CAREER_FOREST_ARTIFACT = 'career_forest'
+HASHING_IDF_ARTIFACT = 'hashing_idf'
+
+
+def atomic_write(path: str, write):
+    """Write a file through a temporary name and rename it into place."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def artifact_dir(models_dir: str, name: str) -> str:
+    """Directory of a shared artifact inside a models directory."""
+    return os.path.join(models_dir, SHARED_DIR, name)
+
+
+def has_artifact(path: str) -> bool:
+    """True if a complete artifact exists at path (meta.json is written last)."""
+    return os.path.exists(os.path.join(path, META_FILE))
+
+
+def save_arrays(path: str, arrays: Dict[str, np.ndarray], meta: Optional[dict] = None) -> str:
+    """
+    Write arrays as uncompressed .npy files plus meta.json.
+
+    Args:
+        path: Artifact directory (created if needed)
+        arrays: Name -> array; object arrays are rejected since they cannot be mapped
+        meta: Extra JSON-serializable metadata
+
+    Returns:
+        The artifact directory
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ValueError(f"Array '{name}' has dtype object and cannot be memory-mapped")
+        atomic_write(os.path.join(path, f"{name}.npy"), lambda f, a=array: np.save(f, a, allow_pickle=False))
+
+    meta = dict(meta or {}, arrays=sorted(arrays))
+    atomic_write(os.path.join(path, META_FILE), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+    return path
+
+
+def load_arrays(path: str, mmap_mode: Optional[str] = 'r') -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Open an artifact written by save_arrays().
+
+    Args:
+        path: Artifact directory
+        mmap_mode: 'r' to map the files read-only (shared pages), None to read private copies
+
+    Returns:
+        Tuple of (name -> array, metadata)
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+
+    arrays = {}
+    for name in meta['arrays']:
+        array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+        # Plain ndarray views keep the mapping but skip np.memmap's per-operation wrapping
+        arrays[name] = array.view(np.ndarray) if isinstance(array, np.memmap) else array
+    return arrays, meta
+
+
+def load_pickle(path: str, mmap_mode: Optional[str] = 'r'):
+    """joblib.load with large arrays memory-mapped (pickles are saved uncompressed)."""
+    import joblib
+
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def read_memory_usage(pid: int) -> Dict[str, int]:
+    """
+    Memory of a process from /proc/<pid>/smaps_rollup, in bytes (Linux only).
+
+    Returns:
+        Dict with rss, pss, shared (clean + dirty) and private (clean + dirty, i.e. USS)
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+
+def export_shared_artifacts(models_dir: str = MODELS_DIR):
+    """
+    Write the memory-mappable copies of the career forest and the hashing IDF vector.
+
+    Returns:
+        List of written artifact directories
+    """
+    from compiled_forest import CompiledForest, COMPILED_FOREST_FILE
+    from hashing_matcher import HashingMatcher, HASHING_IDF_FILE
+
+    written = []
+    forest_path = os.path.join(models_dir, COMPILED_FOREST_FILE)
+    if os.path.exists(forest_path):
+        path = artifact_dir(models_dir, CAREER_FOREST_ARTIFACT)
+        CompiledForest.load(forest_path).save_mapped(path)
+        written.append(path)
+    else:
+        print(f"[WARNING] {forest_path} not found. Skipping the shared career forest.")
+
+    if os.path.exists(os.path.join(models_dir, HASHING_IDF_FILE)):
+        path = artifact_dir(models_dir, HASHING_IDF_ARTIFACT)
+        # The dense IDF vector is expanded from the sparse file once here instead of in every worker
+        save_arrays(path, {'idf': HashingMatcher.load_idf(models_dir)})
+        written.append(path)
+
+    for path in written:
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f"[OK] Shared artifact written to {path} ({size / 1e6:.2f} MB)")
+    return written
+
+
+def main():
+    """Re-export shared artifacts for the served models (train_models.py exports them into every version)."""
+    from model_registry import derive_version  # type: ignore
+
+    print("="*60)
+    print("SHARED MODEL ARTIFACTS EXPORT")
+    print("="*60)
+    path = derive_version(MODELS_DIR, export_shared_artifacts, 'model_artifacts.py')
+    print(f"[OK] Shared artifacts exported in {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+"""
+Model Registry Module
+Versioned, immutable model bundles with a manifest, and the pointer to the active one.
+
+Layout inside the models directory:
+    versions/<version>/          Every artifact of one training run plus manifest.json
+    CURRENT                      JSON pointer {"version": ...} to the bundle the API serves
+
+A training run writes into a staging directory, which publish_version() checksums,
+renames into versions/ and makes read-only before switching CURRENT with an atomic
+rename. The API watches CURRENT and swaps to the new bundle as a whole, so a request
+never sees a model from one run paired with encoders from another.
+
+A models directory without CURRENT is served as a single unversioned bundle (the
+layout before the registry existed).
+
+Usage:
+    python model_registry.py list
+    python model_registry.py promote <version>     # switch CURRENT (e.g. roll back)
+    python model_registry.py import-flat           # publish the flat models/ files as a version
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from model_artifacts import atomic_write
+
+MODELS_DIR = 'ml/models'
+VERSIONS_DIR = 'versions'
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+STAGING_PREFIX = '.staging-'
+UNVERSIONED = 'unversioned'
+
+# Files of a flat models directory that belong to a bundle (job_index/ is live data, not a model)
+BUNDLE_FILES = [
+    'career_model.pkl',
+    'career_forest.npz',
+    'skill_gap_model.pkl',
+    'tfidf_vectorizer.pkl',
+    'hashing_idf.npz',
+    'education_encoder.pkl',
+    'interest_encoder.pkl',
+    'experience_scaler.pkl',
+    'target_encoder.pkl',
+    'career_answer_table.npy',
+    'career_answer_table.json',
+    'shared'
+]
+
+
+class ModelBundle:
+    """
+    Everything loaded from one model version. The API serves a single bundle reference
+    and replaces it as a whole, so one request only ever sees artifacts of one version.
+    """
+
+    def __init__(self, version: str, path: str, manifest: Optional[dict] = None):
+        self.version = version
+        self.path = path
+        self.manifest = manifest
+        self.loaded_at = time.time()
+
+        self.career_model = None
+        self.skill_gap_model = None
+        self.tfidf_vectorizer = None
+        self.preprocessor = None
+        self.inference_encoder = None
+        self.answer_table = None
+        self.hashing_matcher = None
+        self.role_registry = None
+        self.career_batcher = None
+
+    @property
+    def models_loaded(self) -> bool:
+        return all(artifact is not None for artifact in (
+            self.career_model, self.skill_gap_model, self.tfidf_vectorizer, self.preprocessor
+        ))
+
+    def info(self) -> Dict:
+        """Version details for /health."""
+        return {
+            "version": self.version,
+            "path": self.path,
+            "created_at": (self.manifest or {}).get('created_at'),
+            "loaded_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.loaded_at))
+        }
+
+
+def new_version_id() -> str:
+    """Sortable version id: UTC timestamp plus a random suffix."""
+    return time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()) + '-' + uuid.uuid4().hex[:6]
+
+
+def version_dir(models_root: str, version: str) -> str:
+    return os.path.join(models_root, VERSIONS_DIR, version)
+
+
+def _bundle_files(path: str) -> List[str]:
+    """Relative paths of every file in a bundle directory except the manifest."""
+    files = []
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            rel = os.path.relpath(os.path.join(dirpath, filename), path)
+            if rel != MANIFEST_FILE:
+                files.append(rel.replace(os.sep, '/'))
+    return sorted(files)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_version(models_root: str = MODELS_DIR) -> Tuple[str, str]:
+    """
+    Create an empty staging directory for a training run.
+
+    Returns:
+        Tuple of (version id, staging directory)
+    """
+    version = new_version_id()
+    staging = os.path.join(models_root, VERSIONS_DIR, STAGING_PREFIX + version)
+    os.makedirs(staging)
+    return version, staging
+
+
+def discard_staging(staging: str):
+    """Remove the staging directory of a training run that did not complete."""
+    shutil.rmtree(staging, ignore_errors=True)
+    print(f"[INFO] Discarded incomplete model version in {staging}")
+
+
+def publish_version(models_root: str, staging: str, version: str,
+                    metadata: Optional[dict] = None, activate: bool = True) -> str:
+    """
+    Seal a staging directory as an immutable version and optionally make it current.
+
+    Args:
+        models_root: Models directory holding versions/ and CURRENT
+        staging: Directory returned by stage_version()
+        version: Version id returned by stage_version()
+        metadata: Extra JSON-serializable fields for the manifest (e.g. metrics)
+        activate: Point CURRENT at the new version
+
+    Returns:
+        The version directory
+    """
+    manifest = {
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'files': {rel: {'size': os.path.getsize(os.path.join(staging, rel)),
+                        'sha256': _sha256(os.path.join(staging, rel))}
+                  for rel in _bundle_files(staging)},
+        **(metadata or {})
+    }
+    atomic_write(os.path.join(staging, MANIFEST_FILE),
+                 lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+
+    path = version_dir(models_root, version)
+    os.rename(staging, path)
+    for rel in _bundle_files(path) + [MANIFEST_FILE]:
+        file_path = os.path.join(path, rel)
+        os.chmod(file_path, os.stat(file_path).st_mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+    print(f"[OK] Published model version {version} ({len(manifest['files'])} files) to {path}")
+
+    if activate:
+        set_current(models_root, version)
+    return path
+
+
+def derive_version(models_root: str, build: Callable[[str], object], source: str) -> str:
+    """
+    Rebuild derived artifacts (answer table, compiled forest, shared arrays) for the
+    served models.
+
+    Published versions are immutable, so build(directory) runs on a copy of the current
+    version, which is then published as a new version and made current. Without CURRENT,
+    build runs in place on the flat models directory.
+
+    Returns:
+        The directory build() wrote to
+    """
+    current = read_current(models_root)
+    if current is None:
+        build(models_root)
+        return models_root
+
+    version, staging = stage_version(models_root)
+    try:
+        shutil.copytree(version_dir(models_root, current), staging, dirs_exist_ok=True)
+        os.remove(os.path.join(staging, MANIFEST_FILE))
+        for rel in _bundle_files(staging):
+            file_path = os.path.join(staging, rel)
+            os.chmod(file_path, os.stat(file_path).st_mode | stat.S_IWUSR)
+        build(staging)
+    except BaseException:
+        discard_staging(staging)
+        raise
+    return publish_version(models_root, staging, version, {'source': source, 'parent': current})
+
+
+def set_current(models_root: str, version: str):
+    """
+    Atomically point CURRENT at an existing version.
+
+    Raises:
+        ValueError: If the version does not exist or has no manifest
+    """
+    if not os.path.exists(os.path.join(version_dir(models_root, version), MANIFEST_FILE)):
+        raise ValueError(f"Model version '{version}' not found in {os.path.join(models_root, VERSIONS_DIR)}")
+    atomic_write(os.path.join(models_root, CURRENT_FILE),
+                 lambda f: f.write(json.dumps({'version': version}).encode('utf-8')))
+    print(f"[OK] Current model version is now {version}")
+
+
+def read_current(models_root: str = MODELS_DIR) -> Optional[str]:
+    """Version named by CURRENT, or None for an unversioned models directory."""
+    try:
+        with open(os.path.join(models_root, CURRENT_FILE)) as f:
+            return json.load(f)['version']
+    except FileNotFoundError:
+        return None
+
+
+def resolve_models_dir(models_root: str = MODELS_DIR) -> Tuple[str, str]:
+    """
+    Directory of the bundle to serve.
+
+    Returns:
+        Tuple of (version, directory); (UNVERSIONED, models_root) without CURRENT
+    """
+    version = read_current(models_root)
+    if version is None:
+        return UNVERSIONED, models_root
+    return version, version_dir(models_root, version)
+
+
+def read_manifest(path: str) -> Dict:
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def verify_version(path: str, checksums: bool = True) -> Dict:
+    """
+    Check a version directory against its manifest before loading it.
+
+    Raises:
+        ValueError: If a file is missing, has the wrong size or (with checksums) the wrong hash
+
+    Returns:
+        The manifest
+    """
+    manifest = read_manifest(path)
+    for rel, expected in manifest['files'].items():
+        file_path = os.path.join(path, rel)
+        if not os.path.exists(file_path):
+            raise ValueError(f"{rel} listed in the manifest is missing")
+        if os.path.getsize(file_path) != expected['size']:
+            raise ValueError(f"{rel} has size {os.path.getsize(file_path)}, manifest says {expected['size']}")
+        if checksums and _sha256(file_path) != expected['sha256']:
+            raise ValueError(f"{rel} does not match its manifest checksum")
+    return manifest
+
+
+def list_versions(models_root: str = MODELS_DIR) -> List[str]:
+    """Published versions, oldest first."""
+    root = os.path.join(models_root, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if not name.startswith(STAGING_PREFIX) and os.path.exists(os.path.join(root, name, MANIFEST_FILE)))
+
+
+def import_flat(models_root: str = MODELS_DIR, activate: bool = True) -> str:
+    """Publish the bundle files of a flat (unversioned) models directory as a new version."""
+    version, staging = stage_version(models_root)
+    for name in BUNDLE_FILES:
+        source = os.path.join(models_root, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(staging, name))
+        elif os.path.exists(source):
+            shutil.copy2(source, os.path.join(staging, name))
+    return publish_version(models_root, staging, version, {'source': 'import-flat'}, activate=activate)
+
+
+def main():
+    """List, promote or import model versions."""
+    usage = "Usage: python model_registry.py list | promote <version> | import-flat"
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == 'list':
+        current = read_current()
+        for version in list_versions():
+            manifest = read_manifest(version_dir(MODELS_DIR, version))
+            marker = '*' if version == current else ' '
+            print(f"{marker} {version}  {manifest['created_at']}  {len(manifest['files'])} files")
+        if current is None:
+            print(f"(no {CURRENT_FILE}; serving the flat files in {MODELS_DIR})")
+    elif command == 'promote' and len(sys.argv) == 3:
+        set_current(MODELS_DIR, sys.argv[2])
+    elif command == 'import-flat':
+        import_flat()
+    else:
+        print(usage)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Pre-fork Server
+Loads the models once in a master process, then forks uvicorn workers that share them.
+
+`uvicorn --workers N` starts every worker as a fresh interpreter that imports the app and
+loads its own copy of the models. Here the master imports api.py, loads the models
+(memory-mapped where exported, see model_artifacts.py), freezes the GC so collections in
+the workers do not write to inherited objects, and forks the workers onto one listening
+socket. Pages loaded before the fork stay shared until a worker writes to them.
+
+The master supervises the workers: one that exits while the server is running is forked
+again from the master (with the preloaded models), after a short pause if it died right
+after starting. With more than one worker, interview sessions default to the sqlite
+backend so every worker sees them, and the workers share a METRICS_DIR so /metrics
+reports all of them.
+
+Usage:
+    python prefork.py [--workers 4] [--host 0.0.0.0] [--port 8000] [--no-preload]
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+# A worker that exits sooner than this after starting is restarted after RESTART_DELAY,
+# so a worker that crashes on startup does not fork in a tight loop
+MIN_WORKER_LIFETIME = 5.0
+RESTART_DELAY = 1.0
+
+
+def load_config(log_level: str):
+    """Import the app and uvicorn's protocol modules (what each worker would otherwise import)."""
+    import uvicorn  # type: ignore
+    import api  # type: ignore
+
+    config = uvicorn.Config(api.app, log_level=log_level)
+    config.load()
+    return config
+
+
+def serve_worker(sock: socket.socket, config):
+    """Run one uvicorn server on an inherited listening socket (in the forked child)."""
+    import uvicorn  # type: ignore
+
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(sock: socket.socket, config, log_level: str, slot: int) -> int:
+    """
+    Fork one worker serving on sock. Returns its pid (in the master).
+
+    slot (0..workers-1) is the worker's WORKER_ID, its label in /metrics; a replacement
+    worker gets the slot of the one it replaces.
+    """
+    pid = os.fork()
+    if pid == 0:
+        os.environ['WORKER_ID'] = str(slot)
+        # Drop the master's handlers (they would signal the other workers); uvicorn installs its own
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            serve_worker(sock, config or load_config(log_level))
+        finally:
+            os._exit(0)
+    print(f"[OK] Started worker {pid} (slot {slot})")
+    return pid
+
+
+def main():
+    """Bind the socket, preload the models, fork the workers and restart any that die."""
+    parser = argparse.ArgumentParser(description="Pre-fork server for the ML API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '2')))
+    parser.add_argument('--log-level', default='info')
+    parser.add_argument('--no-preload', action='store_true',
+                        help="Let every worker load its own models (uvicorn --workers behaviour)")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    metrics_dir = None
+    if args.workers > 1:
+        # In-memory sessions would be invisible to the other workers
+        os.environ.setdefault('INTERVIEW_SESSION_BACKEND', 'sqlite')
+        if 'METRICS_DIR' not in os.environ:
+            # Without it /metrics would only report whichever worker answers the scrape
+            metrics_dir = tempfile.mkdtemp(prefix='ml-api-metrics-')
+            os.environ['METRICS_DIR'] = metrics_dir
+
+    config = None
+    if not args.no_preload:
+        config = load_config(args.log_level)
+        import api  # type: ignore
+        api.preload_models()
+        # Move everything allocated so far out of the collector's reach, so GC passes
+        # in the workers do not touch (and un-share) the inherited objects
+        gc.collect()
+        gc.freeze()
+        print(f"[OK] Models preloaded in master {os.getpid()}")
+
+    # pid -> (slot, start time); the master keeps the socket open to fork replacements
+    workers = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def start_worker(slot: int):
+        pid = spawn_worker(sock, config, args.log_level, slot)
+        workers[pid] = (slot, time.monotonic())
+        if stopping:
+            # A stop signal arrived while forking
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(args.workers):
+        start_worker(slot)
+
+    exit_code = 0
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker = workers.pop(pid, None)
+        if worker is None:
+            continue
+        slot, started = worker
+        code = os.waitstatus_to_exitcode(status)
+        if stopping:
+            if code not in (0, -signal.SIGTERM):
+                exit_code = 1
+            continue
+
+        print(f"[WARNING] Worker {pid} exited with code {code}; starting a replacement")
+        if time.monotonic() - started < MIN_WORKER_LIFETIME:
+            time.sleep(RESTART_DELAY)
+        if not stopping:
+            start_worker(slot)
+    sock.close()
+    if metrics_dir is not None:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -180,15 +180,81 @@ class FeaturePreprocessor:
         preprocessor.is_fitted = True
         
         return preprocessor
+    
+    def compile_inference_encoder(self) -> 'InferenceEncoder':
+        """Build a pandas-free single-row encoder from the fitted encoders."""
+        return InferenceEncoder(self)
+
+
+class InferenceEncoder:
+    """
+    Compiled, pandas-free version of FeaturePreprocessor.create_feature_matrix for serving.
+    
+    The fitted encoders are read once into dict lookups and the scaler into a
+    precomputed mean/scale, so encoding a profile only writes one NumPy row.
+    Output is identical to create_feature_matrix(df, fit=False).
+    """
+    
+    def __init__(self, preprocessor: FeaturePreprocessor):
+        if not preprocessor.is_fitted:
+            raise ValueError("Preprocessor must be fitted before compiling.")
+        
+        self.education_index = {
+            label: idx for idx, label in enumerate(preprocessor.education_encoder.classes_)
+        }
+        self.interest_index = {
+            label: idx for idx, label in enumerate(preprocessor.interest_encoder.classes_)
+        }
+        self.skill_index = {skill: idx for idx, skill in enumerate(SKILLS_LIST)}
+        
+        scaler = preprocessor.experience_scaler
+        self.experience_mean = float(scaler.mean_[0]) if scaler.with_mean else 0.0
+        self.experience_scale = float(scaler.scale_[0]) if scaler.with_std else 1.0
+        
+        self.n_features = 3 + len(SKILLS_LIST)
+    
+    def encode_profile(self, education: str, skills, interest: str, experience_years) -> np.ndarray:
+        """
+        Encode a single profile into a (1, n_features) feature row.
+        
+        Args:
+            education: Education label
+            skills: List of skill names (entries may themselves be comma-separated)
+            interest: Interest label
+            experience_years: Years of experience
+            
+        Returns:
+            Feature row as numpy array, same layout as create_feature_matrix
+        """
+        try:
+            education_code = self.education_index[education]
+            interest_code = self.interest_index[interest]
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}")
+        
+        row = np.zeros((1, self.n_features), dtype=np.float64)
+        row[0, 0] = education_code
+        row[0, 1] = interest_code
+        row[0, 2] = (float(experience_years) - self.experience_mean) / self.experience_scale
+        
+        # Same tokenization as multi_hot_encode_skills on the ', '-joined string
+        for entry in skills:
+            for skill in str(entry).split(','):
+                skill_idx = self.skill_index.get(skill.strip())
+                if skill_idx is not None:
+                    row[0, 3 + skill_idx] = 1.0
+        
+        return row
 
 
-def load_and_preprocess_data(train_path: str, test_path: str):
+def load_and_preprocess_data(train_path: str, test_path: str, save_dir: str = FEATURE_DIR):
     """
     Load and preprocess training and test data.
     
     Args:
         train_path: Path to training CSV file
         test_path: Path to test CSV file
+        save_dir: Directory to save the fitted encoders to
         
     Returns:
         Tuple of (X_train, X_test, y_train, y_test, preprocessor)
@@ -213,7 +279,7 @@ def load_and_preprocess_data(train_path: str, test_path: str):
     y_test = preprocessor.encode_target_labels(test_df['target_role'], fit=False)
     
     # Save encoders for later use
-    preprocessor.save_encoders()
+    preprocessor.save_encoders(save_dir)
     
     print(f"[OK] Feature engineering complete!")
     print(f"  Training features shape: {X_train.shape}")
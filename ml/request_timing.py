@@ -0,0 +1,280 @@
+"""
+Request Timing Module
+Request-scoped stage timers reported in the Server-Timing response header, and an opt-in
+cProfile of a single request.
+
+ServerTimingMiddleware puts a RequestTiming in a context variable for each request. Code on
+the request path times its stages with stage(), which also feeds a metrics histogram when
+given one. Outside a request (warm-up, benchmarks) the stages only feed the histograms.
+
+The header lists, in milliseconds:
+    parse       body parsing and request validation, before the endpoint runs
+    <stages>    named stages inside the endpoint (validate, features, inference, tfidf, ...)
+    queue       time waiting for a CPU executor slot
+    serialize   response validation and JSON encoding after the endpoint returned
+    total       request start until the response headers are sent
+
+Streamed bodies are sent after the header, so only the work before the first chunk is
+covered for streaming endpoints.
+"""
+
+import cProfile
+import functools
+import hmac
+import inspect
+import os
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi.routing import APIRoute  # type: ignore
+
+PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+
+_current: ContextVar[Optional['RequestTiming']] = ContextVar('request_timing', default=None)
+# Only one profile at a time: on Python 3.12+ cProfile hooks every thread of the process
+_profile_lock = threading.Lock()
+
+
+class RequestTiming:
+    """Stage durations of one request, in seconds."""
+
+    __slots__ = ('start', 'stages', 'handler_start', 'handler_end', 'profile_id', 'profile_path')
+
+    def __init__(self, profile_path: Optional[str] = None):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.handler_start: Optional[float] = None
+        self.handler_end: Optional[float] = None
+        self.profile_path = profile_path
+        self.profile_id = os.path.basename(profile_path)[:-len('.prof')] if profile_path else None
+
+    def add(self, name: str, seconds: float):
+        """Add to a stage; a stage entered more than once is reported as the sum."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        """Server-Timing header value, measured up to now."""
+        now = time.perf_counter()
+        entries = []
+        if self.handler_start is not None:
+            entries.append(('parse', self.handler_start - self.start))
+        entries.extend(self.stages.items())
+        if self.handler_end is not None:
+            entries.append(('serialize', now - self.handler_end))
+        entries.append(('total', now - self.start))
+        return ', '.join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in entries)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """Timing of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def record_stage(name: str, seconds: float):
+    """Add a measured duration to the current request's stages (no-op outside a request)."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+class stage:
+    """
+    Time a block as a request stage and, optionally, into a metrics histogram.
+
+    Args:
+        name: Server-Timing stage name (a token: letters, digits, - and _)
+        histogram: metrics.Histogram to observe the duration into
+        labels: Histogram label values
+    """
+
+    __slots__ = ('name', 'histogram', 'labels', 'start')
+
+    def __init__(self, name: str, histogram=None, *labels: str):
+        self.name = name
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.histogram is not None:
+            self.histogram.observe(elapsed, *self.labels)
+        timing = _current.get()
+        if timing is not None:
+            timing.add(self.name, elapsed)
+        return False
+
+
+def profiling_requested() -> bool:
+    """True if the current request asked for a profile."""
+    timing = _current.get()
+    return timing is not None and timing.profile_path is not None
+
+
+def run_profiled(profile_path: str, fn, *args):
+    """
+    Call fn(*args) under cProfile and write the stats to profile_path.
+
+    Runs wherever fn would have run (executor thread or process). If another profile is
+    being taken, fn runs unprofiled and no file is written.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return fn(*args)
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) owns the hook
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+    finally:
+        _profile_lock.release()
+
+
+def new_profile_path(profile_dir: str, keep: int = 50) -> str:
+    """File name for a new request profile; the oldest profiles beyond keep are deleted."""
+    os.makedirs(profile_dir, exist_ok=True)
+    prune_profiles(profile_dir, keep - 1)
+    return os.path.join(profile_dir, uuid.uuid4().hex[:12] + '.prof')
+
+
+def prune_profiles(profile_dir: str, keep: int):
+    """Delete all but the keep most recent profiles in profile_dir."""
+    profiles = []
+    for entry in os.scandir(profile_dir):
+        if entry.name.endswith('.prof'):
+            try:
+                profiles.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+    profiles.sort()
+    for _, path in profiles[:max(0, len(profiles) - keep)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def profile_token_matches(header_value, token) -> bool:
+    """Constant-time comparison of an X-Profile header with the profile token."""
+    if header_value is None or token is None:
+        return False
+    if isinstance(header_value, str):
+        header_value = header_value.encode('latin-1', 'replace')
+    if isinstance(token, str):
+        token = token.encode('latin-1')
+    return hmac.compare_digest(header_value, token)
+
+
+def profile_report(profile_dir: str, profile_id: str, limit: int = 50) -> Optional[str]:
+    """pstats text report of a stored profile (sorted by cumulative time), or None if unknown."""
+    import io
+    import pstats
+
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(profile_dir, profile_id + '.prof')
+    if not os.path.exists(path):
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+class ServerTimingMiddleware:
+    """
+    Adds the Server-Timing header to every HTTP response.
+
+    Args:
+        app: ASGI app
+        profile_token: Requests with `X-Profile: <token>` are profiled; None disables
+            profiling (the header is then not even looked at)
+        profile_dir: Where request profiles are written
+        profile_keep: How many profiles to keep in profile_dir (the oldest are deleted)
+    """
+
+    def __init__(self, app, profile_token: Optional[str] = None, profile_dir: str = 'profiles',
+                 profile_keep: int = 50):
+        self.app = app
+        self.profile_token = profile_token.encode('latin-1') if profile_token else None
+        self.profile_dir = profile_dir
+        self.profile_keep = profile_keep
+
+    def _wants_profile(self, scope) -> bool:
+        for key, value in scope['headers']:
+            if key == b'x-profile':
+                return profile_token_matches(value, self.profile_token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile_path = None
+        if self.profile_token is not None and self._wants_profile(scope):
+            profile_path = new_profile_path(self.profile_dir, self.profile_keep)
+        timing = RequestTiming(profile_path)
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', timing.header().encode('latin-1')))
+                if profile_path is not None:
+                    # 'none' when the endpoint has no profiled section (or another profile was running)
+                    profile_id = timing.profile_id if os.path.exists(profile_path) else 'none'
+                    headers.append((b'x-profile-id', profile_id.encode('latin-1')))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        token = _current.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+def timed_endpoint(endpoint):
+    """Wrap an endpoint to mark where the handler starts and ends (for parse and serialize)."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timing = _current.get()
+            if timing is None:
+                return await endpoint(*args, **kwargs)
+            timing.handler_start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timing.handler_end = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timing = _current.get()
+            if timing is None:
+                return endpoint(*args, **kwargs)
+            timing.handler_start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timing.handler_end = time.perf_counter()
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """APIRoute whose endpoint reports its start and end to the request timing."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
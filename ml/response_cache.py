@@ -0,0 +1,191 @@
+"""
+Response Cache Module
+LRU + TTL cache with optional SQLite backing store and single-flight request coalescing,
+used to avoid repeating slow upstream LLM calls for identical requests.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of a JSON-serializable payload."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class DiskStore:
+    """
+    SQLite key/value store with per-entry expiry, shared across restarts and workers.
+
+    The connection is opened on first use and reopened in a forked child: SQLite
+    connections must not be carried across fork, and api.py is imported by the
+    pre-fork master (prefork.py) before the workers are forked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._inherited = []
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection (caller holds the lock)."""
+        if self._conn is None or self._pid != os.getpid():
+            if self._conn is not None:
+                # Inherited from the parent: never use or close it (closing releases the
+                # parent's locks), and keep it referenced so garbage collection does not either
+                self._inherited.append(self._conn)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at as a time.time() timestamp) for a live entry, or None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache with TTL expiry, optional disk backing and single-flight.
+
+    Concurrent get_or_compute() calls for the same key share one computation
+    (including the disk lookup). Failed computations are not cached; the exception
+    is raised to every waiter. SQLite calls run in a worker thread, never on the
+    event loop.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400.0,
+                 disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = DiskStore(disk_path) if disk_path else None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh value from memory or None (the disk is only read by get_or_compute)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        return None
+
+    async def set(self, key: str, value: Any):
+        """Store a value in memory and, if configured, on disk."""
+        self._store_memory(key, value, self.ttl_seconds)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, time.time() + self.ttl_seconds)
+
+    def _store_memory(self, key: str, value: Any, ttl_seconds: float):
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, or run compute() once for all concurrent callers.
+
+        Args:
+            key: Cache key (see make_cache_key)
+            compute: Zero-argument coroutine factory producing a JSON-serializable value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._inflight[key] = task
+
+        # Shield so one disconnecting client does not cancel the shared upstream call
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Read the disk store, then compute and store on a miss."""
+        try:
+            if self.disk is not None:
+                entry = await asyncio.to_thread(self.disk.get, key)
+                if entry is not None:
+                    value, expires_at = entry
+                    self.disk_hits += 1
+                    # Keep the disk row's expiry rather than starting a fresh TTL
+                    self._store_memory(key, value, expires_at - time.time())
+                    return value
+
+            self.misses += 1
+            value = await compute()
+            await self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_rate": round((self.hits + self.disk_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "disk_backed": self.disk is not None
+        }
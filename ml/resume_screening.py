@@ -0,0 +1,256 @@
+"""
+Resume Screening Module
+Keyword extraction shared by the matching endpoints, and bulk scoring of many resumes
+against one job description, either in a thread or spread across a process pool.
+"""
+
+import asyncio
+import functools
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from hashing_matcher import HashedVocabulary
+
+
+# Feature-name arrays per vectorizer, built once instead of on every request
+_feature_names_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_feature_names(vectorizer) -> np.ndarray:
+    """Return vectorizer.get_feature_names_out(), cached per vectorizer instance."""
+    if isinstance(vectorizer, HashedVocabulary):
+        return vectorizer
+    feature_names = _feature_names_cache.get(vectorizer)
+    if feature_names is None:
+        feature_names = vectorizer.get_feature_names_out()
+        _feature_names_cache[vectorizer] = feature_names
+    return feature_names
+
+
+def get_missing_keywords(source_vec, target_vec, vectorizer, limit: int):
+    """
+    Return the top target keywords that are absent from the source text.
+    
+    Works on the CSR indices/data of the single-row vectors, so the cost scales
+    with the number of terms in the documents rather than the vocabulary size.
+    """
+    target_vec = target_vec.tocsr()
+    source_vec = source_vec.tocsr()
+    
+    target_terms = target_vec.indices
+    target_scores = target_vec.data
+    source_terms = source_vec.indices[source_vec.data != 0]
+    
+    # Candidates: positive-weight target terms that the source does not contain
+    missing = (target_scores > 0) & ~np.isin(target_terms, source_terms, assume_unique=True)
+    terms = target_terms[missing]
+    scores = target_scores[missing]
+    
+    if len(terms) > limit:
+        # Keep everything tied with the limit-th best score, then order exactly
+        kth_score = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        keep = scores >= kth_score
+        terms, scores = terms[keep], scores[keep]
+    
+    # Highest score first, ties by higher feature index. This order is deterministic; the
+    # former reversed np.argsort (unstable quicksort) ordered, and cut at the limit, tied
+    # keywords arbitrarily, so tied results can differ from it
+    order = np.lexsort((-terms, -scores))[:limit]
+    feature_names = get_feature_names(vectorizer)
+    return [str(term) for term in feature_names[terms[order]]]
+
+
+# Vectorizer of a pool worker process, set once by init_worker
+_worker_vectorizer = None
+
+
+def init_worker(vectorizer):
+    """Process pool initializer: keep the vectorizer so tasks do not pickle it each time."""
+    global _worker_vectorizer
+    _worker_vectorizer = vectorizer
+
+
+def score_resume_chunk(start: int, resume_texts: List[str], job_vec, vocabulary=None,
+                       keyword_limit: int = 10, vectorizer=None) -> List[Tuple[int, float, List[str]]]:
+    """
+    Score a chunk of resumes against an already vectorized job description.
+
+    Args:
+        start: Position of the first resume of the chunk in the upload
+        resume_texts: Resume texts of the chunk
+        job_vec: L2-normalized job description vector (1 x n_features)
+        vocabulary: Index -> term lookup for missing keywords (default: the vectorizer)
+        keyword_limit: Number of missing keywords per resume
+        vectorizer: Vectorizer to use; pool workers fall back to the one from init_worker
+
+    Returns:
+        List of (position, cosine similarity, missing keywords)
+    """
+    vectorizer = vectorizer if vectorizer is not None else _worker_vectorizer
+    vocabulary = vocabulary if vocabulary is not None else vectorizer
+
+    from sklearn.preprocessing import normalize
+
+    resume_vecs = normalize(vectorizer.transform(resume_texts), norm='l2', copy=False).tocsr()
+    similarities = (resume_vecs @ job_vec.T).toarray().ravel()
+    return [
+        (start + i, float(similarities[i]),
+         get_missing_keywords(resume_vecs[i], job_vec, vocabulary, keyword_limit))
+        for i in range(len(resume_texts))
+    ]
+
+
+class _Upload:
+    """Chunks of one upload that have not been submitted yet."""
+
+    __slots__ = ('executor', 'chunks')
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.chunks: "deque[Tuple[functools.partial, asyncio.Future]]" = deque()
+
+
+class BulkScreener:
+    """
+    Scores bulk resume uploads in chunks.
+
+    Uploads of at least process_threshold resumes go to a process pool; smaller ones run
+    on a thread pool of thread_workers threads owned by the screener (not the event loop's
+    default executor, which asyncio.to_thread calls share). At most max_pending_chunks
+    chunks (over all uploads) are submitted at a time. Each upload queues its own chunks,
+    and free slots are handed to the waiting uploads in turn, so a small upload that
+    arrives behind a large one starts on the next free slot.
+    """
+
+    def __init__(self, chunk_size: int = 200, max_workers: int = 2,
+                 process_threshold: int = 1000, max_pending_chunks: int = 8,
+                 thread_workers: int = 2):
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.process_threshold = process_threshold
+        self.max_pending_chunks = max_pending_chunks
+        self.thread_workers = thread_workers
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_vectorizer = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        # Uploads with chunks waiting for a slot, in round-robin order
+        self._waiting: "deque[_Upload]" = deque()
+
+        self.running_chunks = 0
+        self.waiting_chunks = 0
+        self.uploads = 0
+        self.resumes = 0
+
+    def _get_pool(self, vectorizer) -> ProcessPoolExecutor:
+        """Start the pool on first use, restarting it if the vectorizer was replaced."""
+        if self._pool is not None and self._pool_vectorizer is not vectorizer:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_worker,
+                initargs=(vectorizer,)
+            )
+            self._pool_vectorizer = vectorizer
+            print(f"[OK] Started bulk screening pool with {self.max_workers} workers")
+        return self._pool
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.thread_workers,
+                                               thread_name_prefix='bulk-screening')
+        return self._threads
+
+    async def score(self, vectorizer, job_vec, resume_texts: List[str], vocabulary=None,
+                    keyword_limit: int = 10) -> List[Tuple[int, float, List[str]]]:
+        """
+        Score every resume against job_vec.
+
+        Returns:
+            List of (position, cosine similarity, missing keywords) in upload order
+        """
+        self.uploads += 1
+        self.resumes += len(resume_texts)
+
+        loop = asyncio.get_running_loop()
+        use_pool = self.max_workers > 0 and len(resume_texts) >= self.process_threshold
+        upload = _Upload(self._get_pool(vectorizer) if use_pool else self._get_threads())
+
+        futures = []
+        for start in range(0, len(resume_texts), self.chunk_size):
+            chunk = resume_texts[start:start + self.chunk_size]
+            if use_pool:
+                task = functools.partial(score_resume_chunk, start, chunk, job_vec, vocabulary, keyword_limit)
+            else:
+                task = functools.partial(score_resume_chunk, start, chunk, job_vec, vocabulary,
+                                         keyword_limit, vectorizer)
+            future = loop.create_future()
+            upload.chunks.append((task, future))
+            futures.append(future)
+        self.waiting_chunks += len(upload.chunks)
+        self._waiting.append(upload)
+        self._dispatch()
+
+        try:
+            chunks = await asyncio.gather(*futures)
+        finally:
+            # A cancelled or failed upload gives up the chunks it has not started
+            self.waiting_chunks -= len(upload.chunks)
+            upload.chunks.clear()
+            for future in futures:
+                future.cancel()
+        return [result for chunk in chunks for result in chunk]
+
+    def _dispatch(self):
+        """Submit waiting chunks, one per upload in turn, while slots are free."""
+        while self.running_chunks < self.max_pending_chunks and self._waiting:
+            upload = self._waiting.popleft()
+            if not upload.chunks:
+                continue
+            task, future = upload.chunks.popleft()
+            self.waiting_chunks -= 1
+            if upload.chunks:
+                self._waiting.append(upload)
+
+            self.running_chunks += 1
+            done = asyncio.wrap_future(upload.executor.submit(task))
+            done.add_done_callback(functools.partial(self._chunk_done, future))
+
+    def _chunk_done(self, future: asyncio.Future, done: asyncio.Future):
+        self.running_chunks -= 1
+        if not future.done():
+            if done.cancelled():
+                future.cancel()
+            elif done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                future.set_result(done.result())
+        self._dispatch()
+
+    def shutdown(self):
+        """Stop the pools, dropping chunks that have not started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters for /health."""
+        return {
+            "pool_started": self._pool is not None,
+            "max_workers": self.max_workers,
+            "thread_workers": self.thread_workers,
+            "max_pending_chunks": self.max_pending_chunks,
+            "running_chunks": self.running_chunks,
+            "waiting_chunks": self.waiting_chunks,
+            "waiting_uploads": sum(1 for upload in self._waiting if upload.chunks),
+            "uploads": self.uploads,
+            "resumes": self.resumes
+        }
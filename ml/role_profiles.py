@@ -0,0 +1,128 @@
+"""
+Role Profiles Module
+Target-role descriptions for /api/linkedin-analyze, vectorized once at startup.
+
+Each profile keeps the role's TF-IDF vector, its norm and its terms sorted by weight, so a
+request only vectorizes the profile text and intersects sparse index arrays.
+"""
+
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Optional, Tuple
+
+from hashing_matcher import HashingMatcher
+from resume_screening import get_feature_names
+
+TARGET_ROLE_DESCRIPTIONS = {
+    'Data Analyst': "Looking for a Data Analyst with skills in Python, SQL, Excel, Data Visualization, Tableau, Power BI, Statistics.",
+    'Software Engineer': "Software Engineer needed with experience in Python, Java, JavaScript, React, System Design, Algorithms, Git, Database.",
+    'Backend Developer': "Backend developer familiar with Python, FastAPI, Node.js, SQL, NoSQL, APIs, Docker.",
+    'Frontend Developer': "Frontend developer proficient in HTML, CSS, JavaScript, React, UI/UX, responsive design.",
+    'ML Engineer': "Machine Learning Engineer with strong Python, TensorFlow, PyTorch, scikit-learn, Statistics, model deployment."
+}
+
+
+def default_role_description(role: str) -> str:
+    """Generic description used for roles without a registered one."""
+    return f"Looking for {role} with relevant industry skills, communication, and technical expertise."
+
+
+def text_vocabulary(vectorizer, *texts):
+    """Index -> term lookup for texts: the vectorizer itself, or a per-text hashed vocabulary."""
+    if isinstance(vectorizer, HashingMatcher):
+        return vectorizer.vocabulary_for(*texts)
+    return vectorizer
+
+
+def vector_norm(vector) -> float:
+    """L2 norm of a sparse row."""
+    return float(np.sqrt(np.dot(vector.data, vector.data)))
+
+
+class RoleProfile:
+    """TF-IDF vector of one role description with its norm and weight-ordered terms."""
+
+    __slots__ = ('role', 'vector', 'norm', 'top_terms', 'top_term_names')
+
+    def __init__(self, role: str, vector, vocabulary):
+        self.role = role
+        self.vector = sparse.csr_matrix(vector)
+        self.norm = vector_norm(self.vector)
+
+        positive = self.vector.data > 0
+        terms = self.vector.indices[positive]
+        scores = self.vector.data[positive]
+        # Highest weight first; ties broken by higher feature index, as in get_missing_keywords
+        self.top_terms = terms[np.lexsort((-terms, -scores))]
+        self.top_term_names = [str(term) for term in get_feature_names(vocabulary)[self.top_terms]]
+
+    def similarity(self, profile_vec, profile_norm: Optional[float] = None) -> float:
+        """Cosine similarity between a profile vector and this role."""
+        profile_norm = vector_norm(profile_vec) if profile_norm is None else profile_norm
+        if profile_norm == 0 or self.norm == 0:
+            return 0.0
+        return float(profile_vec.dot(self.vector.T)[0, 0]) / (profile_norm * self.norm)
+
+    def missing_terms(self, profile_vec, limit: int) -> List[str]:
+        """Highest-weight role terms that do not occur in the profile vector."""
+        present = profile_vec.indices[profile_vec.data != 0]
+        missing = np.flatnonzero(~np.isin(self.top_terms, present))[:limit]
+        return [self.top_term_names[pos] for pos in missing]
+
+
+class RoleProfileRegistry:
+    """
+    Role profiles built from one vectorizer, plus a stacked matrix of all role vectors
+    for scoring a profile against every role in one sparse matrix product.
+    """
+
+    def __init__(self, vectorizer, descriptions: Optional[Dict[str, str]] = None):
+        descriptions = descriptions if descriptions is not None else TARGET_ROLE_DESCRIPTIONS
+        self.vectorizer = vectorizer
+        self.roles = list(descriptions)
+
+        texts = [descriptions[role] for role in self.roles]
+        self.matrix = sparse.csr_matrix(vectorizer.transform(texts))
+        vocabulary = text_vocabulary(vectorizer, *texts)
+        self.profiles = {role: RoleProfile(role, self.matrix[i], vocabulary)
+                         for i, role in enumerate(self.roles)}
+        self.norms = np.array([self.profiles[role].norm for role in self.roles])
+
+    def get(self, role: str) -> RoleProfile:
+        """Registered profile for role, or one built from the generic description."""
+        profile = self.profiles.get(role)
+        if profile is not None:
+            return profile
+        return self.build_adhoc([role])[0]
+
+    def build_adhoc(self, roles: List[str]) -> List[RoleProfile]:
+        """Profiles for unregistered roles, vectorized in one call."""
+        texts = [default_role_description(role) for role in roles]
+        matrix = sparse.csr_matrix(self.vectorizer.transform(texts))
+        vocabulary = text_vocabulary(self.vectorizer, *texts)
+        return [RoleProfile(role, matrix[i], vocabulary) for i, role in enumerate(roles)]
+
+    def score_all(self, profile_vec, roles: Optional[List[str]] = None) -> List[Tuple[RoleProfile, float]]:
+        """
+        Cosine similarity of a profile vector against many roles with one matrix product.
+
+        Args:
+            profile_vec: Vectorized profile text (1 x n_features)
+            roles: Roles to score (default: every registered role)
+
+        Returns:
+            List of (RoleProfile, similarity) in the order of roles
+        """
+        if roles is None:
+            profiles, matrix, norms = [self.profiles[role] for role in self.roles], self.matrix, self.norms
+        else:
+            unknown = [role for role in dict.fromkeys(roles) if role not in self.profiles]
+            adhoc = dict(zip(unknown, self.build_adhoc(unknown))) if unknown else {}
+            profiles = [self.profiles.get(role) or adhoc[role] for role in roles]
+            matrix = sparse.vstack([profile.vector for profile in profiles], format='csr')
+            norms = np.array([profile.norm for profile in profiles])
+
+        dots = np.asarray(matrix @ profile_vec.T.toarray()).ravel()
+        denominator = norms * vector_norm(profile_vec)
+        similarities = np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
+        return list(zip(profiles, similarities.tolist()))
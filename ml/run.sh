@@ -17,8 +17,8 @@ if [ ! -d "venv" ] && [ ! -d ".venv" ]; then
     pip install -r requirements.txt
 fi
 
-# Start the application
-echo "Launching Uvicorn server..."
+# Start the application: models are loaded once and shared by the forked workers
+echo "Launching Uvicorn workers (pre-fork)..."
 echo "API will be available at http://0.0.0.0:${PORT:-8000}"
 
-exec uvicorn api:app --host 0.0.0.0 --port ${PORT:-8000} --workers 2
+exec python prefork.py --host 0.0.0.0 --port ${PORT:-8000} --workers ${WEB_CONCURRENCY:-2}
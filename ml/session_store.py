@@ -0,0 +1,439 @@
+"""
+Interview Session Store Module
+Bounded storage for interview sessions with a memory budget, idle TTL, LRU eviction
+and a background sweeper. Sessions live in process memory or in a SQLite database
+shared by all workers.
+"""
+
+import asyncio
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Approximate per-object overhead of a stored message: the (role, content) tuple plus list slot
+_MESSAGE_OVERHEAD = sys.getsizeof(('', '')) + 8
+_SESSION_OVERHEAD = 256
+
+
+class InterviewSession:
+    """Compact session record. Messages are (role, content) tuples; the system prompt lives only in the first one."""
+
+    __slots__ = ('session_id', 'role', 'level', 'tech_stack', 'question_count',
+                 'conversation', 'last_access', 'nbytes')
+
+    def __init__(self, session_id: str, role: str, level: str, tech_stack: str,
+                 question_count: int = 0, conversation: Optional[List[Tuple[str, str]]] = None):
+        self.session_id = session_id
+        self.role = role
+        self.level = level
+        self.tech_stack = tech_stack
+        self.question_count = question_count
+        self.conversation: List[Tuple[str, str]] = list(conversation or [])
+        self.last_access = time.monotonic()
+        self.nbytes = _SESSION_OVERHEAD + sum(
+            sys.getsizeof(value) for value in (session_id, role, level, tech_stack)
+        ) + sum(message_size(content) for _, content in self.conversation)
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Conversation in the {"role", "content"} form the LLM client expects."""
+        return [{"role": role, "content": content} for role, content in self.conversation]
+
+
+def message_size(content: str) -> int:
+    """Approximate memory held by one stored message."""
+    return _MESSAGE_OVERHEAD + sys.getsizeof(content)
+
+
+class MemorySessionStore:
+    """
+    In-process session store.
+
+    Sessions idle for longer than ttl_seconds are dropped by sweep() (run
+    periodically by the background sweeper). When the total size exceeds
+    max_bytes, the least recently used sessions are evicted first.
+    """
+
+    # Calls are plain dict operations and must stay on the event loop thread
+    blocking = False
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 1800.0,
+                 sweep_interval: float = 60.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._sessions: "OrderedDict[str, InterviewSession]" = OrderedDict()
+        self._nbytes = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def create(self, session_id: str, role: str, level: str, tech_stack: str,
+               question_count: int, conversation: List[Tuple[str, str]]) -> InterviewSession:
+        """Store a new session and return it."""
+        session = InterviewSession(session_id, role, level, tech_stack, question_count, conversation)
+        self.delete(session_id)
+        self._sessions[session_id] = session
+        self._nbytes += session.nbytes
+        self._enforce_budget(keep=session_id)
+        return session
+
+    def get(self, session_id: str) -> Optional[InterviewSession]:
+        """Return a live session (refreshing its LRU position and idle timer) or None."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if now - session.last_access > self.ttl_seconds:
+            self._remove(session_id)
+            self.expirations += 1
+            return None
+        session.last_access = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def append_message(self, session_id: str, role: str, content: str):
+        """Append one message to a session's conversation."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        session.conversation.append((role, content))
+        size = message_size(content)
+        session.nbytes += size
+        self._nbytes += size
+        self._enforce_budget(keep=session_id)
+
+    def set_question_count(self, session_id: str, question_count: int):
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.question_count = question_count
+
+    def delete(self, session_id: str):
+        """Remove a session if present."""
+        if session_id in self._sessions:
+            self._remove(session_id)
+
+    def _remove(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._nbytes -= session.nbytes
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict least recently used sessions (other than keep) until under budget."""
+        while self._nbytes > self.max_bytes and len(self._sessions) > 1:
+            oldest_id = next(iter(self._sessions))
+            if oldest_id == keep:
+                self._sessions.move_to_end(keep)
+                oldest_id = next(iter(self._sessions))
+            self._remove(oldest_id)
+            self.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop every session idle for longer than the TTL. Returns how many were removed."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Sessions are kept in LRU order, so expired ones are at the front
+        expired = []
+        for session_id, session in self._sessions.items():
+            if session.last_access >= cutoff:
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            self._remove(session_id)
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def start(self):
+        """Start the background sweeper on the running event loop."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.ensure_future(self._sweep_forever())
+
+    async def stop(self):
+        """Stop the background sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, float]:
+        """Gauges and counters for monitoring."""
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "backend": "memory"
+        }
+
+
+class SqliteSessionStore:
+    """
+    Session store shared by every worker process through one SQLite (WAL) database.
+
+    Each session is a row in `sessions` plus an append-only journal of messages,
+    so a turn inserts one message row instead of rewriting the conversation.
+    Sessions survive restarts. The TTL and size budget work as in
+    MemorySessionStore, with last_access kept in the database.
+
+    Calls block on SQLite (up to the 5 s busy timeout while another worker writes),
+    so async code runs them in a thread. The session count and total size are kept
+    as running totals, adjusted by this worker's writes and re-read from the
+    database every budget_check_interval seconds (other workers write too), so the
+    budget check after each append is usually free.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 1800.0,
+                 sweep_interval: float = 60.0, budget_check_interval: float = 5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self.budget_check_interval = budget_check_interval
+        self._sweeper: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+        self.expirations = 0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                role TEXT NOT NULL,
+                level TEXT NOT NULL,
+                tech_stack TEXT NOT NULL,
+                question_count INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                nbytes INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            );
+        """)
+        self._count = 0
+        self._nbytes = 0
+        self._totals_checked = 0.0
+        self._refresh_totals()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _refresh_totals(self):
+        """Re-read the session count and total size written by all workers."""
+        with self._lock:
+            self._count, self._nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM sessions"
+            ).fetchone()
+            self._totals_checked = time.monotonic()
+
+    def __len__(self) -> int:
+        """Session count as of the last refresh plus this worker's changes (no I/O)."""
+        return self._count
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Total size as of the last refresh plus this worker's changes (no I/O)."""
+        return self._nbytes
+
+    def create(self, session_id: str, role: str, level: str, tech_stack: str,
+               question_count: int, conversation: List[Tuple[str, str]]) -> InterviewSession:
+        """Store a new session and return it."""
+        session = InterviewSession(session_id, role, level, tech_stack, question_count, conversation)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                replaced = self._delete_locked(session_id)
+                self._conn.execute(
+                    "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, role, level, tech_stack, question_count, time.time(), session.nbytes)
+                )
+                self._conn.executemany(
+                    "INSERT INTO messages VALUES (?, ?, ?, ?)",
+                    [(session_id, seq, msg_role, content)
+                     for seq, (msg_role, content) in enumerate(session.conversation)]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._count += 1 - (replaced is not None)
+            self._nbytes += session.nbytes - (replaced or 0)
+        self._enforce_budget(keep=session_id)
+        return session
+
+    def get(self, session_id: str) -> Optional[InterviewSession]:
+        """Load a live session (refreshing its idle timer) or return None."""
+        rows = self._execute(
+            "SELECT role, level, tech_stack, question_count, last_access FROM sessions WHERE session_id = ?",
+            (session_id,)
+        )
+        if not rows:
+            return None
+        role, level, tech_stack, question_count, last_access = rows[0]
+
+        now = time.time()
+        if now - last_access > self.ttl_seconds:
+            self.delete(session_id)
+            self.expirations += 1
+            return None
+
+        self._execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+        conversation = self._execute(
+            "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        )
+        return InterviewSession(session_id, role, level, tech_stack, question_count,
+                                [(msg_role, content) for msg_role, content in conversation])
+
+    def append_message(self, session_id: str, role: str, content: str):
+        """Append one message to the session's journal."""
+        size = message_size(content)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE sessions SET nbytes = nbytes + ? WHERE session_id = ?", (size, session_id)
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO messages SELECT ?, COALESCE(MAX(seq), -1) + 1, ?, ? "
+                        "FROM messages WHERE session_id = ?",
+                        (session_id, role, content, session_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if cursor.rowcount:
+                self._nbytes += size
+        self._enforce_budget(keep=session_id)
+
+    def set_question_count(self, session_id: str, question_count: int):
+        self._execute(
+            "UPDATE sessions SET question_count = ? WHERE session_id = ?", (question_count, session_id)
+        )
+
+    def delete(self, session_id: str):
+        """Remove a session and its journal."""
+        with self._lock:
+            size = self._delete_locked(session_id)
+            if size is not None:
+                self._count -= 1
+                self._nbytes -= size
+
+    def _delete_locked(self, session_id: str) -> Optional[int]:
+        """Delete a session (caller holds the lock). Returns its size, or None if it did not exist."""
+        row = self._conn.execute("SELECT nbytes FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return row[0]
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict least recently used sessions (other than keep) until under budget."""
+        if self._nbytes <= self.max_bytes and time.monotonic() - self._totals_checked < self.budget_check_interval:
+            return
+        self._refresh_totals()
+        while self._nbytes > self.max_bytes:
+            rows = self._execute(
+                "SELECT session_id FROM sessions WHERE session_id != ? ORDER BY last_access LIMIT 1",
+                (keep or '',)
+            )
+            if not rows:
+                break
+            self.delete(rows[0][0])
+            self.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop every session idle for longer than the TTL. Returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE last_access < ?", (time.time() - self.ttl_seconds,)
+            )
+        self.expirations += cursor.rowcount
+        self._refresh_totals()
+        return cursor.rowcount
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await asyncio.to_thread(self.sweep)
+
+    def start(self):
+        """Start the background sweeper on the running event loop."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.ensure_future(self._sweep_forever())
+
+    async def stop(self):
+        """Stop the background sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, float]:
+        """Gauges and counters for monitoring (running totals; evictions/expirations are per worker)."""
+        return {
+            "sessions": self._count,
+            "bytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "backend": "sqlite"
+        }
+
+
+def create_session_store(backend: str = 'memory', path: Optional[str] = None, **kwargs):
+    """
+    Build the configured session store.
+
+    Args:
+        backend: 'memory' (single worker) or 'sqlite' (shared by all workers, survives restarts)
+        path: SQLite database path for the sqlite backend
+        **kwargs: max_bytes, ttl_seconds, sweep_interval (and budget_check_interval for sqlite)
+    """
+    if backend == 'sqlite':
+        if not path:
+            raise ValueError("A database path is required for the sqlite session backend.")
+        return SqliteSessionStore(path, **kwargs)
+    if backend == 'memory':
+        return MemorySessionStore(**kwargs)
+    raise ValueError(f"Unknown session backend: {backend}. Must be one of ['memory', 'sqlite']")
@@ -0,0 +1,425 @@
+"""
+Stub Upstream Server
+Local stand-in for the OpenRouter, Gemini and NVIDIA NIM (STT/TTS) APIs that api.py calls,
+for load tests on a machine without API keys or network access.
+
+Responses have the shapes api.py parses: chat completions (plain and SSE streaming),
+roadmap and interview JSON, Gemini candidates, STT transcripts and streamed TTS audio.
+Latency is drawn from a configurable distribution per route, and 401/429/500 responses,
+timeouts (the request hangs) and mid-stream errors are injected at configurable rates.
+Draws come from one seeded RNG, so a run with the same settings sees the same mix.
+
+Latency specs (milliseconds):
+    fixed:200   uniform:100,400   normal:300,50   lognormal:300,0.5 (median, sigma)   exponential:300
+
+Usage:
+    python stub_upstream.py [--port 9100] [--latency lognormal:400,0.5] [--token-latency fixed:15]
+                            [--route-latency tts=fixed:50] [--error-rate 429=0.05]
+                            [--error-rate openrouter:timeout=0.01] [--responses canned.json] [--seed 0]
+
+Point the API at it with the environment printed at startup. GET /_stub/stats returns call
+counts per route and outcome; POST /_stub/config changes latency and error rates at runtime
+(same keys as the flags: latency, token_latency, route_latency, error_rates); POST
+/_stub/reset clears the counters.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from fastapi import FastAPI, Request  # type: ignore
+from fastapi.responses import JSONResponse, StreamingResponse  # type: ignore
+
+ROUTES = ('openrouter', 'gemini', 'stt', 'tts')
+FAULTS = ('401', '429', '500', 'timeout', 'stream_error')
+
+OPENROUTER_PATH = '/api/v1/chat/completions'
+GEMINI_PATH = '/v1beta/models/gemini-2.0-flash-lite:generateContent'
+STT_PATH = '/v1/audio/transcriptions'
+TTS_PATH = '/v1/audio/speech'
+
+DEFAULT_RESPONSES = {
+    'chat': "Start with SQL and Python, then build two dashboard projects for your portfolio. "
+            "Practice explaining your analysis to non-technical stakeholders.",
+    'roadmap': {
+        'title': "Data Analyst Roadmap",
+        'description': "From spreadsheet skills to a job-ready analytics portfolio",
+        'timeline': "4-6 months",
+        'steps': [
+            {
+                'title': f"Step {i + 1}",
+                'duration': f"Weeks {i * 4 + 1}-{i * 4 + 4}",
+                'description': f"Stub step {i + 1}",
+                'tasks': ["Task 1", "Task 2", "Task 3"],
+                'skills': ["SQL", "Python"],
+                'icon': "book"
+            }
+            for i in range(5)
+        ]
+    },
+    'interview_question': {
+        'type': "question",
+        'question': "Tell me about a project where you cleaned a messy dataset.",
+        'evaluation': {
+            'technical_score': 6, 'communication_score': 7, 'confidence_score': 6, 'overall_score': 6,
+            'feedback': "Reasonable answer; add concrete numbers.",
+            'improvements': ["Quantify impact", "Mention tools", "Structure the answer"]
+        }
+    },
+    'interview_final': {
+        'type': "final_report",
+        'final_score': 7,
+        'strengths': ["Clear communication", "Solid SQL"],
+        'weaknesses': ["Limited statistics depth"],
+        'hire_recommendation': "Yes",
+        'summary': "Stub final report."
+    },
+    'transcript': "I have two years of experience with Python and SQL."
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency spec into a sampler returning seconds.
+
+    Raises:
+        ValueError: If the distribution or its parameters are invalid
+    """
+    kind, _, params = spec.partition(':')
+    try:
+        values = [float(value) for value in params.split(',')] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec '{spec}'")
+
+    if kind == 'fixed' and len(values) == 1:
+        ms = values[0]
+        return lambda rng: ms / 1000
+    if kind == 'uniform' and len(values) == 2:
+        low, high = values
+        return lambda rng: rng.uniform(low, high) / 1000
+    if kind == 'normal' and len(values) == 2:
+        mean, sd = values
+        return lambda rng: max(0.0, rng.gauss(mean, sd)) / 1000
+    if kind == 'lognormal' and len(values) == 2:
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(math.log(median), sigma) / 1000
+    if kind == 'exponential' and len(values) == 1:
+        mean = values[0]
+        return lambda rng: rng.expovariate(1 / mean) / 1000 if mean > 0 else 0.0
+    raise ValueError(f"Invalid latency spec '{spec}' (expected e.g. fixed:200, uniform:100,400, "
+                     f"normal:300,50, lognormal:300,0.5 or exponential:300)")
+
+
+def parse_error_rate(spec: str):
+    """
+    Parse '[route:]fault=probability'.
+
+    Returns:
+        Tuple of (route or None for all routes, fault, probability)
+    """
+    target, _, probability = spec.partition('=')
+    route, _, fault = target.rpartition(':')
+    if (route and route not in ROUTES) or fault not in FAULTS or not probability:
+        raise ValueError(f"Invalid error rate '{spec}' (expected [route:]fault=p with route in {ROUTES} "
+                         f"and fault in {FAULTS})")
+    return route or None, fault, float(probability)
+
+
+class StubConfig:
+    """Latency distributions, error rates and canned responses of the stub."""
+
+    def __init__(self, latency: str = 'lognormal:300,0.5', token_latency: str = 'fixed:15',
+                 seed: int = 0, hang_seconds: float = 600.0, tts_bytes: int = 200_000,
+                 responses: Optional[dict] = None):
+        self.rng = random.Random(seed)
+        self.hang_seconds = hang_seconds
+        self.tts_audio = b'ID3\x03\x00\x00\x00\x00\x00\x00' + bytes(max(0, tts_bytes - 10))
+        self.responses = dict(DEFAULT_RESPONSES, **(responses or {}))
+        self.specs: Dict[str, str] = {}
+        self.latency = {}
+        self.token_latency = parse_latency(token_latency)
+        self.error_rates: Dict[str, Dict[str, float]] = {route: {} for route in ROUTES}
+        self.update({'latency': latency, 'token_latency': token_latency})
+
+    def update(self, changes: dict):
+        """Apply a partial config (same keys as the /_stub/config body). Validates before applying."""
+        latency = dict(self.latency)
+        specs = dict(self.specs)
+        if 'latency' in changes:
+            sampler = parse_latency(changes['latency'])
+            for route in ROUTES:
+                latency[route] = sampler
+                specs[route] = changes['latency']
+        for route, spec in (changes.get('route_latency') or {}).items():
+            if route not in ROUTES:
+                raise ValueError(f"Unknown route '{route}'")
+            latency[route] = parse_latency(spec)
+            specs[route] = spec
+        token_latency = parse_latency(changes['token_latency']) if 'token_latency' in changes else self.token_latency
+
+        error_rates = {route: dict(rates) for route, rates in self.error_rates.items()}
+        for target, probability in (changes.get('error_rates') or {}).items():
+            route, fault, probability = parse_error_rate(f"{target}={probability}")
+            for name in ([route] if route else ROUTES):
+                error_rates[name][fault] = probability
+
+        self.latency, self.specs, self.token_latency, self.error_rates = latency, specs, token_latency, error_rates
+        if 'token_latency' in changes:
+            self.specs['token'] = changes['token_latency']
+
+    def sample_latency(self, route: str) -> float:
+        return self.latency[route](self.rng)
+
+    def sample_token_latency(self) -> float:
+        return self.token_latency(self.rng)
+
+    def sample_fault(self, route: str) -> Optional[str]:
+        """Pick at most one injected fault for a request (stream_error is drawn separately)."""
+        draw = self.rng.random()
+        for fault in ('401', '429', '500', 'timeout'):
+            draw -= self.error_rates[route].get(fault, 0.0)
+            if draw < 0:
+                return fault
+        return None
+
+    def sample_stream_error(self, route: str) -> bool:
+        return self.rng.random() < self.error_rates[route].get('stream_error', 0.0)
+
+    def describe(self) -> dict:
+        return {
+            'latency': {route: self.specs.get(route) for route in ROUTES},
+            'token_latency': self.specs.get('token'),
+            'error_rates': {route: rates for route, rates in self.error_rates.items() if rates}
+        }
+
+
+class StubStats:
+    """Calls per route and outcome."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.calls: Dict[str, Dict[str, int]] = {route: {} for route in ROUTES}
+
+    def record(self, route: str, outcome: str):
+        self.calls[route][outcome] = self.calls[route].get(outcome, 0) + 1
+
+    def snapshot(self) -> dict:
+        return {
+            'since_seconds': round(time.time() - self.started, 3),
+            'calls': {route: dict(outcomes, total=sum(outcomes.values())) for route, outcomes in self.calls.items()}
+        }
+
+
+def error_body(route: str, status: int) -> dict:
+    """Error payload in each provider's format."""
+    message = {401: "Invalid API key (stub)", 429: "Rate limit exceeded (stub)", 500: "Internal error (stub)"}[status]
+    if route == 'openrouter':
+        return {'error': {'message': message, 'code': status}}
+    if route == 'gemini':
+        grpc_status = {401: 'UNAUTHENTICATED', 429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL'}[status]
+        return {'error': {'code': status, 'message': message, 'status': grpc_status}}
+    return {'status': status, 'title': message, 'detail': message}
+
+
+def openrouter_reply(config: StubConfig, body: dict) -> str:
+    """Canned content for an OpenRouter request: chat, roadmap or interview turn."""
+    messages = body.get('messages') or []
+    text = ' '.join(str(message.get('content', '')) for message in messages)
+    if 'Skillence AI Interviewer' in text:
+        return interview_reply(config, text)
+    if body.get('response_format'):
+        return json.dumps(config.responses['roadmap'])
+    return config.responses['chat']
+
+
+def interview_reply(config: StubConfig, text: str) -> str:
+    final = 'final_report JSON now' in text
+    return json.dumps(config.responses['interview_final' if final else 'interview_question'])
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    """The stub server as an ASGI app."""
+    app = FastAPI(title="Stub Upstream", docs_url=None, redoc_url=None)
+    stats = StubStats()
+
+    async def start(route: str, authorized: bool) -> Optional[JSONResponse]:
+        """Wait for the sampled latency and return an error response if a fault is injected."""
+        fault = config.sample_fault(route) if authorized else '401'
+        await asyncio.sleep(config.sample_latency(route))
+        if fault == 'timeout':
+            stats.record(route, 'timeout')
+            await asyncio.sleep(config.hang_seconds)
+            return JSONResponse(error_body(route, 500), status_code=504)
+        if fault is not None:
+            stats.record(route, fault)
+            return JSONResponse(error_body(route, int(fault)), status_code=int(fault))
+        return None
+
+    def bearer(request: Request) -> bool:
+        return request.headers.get('authorization', '').removeprefix('Bearer ').strip() != ''
+
+    @app.post(OPENROUTER_PATH)
+    async def openrouter(request: Request):
+        body = await request.json()
+        error = await start('openrouter', bearer(request))
+        if error is not None:
+            return error
+
+        content = openrouter_reply(config, body)
+        completion_id = f"gen-stub-{uuid.uuid4().hex[:12]}"
+        if not body.get('stream'):
+            stats.record('openrouter', 'ok')
+            return {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': len(json.dumps(body)) // 4, 'completion_tokens': len(content) // 4}
+            }
+
+        fail_mid_stream = config.sample_stream_error('openrouter')
+        stats.record('openrouter', 'stream_error' if fail_mid_stream else 'ok_stream')
+
+        async def events():
+            yield ": OPENROUTER PROCESSING\n\n"
+            words = content.split(' ')
+            for i, word in enumerate(words):
+                await asyncio.sleep(config.sample_token_latency())
+                if fail_mid_stream and i == len(words) // 2:
+                    yield f"data: {json.dumps({'error': {'message': 'Upstream stream interrupted (stub)', 'code': 502}})}\n\n"
+                    return
+                delta = word if i == len(words) - 1 else word + ' '
+                chunk = {'id': completion_id, 'model': body.get('model'),
+                         'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    @app.post('/v1beta/models/{model_action}')
+    async def gemini(model_action: str, request: Request):
+        body = await request.json()
+        error = await start('gemini', bool(request.query_params.get('key')))
+        if error is not None:
+            return error
+        stats.record('gemini', 'ok')
+        text = ' '.join(part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', []))
+        return {
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': interview_reply(config, text)}]},
+                'finishReason': 'STOP'
+            }],
+            'modelVersion': model_action.split(':')[0]
+        }
+
+    @app.post(STT_PATH)
+    async def transcribe(request: Request):
+        await request.body()
+        error = await start('stt', bearer(request))
+        if error is not None:
+            return error
+        stats.record('stt', 'ok')
+        return {'text': config.responses['transcript']}
+
+    @app.post(TTS_PATH)
+    async def speech(request: Request):
+        await request.json()
+        error = await start('tts', bearer(request))
+        if error is not None:
+            return error
+        stats.record('tts', 'ok')
+
+        async def audio():
+            for offset in range(0, len(config.tts_audio), 16 * 1024):
+                if offset:
+                    await asyncio.sleep(config.sample_token_latency())
+                yield config.tts_audio[offset:offset + 16 * 1024]
+
+        return StreamingResponse(audio(), media_type='audio/mpeg')
+
+    @app.get('/_stub/stats')
+    async def get_stats():
+        return dict(stats.snapshot(), config=config.describe())
+
+    @app.post('/_stub/config')
+    async def set_config(request: Request):
+        try:
+            config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({'detail': str(e)}, status_code=400)
+        return config.describe()
+
+    @app.post('/_stub/reset')
+    async def reset_stats():
+        stats.reset()
+        return stats.snapshot()
+
+    return app
+
+
+def api_environment(base_url: str) -> Dict[str, str]:
+    """Environment variables that point api.py at a stub running at base_url."""
+    return {
+        'OPENROUTER_API_URL': base_url + OPENROUTER_PATH,
+        'GEMINI_API_URL': base_url + GEMINI_PATH,
+        'NVIDIA_STT_URL': base_url + STT_PATH,
+        'NVIDIA_TTS_URL': base_url + TTS_PATH,
+        'OPENROUTER_API_KEY': 'stub-openrouter-key',
+        'GEMINI_API_KEY': 'stub-gemini-key',
+        'NVIDIA_STT_API_KEY': 'stub-nvidia-key',
+        'NVIDIA_TTS_API_KEY': 'stub-nvidia-key',
+    }
+
+
+def main():
+    """Run the stub server."""
+    parser = argparse.ArgumentParser(description="Stub OpenRouter/Gemini/NVIDIA server for offline load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency', default='lognormal:300,0.5', help="Time to response headers, all routes")
+    parser.add_argument('--route-latency', action='append', default=[], metavar='ROUTE=SPEC',
+                        help=f"Latency for one route ({', '.join(ROUTES)})")
+    parser.add_argument('--token-latency', default='fixed:15', help="Gap between streamed chunks")
+    parser.add_argument('--error-rate', action='append', default=[], metavar='[ROUTE:]FAULT=P',
+                        help=f"Injected fault probability ({', '.join(FAULTS)})")
+    parser.add_argument('--hang-seconds', type=float, default=600.0, help="How long a 'timeout' request hangs")
+    parser.add_argument('--tts-bytes', type=int, default=200_000)
+    parser.add_argument('--responses', help="JSON file overriding canned responses "
+                                            f"({', '.join(DEFAULT_RESPONSES)})")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    config = StubConfig(latency=args.latency, token_latency=args.token_latency, seed=args.seed,
+                        hang_seconds=args.hang_seconds, tts_bytes=args.tts_bytes, responses=responses)
+    config.update({
+        'route_latency': dict(spec.split('=', 1) for spec in args.route_latency),
+        'error_rates': dict(spec.split('=', 1) for spec in args.error_rate)
+    })
+
+    print("="*60)
+    print("STUB UPSTREAM SERVER")
+    print("="*60)
+    print(f"[OK] {json.dumps(config.describe())}")
+    print("[INFO] Start the API against this stub with:")
+    for name, value in api_environment(f"http://{args.host}:{args.port}").items():
+        print(f"  export {name}={value}")
+
+    import uvicorn  # type: ignore
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
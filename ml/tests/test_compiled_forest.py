@@ -0,0 +1,42 @@
+"""Golden-output checks of the compiled career forest against sklearn."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from compiled_forest import CompiledForest, verify_forest
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    """A forest shaped like the career model: a few integer-coded columns plus binary skills."""
+    rng = np.random.default_rng(0)
+    X = np.hstack([rng.integers(0, 6, (600, 2)), rng.random((600, 1)), rng.integers(0, 2, (600, 10))])
+    y = (X[:, 0] + 2 * X[:, 3] + X[:, 5] - X[:, 1] + rng.integers(0, 3, 600)) % 5
+    model = RandomForestClassifier(n_estimators=40, max_depth=12, random_state=0).fit(X, y)
+    X_test = np.hstack([rng.integers(0, 6, (1200, 2)), rng.random((1200, 1)), rng.integers(0, 2, (1200, 10))])
+    return model, X_test
+
+
+@pytest.mark.parametrize('rows', [1, 7, 256, 257, 1000])
+def test_matches_sklearn(fitted, rows):
+    model, X = fitted
+    verify_forest(model, CompiledForest.from_sklearn(model), X[:rows])
+
+
+def test_matches_sklearn_across_chunks(fitted):
+    model, X = fitted
+    forest = CompiledForest.from_sklearn(model)
+    forest.chunk_rows = 33
+    verify_forest(model, forest, X)
+    assert np.array_equal(forest.apply(X), model.apply(X) + forest.roots)
+
+
+def test_save_and_load_roundtrip(fitted, tmp_path):
+    model, X = fitted
+    path = str(tmp_path / 'forest.npz')
+    CompiledForest.from_sklearn(model).save(path)
+    verify_forest(model, CompiledForest.load(path), X)
+
+    mapped = CompiledForest.from_sklearn(model).save_mapped(str(tmp_path / 'mapped'))
+    verify_forest(model, CompiledForest.load_mapped(mapped), X)
@@ -0,0 +1,9 @@
+"""Cold-start budget of api.py (python benchmark.py import-time runs the same check)."""
+
+from benchmark import check_import_time
+
+
+def test_api_import_within_budget():
+    # Best of 3 fresh interpreters; IMPORT_TIME_BUDGET_MS overrides the budget on slow runners
+    times_ms, _, failures = check_import_time('api', repeat=3)
+    assert not failures, f"{'; '.join(failures)} (runs: {', '.join(f'{ms:.0f} ms' for ms in times_ms)})"
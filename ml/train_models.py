@@ -13,6 +13,11 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 import joblib
 import os
 from preprocessing import load_and_preprocess_data, SKILLS_LIST
+from compiled_forest import export_forest
+from hashing_matcher import build_hashing_idf
+from model_artifacts import export_shared_artifacts
+from answer_table import build_answer_table
+from model_registry import stage_version, publish_version, discard_staging
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -20,7 +25,7 @@ MODELS_DIR = 'ml/models'
 os.makedirs(MODELS_DIR, exist_ok=True)
 
 
-def train_career_prediction_model(X_train, y_train, X_test, y_test, target_encoder):
+def train_career_prediction_model(X_train, y_train, X_test, y_test, target_encoder, save_dir: str = MODELS_DIR):
     """
     Model 1: Career Path Prediction
     Type: Multi-class Classification
@@ -93,14 +98,17 @@ def train_career_prediction_model(X_train, y_train, X_test, y_test, target_encod
         print(f"  {i}. Feature {idx}: {feature_importances[idx]:.4f}")
     
     # Save model
-    model_path = os.path.join(MODELS_DIR, 'career_model.pkl')
+    model_path = os.path.join(save_dir, 'career_model.pkl')
     joblib.dump(model, model_path)
     print(f"\n[OK] Model saved to {model_path}")
     
+    # Export array-based copy of the forest for serving
+    export_forest(model, save_dir)
+    
     return model, y_test_pred
 
 
-def train_skill_gap_model(X_train, y_train, X_test, y_test, target_encoder, preprocessor):
+def train_skill_gap_model(X_train, y_train, X_test, y_test, target_encoder, preprocessor, save_dir: str = MODELS_DIR):
     """
     Model 2: Skill Gap / Skill Readiness
     Type: Multi-label Classification (treating as multi-output)
@@ -212,14 +220,14 @@ def train_skill_gap_model(X_train, y_train, X_test, y_test, target_encoder, prep
     print(f"  F1-Score:  {test_f1:.4f}")
     
     # Save model
-    model_path = os.path.join(MODELS_DIR, 'skill_gap_model.pkl')
+    model_path = os.path.join(save_dir, 'skill_gap_model.pkl')
     joblib.dump(model, model_path)
     print(f"\n[OK] Model saved to {model_path}")
     
     return model
 
 
-def train_resume_matching_model(train_df, test_df):
+def train_resume_matching_model(train_df, test_df, save_dir: str = MODELS_DIR):
     """
     Model 3: Resume–Job Matching
     Type: NLP Similarity
@@ -326,10 +334,13 @@ def train_resume_matching_model(train_df, test_df):
     print(f"  Max similarity: {np.max(test_similarities):.4f}")
     
     # Save vectorizer
-    vectorizer_path = os.path.join(MODELS_DIR, 'tfidf_vectorizer.pkl')
+    vectorizer_path = os.path.join(save_dir, 'tfidf_vectorizer.pkl')
     joblib.dump(vectorizer, vectorizer_path)
     print(f"\n[OK] TF-IDF Vectorizer saved to {vectorizer_path}")
     
+    # IDF statistics for the fit-free hashing fallback used by the API
+    build_hashing_idf(train_texts, save_dir)
+    
     return vectorizer
 
 
@@ -344,34 +355,58 @@ def main():
     train_path = os.path.join(script_dir, 'data', 'career_train.csv')
     test_path = os.path.join(script_dir, 'data', 'career_test.csv')
     
-    X_train, X_test, y_train, y_test, preprocessor = load_and_preprocess_data(
-        train_path, test_path
-    )
-    
-    # Load raw dataframes for resume matching
-    train_df = pd.read_csv(train_path)
-    test_df = pd.read_csv(test_path)
+    # Every artifact of this run goes into a staging directory that becomes an
+    # immutable version once complete; the API picks it up when CURRENT switches
+    version, staging_dir = stage_version(MODELS_DIR)
+    print(f"Training model version {version} in {staging_dir}")
     
-    # Train Model 1: Career Prediction
-    career_model, y_test_pred = train_career_prediction_model(
-        X_train, y_train, X_test, y_test, preprocessor.target_encoder
-    )
-    
-    # Train Model 2: Skill Gap
-    skill_model = train_skill_gap_model(
-        X_train, y_train, X_test, y_test, preprocessor.target_encoder, preprocessor
-    )
+    try:
+        X_train, X_test, y_train, y_test, preprocessor = load_and_preprocess_data(
+            train_path, test_path, save_dir=staging_dir
+        )
+        
+        # Load raw dataframes for resume matching
+        train_df = pd.read_csv(train_path)
+        test_df = pd.read_csv(test_path)
+        
+        # Train Model 1: Career Prediction
+        career_model, y_test_pred = train_career_prediction_model(
+            X_train, y_train, X_test, y_test, preprocessor.target_encoder, save_dir=staging_dir
+        )
+        
+        # Train Model 2: Skill Gap
+        skill_model = train_skill_gap_model(
+            X_train, y_train, X_test, y_test, preprocessor.target_encoder, preprocessor, save_dir=staging_dir
+        )
+        
+        # Train Model 3: Resume Matching
+        tfidf_vectorizer = train_resume_matching_model(train_df, test_df, save_dir=staging_dir)
+        
+        # Memory-mapped copies of the large arrays, shared by API workers
+        export_shared_artifacts(staging_dir)
+        
+        # Precomputed career answers, built from this run's artifacts
+        build_answer_table(staging_dir)
+    except BaseException:
+        # A failed run never becomes a version
+        discard_staging(staging_dir)
+        raise
     
-    # Train Model 3: Resume Matching
-    tfidf_vectorizer = train_resume_matching_model(train_df, test_df)
+    version_path = publish_version(MODELS_DIR, staging_dir, version)
     
     print("\n" + "="*60)
     print("TRAINING COMPLETE!")
     print("="*60)
-    print("\nAll models saved to ml/models/")
+    print(f"\nAll models saved to {version_path}/")
     print("  - career_model.pkl")
+    print("  - career_forest.npz")
     print("  - skill_gap_model.pkl")
     print("  - tfidf_vectorizer.pkl")
+    print("  - hashing_idf.npz")
+    print("  - shared/ (memory-mapped career forest and hashing IDF)")
+    print("  - career_answer_table.npy")
+    print("  - manifest.json")
+    print(f"\nml/models/CURRENT now points to {version}; a running API reloads it automatically")
     print("\nReady for inference!")
 
 